@@ -3,6 +3,15 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                            QPushButton, QCheckBox, QGridLayout)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
+from utils.value_types import VALUE_TYPES
+
+# 整型的长度选项 -> (有符号类型, 无符号类型)
+INT_LENGTH_TYPES = {
+    '单字节': ('int8', 'uint8'),
+    '双字节': ('int16', 'uint16'),
+    '四字节': ('int32', 'uint32'),
+    '八字节': ('int64', 'uint64'),
+}
 
 class AddressDialog(QDialog):
     def __init__(self, parent=None, address=None, value=None):
@@ -105,6 +114,7 @@ class AddressDialog(QDialog):
         self.type_int = QRadioButton("整型")
         self.type_float = QRadioButton("浮点")
         self.type_double = QRadioButton("双精度")
+        self.type_unsigned = QCheckBox("无符号")
         # self.type_string = QRadioButton("字符串")
         self.type_int.setChecked(True)
 
@@ -117,6 +127,7 @@ class AddressDialog(QDialog):
         type_layout.addWidget(self.type_int)
         type_layout.addWidget(self.type_float)
         type_layout.addWidget(self.type_double)
+        type_layout.addWidget(self.type_unsigned)
         # type_layout.addWidget(self.type_string)
 
         right_layout.addWidget(type_group)
@@ -160,9 +171,13 @@ class AddressDialog(QDialog):
 
     def _on_type_changed(self):
         """处理数据类型改变事件"""
+        # 整型的长度和符号可以选择，浮点类型的长度固定
+        self.length_combo.setEnabled(self.type_int.isChecked())
+        self.type_unsigned.setEnabled(self.type_int.isChecked())
         # 根据数据类型设置对应的长度
         if self.type_int.isChecked():
-            self.length_combo.setCurrentText('四字节')
+            if self.length_combo.currentText() not in INT_LENGTH_TYPES:
+                self.length_combo.setCurrentText('四字节')
         elif self.type_float.isChecked():
             self.length_combo.setCurrentText('四字节')
         elif self.type_double.isChecked():
@@ -170,11 +185,35 @@ class AddressDialog(QDialog):
         else:  # string
             self.length_combo.setCurrentText('单字节')
 
+    def _selected_type(self):
+        """根据选中的数据类型、长度和符号返回数值类型"""
+        if self.type_int.isChecked():
+            signed, unsigned = INT_LENGTH_TYPES.get(self.length_combo.currentText(), ('int32', 'uint32'))
+            return unsigned if self.type_unsigned.isChecked() else signed
+        if self.type_float.isChecked():
+            return 'float'
+        if self.type_double.isChecked():
+            return 'double'
+        return 'string'
+
+    def set_value_type(self, value_type):
+        """按数值类型选中数据类型、长度和符号，不支持的类型按整型处理"""
+        if value_type == 'float':
+            self.type_float.setChecked(True)
+        elif value_type == 'double':
+            self.type_double.setChecked(True)
+        else:
+            self.type_int.setChecked(True)
+            for length, types in INT_LENGTH_TYPES.items():
+                if value_type in types:
+                    self.length_combo.setCurrentText(length)
+                    self.type_unsigned.setChecked(value_type == types[1])
+                    break
+        self._on_type_changed()
+
     def get_values(self):
         """获取对话框中的所有值"""
-        data_type = ('int32' if self.type_int.isChecked() else
-                    'float' if self.type_float.isChecked() else
-                    'double' if self.type_double.isChecked() else 'string')
+        data_type = self._selected_type()
 
         # 确保range_warning属性存在
         range_warning_value = True
@@ -198,21 +237,13 @@ class AddressDialog(QDialog):
         if hasattr(self.parent(), 'logger'):
             logger = self.parent().logger
 
-        value_type = None
-        if self.type_int.isChecked():
-            value_type = 'int32'
-        elif self.type_float.isChecked():
-            value_type = 'float'
-        elif self.type_double.isChecked():
-            value_type = 'double'
-        else:  # string
-            value_type = 'string'
+        value_type = self._selected_type()
 
         if logger:
             logger.debug(f"获取数据类型: {value_type}")
 
             # 验证类型是否有效
-            if value_type not in ['int32', 'float', 'double']:
+            if value_type not in VALUE_TYPES:
                 logger.warning(f"不支持的数据类型: {value_type}")
 
         return value_type
@@ -2,10 +2,11 @@ import sys
 import ctypes
 import win32com.shell.shell as shell
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
-                           QHBoxLayout, QTableWidget, QLineEdit, QComboBox, QPushButton, QLabel)
-from PyQt5.QtCore import Qt, QTimer, QCoreApplication
+                           QHBoxLayout, QTableWidget, QLineEdit, QComboBox, QPushButton, QLabel,
+                           QCheckBox)
+from PyQt5.QtCore import QTimer, QCoreApplication
 import psutil
-from memory_reader import MemoryReader
+from memory_reader import MemoryReader, SCAN_MODES
 from utils.logger import setup_logger
 import traceback
 from pathlib import Path
@@ -18,10 +19,34 @@ from utils.delegates import LockStateDelegate
 from utils.search_thread import SearchThread
 from utils.icon_helper import get_file_icon
 from utils.process_helper import get_game_processes
-from utils.ui_helper import (create_process_section, create_search_section,
+from utils.ui_helper import (create_process_section, create_search_section, create_region_filter_section,
                          create_memory_table, create_result_table, create_table_control_section)
 from utils.memory_helper import (update_memory_table, add_to_result_table)
 from utils.task_manager import SearchTaskManager
+from utils.freeze_engine import FreezeEngine, LockRegistry, DEFAULT_PERIOD, get_freeze_mode
+from utils.snapshot_store import SnapshotStore
+from utils.region_map import get_region_filter
+from utils.byte_pattern import BytePattern, TextPattern
+from utils.value_types import (VALUE_TYPES, ALL_TYPES, AOB_TYPE, TEXT_TYPE, PATTERN_TYPES, get_type_by_text, get_type_text, get_value_size,
+                               parse_value, pack_value, unpack_value, format_value)
+
+# 与先前值比较的比较方式，只能用于后续搜索
+RELATION_COMPARE_TEXTS = ('已改变', '未改变', '已增加', '已减少', '增加了', '减少了')
+
+# 首次扫描的区域筛选方案（显示名称 -> REGION_FILTER_PROFILES中的方案）
+REGION_FILTER_TEXTS = {
+    '全部可读内存': 'all',
+    '私有可写内存': 'private_writable',
+    '可写内存': 'writable',
+    '排除模块和映射文件': 'no_image_mapped',
+}
+
+# 文本搜索的编码选项 -> 编码列表，选择多种编码时一次扫描同时查找
+TEXT_ENCODING_TEXTS = {
+    'UTF-8': ('utf-8',),
+    'UTF-16LE': ('utf-16-le',),
+    'UTF-8 + UTF-16LE': ('utf-8', 'utf-16-le'),
+}
 
 class GameCheater(QMainWindow):
     def __init__(self):
@@ -30,12 +55,39 @@ class GameCheater(QMainWindow):
         self.logger.info("游戏修改器启动")
 
         self.memory_reader = MemoryReader()
-        self.locked_addresses = {}
 
         # 加载配置文件
         self.config_file = Path('config.json')
         self.config = self._load_config()
 
+        # 锁定表保存每个锁定地址的类型和打包后的字节，由后台线程按周期写入，周期（毫秒）可在配置文件中设置
+        self.lock_registry = LockRegistry()
+        self.freeze_engine = FreezeEngine(
+            lambda address, data: self.memory_reader.write_memory(address, data, quiet=True),
+            registry=self.lock_registry,
+            read=self.memory_reader.read_memory_view)
+        freeze_period_ms = self.config.get('freeze_period_ms', DEFAULT_PERIOD * 1000)
+        try:
+            self.freeze_engine.period = float(freeze_period_ms) / 1000
+        except (TypeError, ValueError):
+            self.logger.warning(f"无效的锁定写入周期: {freeze_period_ms}，使用默认值")
+        self.freeze_engine.start()
+
+        # 首次扫描的并行模式，可在配置文件中设置为 'thread' 或 'process'
+        scan_mode = self.config.get('scan_mode', 'thread')
+        if scan_mode in SCAN_MODES:
+            self.memory_reader.scan_mode = scan_mode
+        else:
+            self.logger.warning(f"不支持的扫描模式: {scan_mode}，使用默认的线程模式")
+
+        # 候选地址的内存预算（MB），超过后转存到临时文件
+        budget_mb = self.config.get('candidate_memory_budget_mb')
+        if budget_mb is not None:
+            try:
+                self.memory_reader.candidate_memory_budget = int(budget_mb) * 1024 * 1024
+            except (TypeError, ValueError):
+                self.logger.warning(f"无效的候选地址内存预算: {budget_mb}，使用默认值")
+
         self.setWindowTitle('"由我"修改器')
         self.setGeometry(100, 100, 800, 600)
 
@@ -54,10 +106,24 @@ class GameCheater(QMainWindow):
         self.search_input = QLineEdit()
         self.type_combo = QComboBox()
         self.compare_combo = QComboBox()
+        self.unaligned_check = QCheckBox()
+        self.encoding_combo = QComboBox()
+        self.encoding_combo.addItems(list(TEXT_ENCODING_TEXTS))
+        self.ignore_case_check = QCheckBox()
+        self.region_combo = QComboBox()
+        self.region_start_input = QLineEdit()
+        self.region_end_input = QLineEdit()
+        self.module_input = QLineEdit()
 
         # 设置搜索输入框的回车键事件
         self.search_input.returnPressed.connect(self._on_search_clicked)
 
+        # 选择模糊值时数值文本框变灰，无法输入数值
+        self.compare_combo.currentTextChanged.connect(self._on_compare_changed)
+
+        # 编码和大小写选项只用于文本搜索
+        self.type_combo.currentTextChanged.connect(self._on_type_changed)
+
         # 初始化任务管理器
         self.task_manager = SearchTaskManager()
 
@@ -92,12 +158,7 @@ class GameCheater(QMainWindow):
             self.logger.debug(f"当前任务值类型: {current_task.value_type}")
 
             # 将任务的值类型映射到下拉菜单选项
-            value_type_map = {
-                "int32": "整数",
-                "float": "浮点数",
-                "double": "双精度"
-            }
-            combo_text = value_type_map.get(current_task.value_type, "整数")
+            combo_text = get_type_text(current_task.value_type)
             self.logger.debug(f"映射后的下拉菜单文本: {combo_text}")
 
             # 设置下拉菜单值
@@ -108,6 +169,20 @@ class GameCheater(QMainWindow):
             new_text = self.type_combo.currentText()
             self.logger.debug(f"设置后的下拉菜单文本: {new_text}")
 
+        # 非对齐选项属于任务，切换任务时一并切换
+        if current_task:
+            self.unaligned_check.setChecked(current_task.unaligned)
+
+    def _on_type_changed(self, type_text):
+        """数值类型切换事件：只有文本搜索可以选择编码和大小写"""
+        is_text = get_type_by_text(type_text) == TEXT_TYPE
+        self.encoding_combo.setEnabled(is_text)
+        self.ignore_case_check.setEnabled(is_text)
+
+    def _on_compare_changed(self, compare_type):
+        """比较方式切换事件：模糊值扫描不需要输入数值"""
+        self.search_input.setEnabled(compare_type != '模糊值')
+
     def _setup_ui(self):
         """设置UI布局"""
         main_widget = QWidget()
@@ -128,10 +203,26 @@ class GameCheater(QMainWindow):
             self.type_combo,
             self.compare_combo,
             self._on_search_clicked,
-            self._on_new_task_clicked
+            self._on_new_task_clicked,
+            self.unaligned_check,
+            self.encoding_combo,
+            self.ignore_case_check
         )
+        self._on_type_changed(self.type_combo.currentText())
         layout.addLayout(search_layout)
 
+        # 添加区域筛选区域，恢复上次使用的筛选方案
+        layout.addLayout(create_region_filter_section(
+            self.region_combo,
+            REGION_FILTER_TEXTS,
+            self.region_start_input,
+            self.region_end_input,
+            self.module_input
+        ))
+        region_profile = self.config.get('region_filter_profile')
+        if region_profile in REGION_FILTER_TEXTS:
+            self.region_combo.setCurrentText(region_profile)
+
         # 添加任务管理器
         layout.addWidget(self.task_manager)
 
@@ -150,16 +241,49 @@ class GameCheater(QMainWindow):
         self.stop_button.setEnabled(False)
         layout.addWidget(self.stop_button)
 
+    def _build_region_filter(self):
+        """根据区域筛选控件创建首次扫描的区域筛选条件，输入无效时抛出ValueError"""
+        profile = REGION_FILTER_TEXTS.get(self.region_combo.currentText(), 'all')
+
+        # 地址范围，留空的一端不限制
+        start_text = self.region_start_input.text().strip()
+        end_text = self.region_end_input.text().strip()
+        address_ranges = None
+        if start_text or end_text:
+            start = int(start_text, 16) if start_text else 0
+            end = int(end_text, 16) if end_text else 1 << 64
+            address_ranges = [(start, end)]
+
+        # 模块列表，名称前加 - 表示排除
+        include_modules, exclude_modules = [], []
+        for name in self.module_input.text().replace('，', ',').split(','):
+            name = name.strip()
+            if name.startswith('-'):
+                exclude_modules.append(name[1:].strip())
+            elif name:
+                include_modules.append(name)
+
+        return get_region_filter(
+            profile,
+            include_modules=include_modules,
+            exclude_modules=[name for name in exclude_modules if name],
+            address_ranges=address_ranges
+        )
+
     def _setup_timer(self):
-        """设置定时器用于更新锁定的值和刷新显示"""
+        """设置定时器用于刷新显示（锁定值由freeze_engine在后台写入）"""
         self.lock_timer = QTimer()
         self.lock_timer.timeout.connect(self._update_timer_event)
         self.lock_timer.start(100)  # 每100ms更新一次
 
+    def closeEvent(self, event):
+        """关闭窗口时停止锁定写入线程"""
+        self.freeze_engine.stop()
+        super().closeEvent(event)
+
     def _update_timer_event(self):
-        """定时器事件：更新锁定值和刷新显示"""
+        """定时器事件：刷新显示"""
         try:
-            self._update_locked_values()
             self._refresh_memory_table()
             self._refresh_result_table()
         except Exception as e:
@@ -313,36 +437,60 @@ class GameCheater(QMainWindow):
                 self.statusBar().showMessage("请先创建任务", 3000)
                 return
 
-            # 获取搜索值
+            # 获取比较类型
+            compare_type = self.compare_combo.currentText()
+            self.logger.debug(f"比较类型: {compare_type}")
+
+            # 模糊值总是重新开始一次首次扫描，保存内存快照
+            if compare_type == '模糊值' and not current_task.is_first_search:
+                current_task.clear()
+
+            # 与先前值比较的方式只能用于后续搜索
+            if current_task.is_first_search and compare_type in RELATION_COMPARE_TEXTS:
+                self.logger.warning(f"搜索失败：首次搜索不支持比较方式 {compare_type}")
+                self.statusBar().showMessage("首次搜索请使用精确匹配、大于、小于或模糊值", 3000)
+                return
+
+            # 获取搜索值；模糊值首次扫描、与先前值比较及与快照比较大小时可以不输入数值
             value_text = self.search_input.text().strip()
-            if not value_text:
+            value_optional = compare_type == '模糊值' or compare_type in ('已改变', '未改变', '已增加', '已减少') or (
+                isinstance(current_task.last_results, SnapshotStore) and compare_type in ('大于', '小于'))
+            if not value_text and not value_optional:
                 self.logger.warning("搜索失败：未输入搜索值")
                 self.statusBar().showMessage("请输入搜索值", 3000)
                 return
+            if compare_type == '模糊值':
+                value_text = ''
 
             # 获取值类型
-            value_type = self.type_combo.currentText()
-            value_type_map = {
-                "整数": "int32",
-                "浮点数": "float",
-                "单精度": "float",
-                "双精度": "double"
-            }
-            value_type = value_type_map.get(value_type, "int32")
+            value_type = get_type_by_text(self.type_combo.currentText(), 'int32')
             self.logger.debug(f"搜索值类型: {value_type} (原始类型: {self.type_combo.currentText()})")
-
-            # 获取比较类型
-            compare_type = self.compare_combo.currentText()
-            self.logger.debug(f"比较类型: {compare_type}")
+            if value_type in PATTERN_TYPES and (compare_type != '精确匹配' or not value_text):
+                self.statusBar().showMessage("字节数组和文本搜索只支持精确匹配，请输入要查找的内容", 3000)
+                return
 
             # 转换搜索值
             try:
-                if value_type == "int32":
-                    value = int(value_text)
-                    self.logger.debug(f"转换整数值: {value}")
-                else:  # float or double
-                    value = float(value_text)
-                    self.logger.debug(f"转换浮点值: {value}")
+                if not value_text:
+                    value = None
+                    self.logger.debug("未输入搜索值，与先前快照比较")
+                elif value_type == AOB_TYPE:
+                    # 特征码：解析为带通配符的字节模式
+                    value = BytePattern.parse(value_text)
+                    self.logger.debug(f"解析特征码: {value}")
+                elif value_type == TEXT_TYPE:
+                    # 文本：按选择的编码转换为字节，可以同时查找多种编码
+                    value = TextPattern(self.search_input.text(),
+                                        TEXT_ENCODING_TEXTS[self.encoding_combo.currentText()],
+                                        self.ignore_case_check.isChecked())
+                    self.logger.debug(f"文本搜索: {value}")
+                elif value_type == ALL_TYPES:
+                    # 所有类型：按输入决定整数或浮点数，各类型的搜索值由扫描时换算
+                    value = float(value_text) if any(c in value_text for c in '.eE') else int(value_text)
+                    self.logger.debug(f"转换所有类型搜索值: {value}")
+                else:
+                    value = parse_value(value_text, value_type)
+                    self.logger.debug(f"转换{value_type}值: {value}")
             except ValueError:
                 self.logger.error(f"无效的{value_type}值: {value_text}")
                 self.statusBar().showMessage(f"无效的{value_type}值: {value_text}", 3000)
@@ -352,7 +500,10 @@ class GameCheater(QMainWindow):
             current_task.value_type = value_type
             current_task.value = value
             current_task.compare_type = compare_type
-            self.logger.debug(f"更新任务 '{current_task.name}' 的参数: 值={value}, 类型={value_type}, 比较方式={compare_type}")
+            if current_task.is_first_search:
+                current_task.unaligned = self.unaligned_check.isChecked()
+            self.logger.debug(f"更新任务 '{current_task.name}' 的参数: 值={value}, 类型={value_type}, 比较方式={compare_type}, "
+                              f"非对齐={current_task.unaligned}")
 
             # 禁用搜索按钮，避免重复点击
             self.search_button.setEnabled(False)
@@ -362,6 +513,20 @@ class GameCheater(QMainWindow):
             # 更新状态栏
             self.statusBar().showMessage("正在准备搜索...", 0)
 
+            # 首次扫描的区域筛选条件
+            region_filter = None
+            if current_task.is_first_search:
+                try:
+                    region_filter = self._build_region_filter()
+                except ValueError as e:
+                    self.logger.error(f"无效的区域筛选条件: {str(e)}")
+                    self.statusBar().showMessage(f"无效的区域筛选条件: {str(e)}", 3000)
+                    self.search_button.setEnabled(True)
+                    self.stop_button.setEnabled(False)
+                    return
+                self.config['region_filter_profile'] = self.region_combo.currentText()
+                self._save_config()
+
             # 准备搜索参数
             search_params = {
                 "value": value,
@@ -369,6 +534,8 @@ class GameCheater(QMainWindow):
                 "compare_type": compare_type,
                 "last_results": current_task.last_results,
                 "is_first_search": current_task.is_first_search,
+                "region_filter": region_filter,
+                "unaligned": current_task.unaligned,
                 "task": current_task
             }
             self.logger.info(f"开始搜索: 值={value}, 类型={value_type}, 比较方式={compare_type}, 是否首次搜索={current_task.is_first_search}")
@@ -395,15 +562,7 @@ class GameCheater(QMainWindow):
         new_task.memory_reader = self.memory_reader
 
         # 使用当前选择的值类型
-        value_type = self.type_combo.currentText().lower()
-        if value_type == '整数':
-            new_task.value_type = 'int32'
-        elif value_type == '浮点':
-            new_task.value_type = 'float'
-        elif value_type == '双精度':
-            new_task.value_type = 'double'
-        else:
-            new_task.value_type = 'int32'  # 默认为整数
+        new_task.value_type = get_type_by_text(self.type_combo.currentText(), 'int32')
 
     def new_address(self):
         """添加新地址到结果表格"""
@@ -414,27 +573,22 @@ class GameCheater(QMainWindow):
                 return
 
             # 获取当前选中的内存表格行
-            current_row = current_task.memory_table.currentRow()
+            current_row = current_task.memory_table.currentIndex().row()
 
             # 如果有选中的行，获取该行的数据
             if current_row >= 0:
-                addr = current_task.memory_table.item(current_row, 0).text()  # 地址列
-                value = current_task.memory_table.item(current_row, 1).text()  # 当前值列
-                value_type = current_task.memory_table.item(current_row, 4).text()  # 类型列
+                model = current_task.memory_table.model()
+                addr = model.data(model.index(current_row, 0))  # 地址列
+                value = model.data(model.index(current_row, 1))  # 当前值列
+                value_type = model.data(model.index(current_row, 4))  # 类型列
 
                 # 创建并显示添加地址对话框
                 dialog = AddressDialog(self, address=addr, value=value)
 
                 # 设置数据类型
-                type_to_radio = {
-                    "整数": dialog.type_int,
-                    "浮点": dialog.type_float,
-                    "单精度": dialog.type_float,
-                    "双精度": dialog.type_double
-                }
-
-                if value_type in type_to_radio:
-                    type_to_radio[value_type].setChecked(True)
+                data_type = get_type_by_text(value_type)
+                if data_type in VALUE_TYPES:
+                    dialog.set_value_type(data_type)
                     self.logger.debug(f"设置对话框数据类型: {value_type}")
                 else:
                     # 默认使用整型
@@ -445,12 +599,7 @@ class GameCheater(QMainWindow):
                 # 如果没有选中行，则打开空白对话框
                 dialog = AddressDialog(self)
                 # 根据当前搜索类型设置默认值类型
-                if current_task.value_type == 'float':
-                    dialog.type_float.setChecked(True)
-                elif current_task.value_type == 'double':
-                    dialog.type_double.setChecked(True)
-                else:
-                    dialog.type_int.setChecked(True)
+                dialog.set_value_type(current_task.value_type)
 
             # 显示对话框
             if dialog.exec_():
@@ -459,7 +608,7 @@ class GameCheater(QMainWindow):
                     addr = int(values['address'], 16)
                     # 确保数据类型格式正确
                     data_type = values['data_type']
-                    if data_type not in ['int32', 'float', 'double']:
+                    if data_type not in VALUE_TYPES:
                         self.logger.error(f"不支持的数据类型: {data_type}")
                         if data_type == 'int':
                             data_type = 'int32'
@@ -480,7 +629,7 @@ class GameCheater(QMainWindow):
 
                     if success:
                         if is_locked and lock_value is not None:
-                            self.locked_addresses[addr] = lock_value
+                            self.lock_registry.add(addr, data_type, lock_value)
                         self.statusBar().showMessage(f"已添加地址 {hex(addr)} 到修改列表")
                     else:
                         self.statusBar().showMessage("添加地址失败")
@@ -497,8 +646,7 @@ class GameCheater(QMainWindow):
         if current_row >= 0:
             try:
                 addr = int(self.result_table.item(current_row, 1).text(), 16)
-                if addr in self.locked_addresses:
-                    del self.locked_addresses[addr]
+                self.lock_registry.remove(addr)
                 self.result_table.removeRow(current_row)
                 self.statusBar().showMessage(f"已删除地址 {hex(addr)}")
             except Exception as e:
@@ -516,7 +664,7 @@ class GameCheater(QMainWindow):
             self.logger.info(f"已停止 {searching_count} 个正在进行的搜索任务")
 
         self.result_table.setRowCount(0)
-        self.locked_addresses.clear()
+        self.lock_registry.clear()
         self.statusBar().showMessage('已清空修改列表')
 
     def _on_result_item_changed(self, item):
@@ -527,8 +675,8 @@ class GameCheater(QMainWindow):
             row = item.row()
             col = item.column()
 
-            # 只处理数值列(2)和锁定列(4)的改变
-            if col not in [2, 4]:
+            # 只处理数值列(2)、类型列(3)和锁定列(4)的改变
+            if col not in [2, 3, 4]:
                 return
 
             # 获取必要的值，并进行空值检查
@@ -541,7 +689,7 @@ class GameCheater(QMainWindow):
                 return
 
             addr = int(addr_item.text(), 16)  # 获取地址
-            value_type = type_item.text()     # 获取类型
+            value_type = get_type_by_text(type_item.text(), 'int32')  # 获取类型
             value_text = value_item.text()    # 获取值
 
             # 保存原始值类型，避免影响其他任务
@@ -549,21 +697,10 @@ class GameCheater(QMainWindow):
 
             if col == 2:  # 数值列
                 try:
-                    # 根据类型转换值并写入内存
-                    if value_type == '整数':
-                        value = int(value_text)
-                        if value < 0:
-                            value = value & 0xFFFFFFFF
-                        buffer = value.to_bytes(4, 'little')
-                        self.memory_reader.current_value_type = 'int32'
-                    elif value_type == '浮点':
-                        value = float(value_text)
-                        buffer = struct.pack('<f', value)
-                        self.memory_reader.current_value_type = 'float'
-                    else:  # 双精度
-                        value = float(value_text)
-                        buffer = struct.pack('<d', value)
-                        self.memory_reader.current_value_type = 'double'
+                    # 根据类型转换值并写入内存，超出类型范围时抛出ValueError
+                    value = parse_value(value_text, value_type)
+                    buffer = pack_value(value, value_type)
+                    self.memory_reader.current_value_type = value_type
 
                     # 写入内存前检查进程是否还在运行
                     if not self.memory_reader.process_handle:
@@ -577,8 +714,7 @@ class GameCheater(QMainWindow):
                             self.statusBar().showMessage(f"成功修改值: {value}")
 
                             # 如果该地址被锁定，更新锁定值
-                            if addr in self.locked_addresses:
-                                self.locked_addresses[addr] = value
+                            self.lock_registry.update(addr, value)
                         else:
                             raise Exception("写入验证失败")
                     else:
@@ -588,34 +724,45 @@ class GameCheater(QMainWindow):
                     self.logger.error(f"输入的值格式无效: {value_text} - {str(e)}")
                     self.statusBar().showMessage("请输入有效的数值")
                     # 恢复原值
-                    item.setText(str(self.locked_addresses.get(addr, value_text)))
+                    item.setText(self._locked_text(addr, value_text))
                 except Exception as e:
                     self.logger.error(f"写入内存时出错: {str(e)}")
                     self.statusBar().showMessage("写入内存失败")
                     # 恢复原值
-                    item.setText(str(self.locked_addresses.get(addr, value_text)))
+                    item.setText(self._locked_text(addr, value_text))
+
+            elif col == 3:  # 类型列
+                # 锁定表只在用户修改行时更新：类型改变后按新类型重新打包锁定值
+                entry = self.lock_registry.get(addr)
+                if entry is not None and value_type != entry.value_type:
+                    try:
+                        self.lock_registry.update(addr, value_type=value_type)
+                    except ValueError:
+                        self.logger.error(f"锁定值 {entry.value} 无法用 {type_item.text()} 表示，已解除锁定")
+                        self.lock_registry.remove(addr)
+                        lock_item = self.result_table.item(row, 4)
+                        if lock_item:
+                            lock_item.setText("否")
 
             elif col == 4:  # 锁定列
-                is_locked = item.text().lower() == "是"
-                if is_locked:
-                    # 获取当前值并添加到锁定列表
+                mode = get_freeze_mode(item.text())
+                if mode is not None:
+                    # 按当前值和选择的锁定方式锁定，值无效或超出类型范围时抛出ValueError
                     try:
-                        if value_type == '整数':
-                            value = int(value_text)
-                        elif value_type == '浮点':
-                            value = float(value_text)
-                        else:  # 双精度
-                            value = float(value_text)
-                        self.locked_addresses[addr] = value
+                        entry = self.lock_registry.get(addr)
+                        if entry is not None and entry.value_type == value_type:
+                            self.lock_registry.update(addr, mode=mode)  # 只改变锁定方式，保留锁定值
+                        else:
+                            self.lock_registry.add(addr, value_type, value_text, mode)
                     except ValueError:
                         self.logger.error("无法锁定：无效的值")
                         item.setText("否")
+                        return
                 else:
-                    # 从锁定列表中移除
-                    if addr in self.locked_addresses:
-                        del self.locked_addresses[addr]
+                    # 解除锁定
+                    self.lock_registry.remove(addr)
 
-                self.logger.info(f"地址 {hex(addr)} 锁定状态: {is_locked}")
+                self.logger.info(f"地址 {hex(addr)} 锁定状态: {item.text()}")
 
         except Exception as e:
             self.logger.error(f"处理值改变事件失败: {str(e)}")
@@ -625,166 +772,34 @@ class GameCheater(QMainWindow):
             if original_value_type is not None:
                 self.memory_reader.current_value_type = original_value_type
 
-    def _update_locked_values(self):
-        """更新锁定的值"""
-        # 在try块外定义original_value_type变量
-        original_value_type = None
-        try:
-            # 保存原始值类型，避免影响其他任务
-            original_value_type = self.memory_reader.current_value_type
-
-            for addr, value in self.locked_addresses.items():
-                try:
-                    if isinstance(value, int):
-                        buffer = value.to_bytes(4, 'little', signed=True)
-                        self.memory_reader.current_value_type = 'int32'
-                    elif isinstance(value, float):
-                        # 查找该地址在结果表格中的类型
-                        is_double = False
-                        try:
-                            for row in range(self.result_table.rowCount()):
-                                addr_item = self.result_table.item(row, 1)
-                                if addr_item and int(addr_item.text(), 16) == addr:
-                                    type_item = self.result_table.item(row, 3)
-                                    if type_item and type_item.text() == '双精度':
-                                        is_double = True
-                                        # self.logger.debug(f"检测到双精度浮点数: 地址={hex(addr)}, 值={value}")
-                                    break
-                        except Exception as e:
-                            self.logger.debug(f"检测双精度类型时出错: {str(e)}")
-                            # 默认使用单精度浮点数
-                            is_double = False
-
-                        try:
-                            if is_double:
-                                buffer = struct.pack('<d', value)
-                                self.memory_reader.current_value_type = 'double'
-                            else:
-                                buffer = struct.pack('<f', value)
-                                self.memory_reader.current_value_type = 'float'
-                        except struct.error as e:
-                            self.logger.debug(f"打包浮点数时出错: {str(e)}, 值={value}, 类型={'双精度' if is_double else '单精度'}")
-                            continue
-                    else:
-                        self.logger.debug(f"不支持的值类型: {type(value)}, 地址={hex(addr)}")
-                        continue
-
-                    # 检查进程是否还在运行
-                    if not self.memory_reader.process_handle:
-                        self.logger.debug("进程未附加或已退出，无法更新锁定值")
-                        break
-
-                    # 写入内存前检查buffer是否有效
-                    if not buffer:
-                        self.logger.debug(f"无效的缓冲区: 地址={hex(addr)}, 值={value}")
-                        continue
-
-                    if not self.memory_reader.write_memory(addr, buffer):
-                        self.logger.debug(f"无法写入锁定地址: {hex(addr)}")
-                except Exception as e:
-                    self.logger.debug(f"更新锁定值失败: {hex(addr)} - {str(e)}")
-
-        except Exception as e:
-            self.logger.error(f"更新锁定值时出错: {str(e)}")
-            import traceback
-            self.logger.debug(traceback.format_exc())
-        finally:
-            # 恢复原始值类型，避免影响其他任务
-            if original_value_type is not None:
-                self.memory_reader.current_value_type = original_value_type
+    def _locked_text(self, addr, default):
+        """返回锁定地址的锁定值文本，未锁定时返回default"""
+        entry = self.lock_registry.get(addr)
+        return format_value(entry.value, entry.value_type) if entry is not None else default
 
     def _refresh_memory_table(self):
-        """刷新内存表格显示"""
-        # 在try块外定义original_value_type变量
-        original_value_type = None
+        """刷新内存表格显示
+
+        只通知模型重新读取可见的行，刷新耗时与搜索结果数量无关。
+        """
         try:
             current_task = self.task_manager.get_current_task()
             if not current_task or not current_task.memory_table:
                 return
 
-            # 保存原始值类型，避免影响其他任务
-            original_value_type = self.memory_reader.current_value_type
-
-            try:
-                for row in range(current_task.memory_table.rowCount()):
-                    addr_item = current_task.memory_table.item(row, 0)
-                    if not addr_item:
-                        continue
-
-                    addr = int(addr_item.text(), 16)
-                    # 根据任务的值类型决定读取大小
-                    value_type = current_task.value_type
-                    if not value_type:
-                        value_type = 'int32'  # 默认为整数
-
-                    size = 8 if value_type == 'double' else 4
-
-                    # 临时设置memory_reader的值类型为当前任务的值类型
-                    self.memory_reader.current_value_type = value_type
-
-                    value = self.memory_reader.read_memory(addr, size)
-
-                    if value:
-                        try:
-                            if value_type == 'int32':
-                                current_value = str(int.from_bytes(value, 'little', signed=True))
-                            elif value_type == 'float':
-                                current_value = f"{struct.unpack('<f', value)[0]:.6f}"
-                            else:  # double
-                                current_value = f"{struct.unpack('<d', value)[0]:.6f}"
-
-                            # 更新当前值
-                            current_item = current_task.memory_table.item(row, 1)
-                            if current_item:
-                                current_item.setText(current_value)
-
-                            # 更新先前值（如果有）
-                            prev_value = current_task.prev_values.get(addr)
-                            prev_item = current_task.memory_table.item(row, 2)
-                            if prev_item:
-                                if prev_value is not None:
-                                    if value_type == 'int32':
-                                        prev_text = str(prev_value)
-                                    else:  # float or double
-                                        prev_text = f"{prev_value:.6f}"
-                                else:
-                                    prev_text = "-"
-                                prev_item.setText(prev_text)
-
-                            # 更新首次值（如果有）
-                            first_value = current_task.first_values.get(addr)
-                            first_item = current_task.memory_table.item(row, 3)
-                            if first_item:
-                                if first_value is not None:
-                                    if value_type == 'int32':
-                                        first_text = str(first_value)
-                                    else:  # float or double
-                                        first_text = f"{first_value:.6f}"
-                                else:
-                                    first_text = "-"
-                                first_item.setText(first_text)
-
-                            # 高亮显示变化的值
-                            if prev_value is not None and current_item:
-                                if value_type == 'int32':
-                                    has_changed = int(current_value) != prev_value
-                                else:  # float or double
-                                    has_changed = abs(float(current_value) - prev_value) > 1e-6
-                                if has_changed:
-                                    current_item.setBackground(Qt.yellow)
-                                else:
-                                    current_item.setBackground(Qt.white)
-
-                        except Exception as e:
-                            self.logger.debug(f"格式化值失败: {str(e)}")
-            except Exception as e:
-                self.logger.error(f"刷新内存表格失败: {str(e)}")
-                import traceback
-                self.logger.debug(traceback.format_exc())
-        finally:
-            # 恢复原始值类型，避免影响其他任务
-            if original_value_type is not None:
-                self.memory_reader.current_value_type = original_value_type
+            table = current_task.memory_table
+            model = table.model()
+            if not model.rowCount():
+                return
+            first = table.rowAt(0)
+            if first < 0:
+                return
+            last = table.rowAt(table.viewport().height() - 1)
+            model.refresh(first, last if last >= 0 else model.rowCount() - 1)
+        except Exception as e:
+            self.logger.error(f"刷新内存表格失败: {str(e)}")
+            import traceback
+            self.logger.debug(traceback.format_exc())
 
     def _refresh_result_table(self):
         """刷新结果表格显示"""
@@ -802,66 +817,32 @@ class GameCheater(QMainWindow):
                     continue
 
                 addr = int(addr_item.text(), 16)
-                value_type = type_item.text()
-                is_locked = lock_item.text() == "是"
+                value_type = get_type_by_text(type_item.text())
+                if value_type not in VALUE_TYPES:
+                    continue
+                is_locked = get_freeze_mode(lock_item.text()) is not None
 
-                # 如果是锁定的地址，使用锁定的值
-                if is_locked and addr in self.locked_addresses:
-                    locked_value = self.locked_addresses[addr]
-                    try:
-                        # 根据类型格式化锁定值
-                        if value_type == '整数':
-                            self.memory_reader.current_value_type = 'int32'
-                            buffer = int(locked_value).to_bytes(4, 'little', signed=True)
-                            if not self.memory_reader.write_memory(addr, buffer):
-                                self.logger.debug(f"写入锁定值失败: {addr}")
-                                continue
-                            current_value = str(locked_value)
-                        elif value_type == '浮点':
-                            self.memory_reader.current_value_type = 'float'
-                            buffer = struct.pack('<f', float(locked_value))
-                            if not self.memory_reader.write_memory(addr, buffer):
-                                self.logger.debug(f"写入锁定值失败: {addr}")
-                                continue
-                            current_value = f"{locked_value:.6f}"
-                        elif value_type == '双精度':
-                            self.memory_reader.current_value_type = 'double'
-                            buffer = struct.pack('<d', float(locked_value))
-                            if not self.memory_reader.write_memory(addr, buffer):
-                                self.logger.debug(f"写入锁定值失败: {addr}")
-                                continue
-                            current_value = f"{locked_value:.6f}"
-                        else:
-                            continue
-                    except (ValueError, struct.error) as e:
-                        self.logger.debug(f"处理锁定值失败: {str(e)}")
-                        continue
+                # 始终写入的锁定地址显示锁定的值（由freeze_engine写入）；
+                # 条件写入的锁定地址使用写入线程本周期读取到的值，不再单独读取
+                entry = self.lock_registry.get(addr) if is_locked else None
+                if entry is not None and not entry.conditional:
+                    current_value = format_value(entry.value, entry.value_type)
                 else:
                     # 读取内存值
-                    size = 8 if value_type == '双精度' else 4
+                    size = get_value_size(value_type)
 
                     # 设置正确的值类型
-                    if value_type == '整数':
-                        self.memory_reader.current_value_type = 'int32'
-                    elif value_type == '浮点':
-                        self.memory_reader.current_value_type = 'float'
-                    elif value_type == '双精度':
-                        self.memory_reader.current_value_type = 'double'
-
-                    value = self.memory_reader.read_memory(addr, size)
+                    self.memory_reader.current_value_type = value_type
+
+                    value = self.freeze_engine.observed(addr) if entry is not None else None
+                    if value is None or len(value) != size:
+                        value = self.memory_reader.read_memory_view(addr, size)
                     if not value:
                         continue
 
                     # 根据类型转换值
                     try:
-                        if value_type == '整数':
-                            current_value = str(int.from_bytes(value, 'little', signed=True))
-                        elif value_type == '浮点':
-                            current_value = f"{struct.unpack('<f', value)[0]:.6f}"
-                        elif value_type == '双精度':
-                            current_value = f"{struct.unpack('<d', value)[0]:.6f}"
-                        else:
-                            continue
+                        current_value = format_value(unpack_value(value, value_type), value_type)
                     except (ValueError, struct.error) as e:
                         self.logger.debug(f"转换值失败: {str(e)}")
                         continue
@@ -930,18 +911,13 @@ class GameCheater(QMainWindow):
 
                 try:
                     # 验证数据类型
-                    if value_type not in ['int32', 'float', 'double']:
+                    if value_type not in VALUE_TYPES:
                         self.logger.error(f"不支持的值类型: {value_type}")
                         self.statusBar().showMessage(f"不支持的数据类型: {value_type}", 3000)
                         return
 
                     # 记录数据类型信息
-                    type_mapping = {
-                        'int32': '整数',
-                        'float': '浮点',
-                        'double': '双精度'
-                    }
-                    self.logger.debug(f"使用数据类型: {value_type} ({type_mapping.get(value_type, '未知')})")
+                    self.logger.debug(f"使用数据类型: {value_type} ({VALUE_TYPES[value_type]['display']})")
 
                     # 设置当前值类型
                     self.memory_reader.current_value_type = value_type
@@ -982,7 +958,7 @@ class GameCheater(QMainWindow):
                             if is_locked and lock_value is not None:
                                 try:
                                     # 添加到锁定地址
-                                    self.locked_addresses[address] = lock_value
+                                    self.lock_registry.add(address, value_type, lock_value)
                                     self.logger.debug(f"自动锁定地址: {hex(address)}, 值={lock_value}")
                                 except Exception as e:
                                     self.logger.error(f"锁定地址时出错: {str(e)}")
@@ -13,7 +13,21 @@ import time
 import os
 import concurrent.futures
 import threading
+from array import array
 from PyQt5.QtCore import QThread
+from utils.scan_engine import (get_scan_engine, iter_scan_windows, filter_candidates, join_groups, scan_labeled,
+                               window_keep, HAS_NUMPY, RELATION_COMPARES)
+from utils import scan_worker
+from utils.buffer_pool import BufferPool
+from utils.candidate_set import CandidateSet, TaggedCandidateSet, DEFAULT_MEMORY_BUDGET
+from utils.snapshot_store import PAGE_SIZE, SnapshotStore
+from utils.byte_pattern import BytePattern, TextPattern, filter_pattern_candidates
+from utils.value_types import (ALL_TYPES, PATTERN_TYPES, TEXT_TYPE, get_type_info, get_value_size, parse_value, pack_value,
+                               unpack_value, format_value, types_for_value)
+from utils.region_map import Region, RegionMap
+
+# 记录调用错误码的kernel32，失败时通过ctypes.get_last_error()读取错误码（ctypes.windll不记录）
+kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
 
 # 定义内存信息结构体
 class MEMORY_BASIC_INFORMATION(Structure):
@@ -27,13 +41,20 @@ class MEMORY_BASIC_INFORMATION(Structure):
         ("Type", wintypes.DWORD),
     ]
 
-# 定义内存保护常量
-PAGE_READABLE = (
-    win32con.PAGE_EXECUTE_READ |
-    win32con.PAGE_EXECUTE_READWRITE |
-    win32con.PAGE_READONLY |
-    win32con.PAGE_READWRITE
-)
+# 大区域流式扫描的窗口大小，需为各数值类型大小的整数倍
+SCAN_WINDOW_SIZE = 4 * 1024 * 1024
+
+# 首次扫描的并行模式：'thread' 使用线程池，'process' 使用进程池绕过GIL
+SCAN_MODES = ('thread', 'process')
+
+# 后续扫描每批处理的候选地址数量（每批更新一次进度）
+NEXT_SCAN_BATCH_SIZE = 64 * 1024
+
+# 多进程模式下每个分片包含的区域字节数
+PROCESS_SHARD_BYTES = 64 * 1024 * 1024
+
+# 区域表在该秒数内刷新过时，首次扫描直接使用，不再逐个查询区域（如分组扫描、连续的首次扫描）
+REGION_MAP_MAX_AGE = 2.0
 
 # 在文件开头添加
 class SYSTEM_INFO(ctypes.Structure):
@@ -62,6 +83,15 @@ class MemoryReader:
         self._thread_local.is_running = True  # 默认为运行状态
         self.active_tasks = []  # 存储当前活动的任务
         self._tasks_lock = threading.Lock()  # 用于保护active_tasks的锁
+        self.scan_engine = get_scan_engine()  # 首次扫描使用的比较引擎
+        self.scan_mode = 'thread'  # 扫描的并行模式，见SCAN_MODES
+        self._process_pool = None  # 多进程扫描使用的进程池，按需创建
+        self._thread_pool = None   # 线程模式扫描使用的线程池，按需创建
+        self._read_pool = BufferPool()  # 小块读取复用的缓冲区，每个线程一块
+        self._window_pool = BufferPool(SCAN_WINDOW_SIZE)  # 流式扫描窗口复用的缓冲区，每个线程一块
+        self.candidate_memory_budget = DEFAULT_MEMORY_BUDGET  # 候选地址的内存预算，超过后转存到临时文件
+        self.region_map = None  # 目标进程的内存区域表，首次扫描时创建，之后的扫描前刷新
+        self.region_filter = None  # 首次扫描默认的区域筛选条件，为None时扫描全部可读区域
 
     @property
     def is_running(self):
@@ -95,13 +125,41 @@ class MemoryReader:
 
             self.process_handle = process_handle
             self.process_id = pid
+
+            # 工作进程缓存了之前目标进程的句柄，重建进程池时随工作进程一起关闭
+            self.shutdown_process_pool()
+
+            # 内存区域在首次扫描时枚举，之后的扫描只需增量刷新
+            self.region_map = None
             return True, "成功"
         except Exception as e:
             self.logger.error(f"附加进程失败: {str(e)}")
             return False, str(e)
 
-    def search_value(self, value, value_type='float', compare_type='exact', last_results=None, progress_callback=None):
-        """搜索内存中的值"""
+    def search_value(self, value, value_type='float', compare_type='exact', last_results=None, progress_callback=None,
+                     scan_mode=None, region_filter=None, unaligned=False):
+        """搜索内存中的值
+
+        参数:
+            value: 搜索值；未知初始值扫描及与先前快照比较时为None
+            value_type: 数值类型；ALL_TYPES表示所有数值类型，一次读取内存同时按各类型比较；
+                        字节数组、文本等模式类型转交search_pattern
+            compare_type: 比较方式；'unknown'表示未知初始值（模糊值）首次扫描
+            last_results: 上次搜索结果（CandidateSet或SnapshotStore），为None时为首次扫描
+            scan_mode: 扫描的并行模式（'thread' 或 'process'），为None时使用self.scan_mode
+            region_filter: 首次扫描的区域筛选条件（RegionFilter），为None时使用self.region_filter
+            unaligned: 首次扫描是否检查每个字节偏移（非对齐扫描），默认只检查按数值大小对齐的位置
+
+        返回:
+            按地址升序排列的CandidateSet；未知初始值扫描返回SnapshotStore；
+            所有数值类型扫描返回按类型分组的TaggedCandidateSet
+        """
+        if value_type in PATTERN_TYPES:
+            if value_type == TEXT_TYPE and isinstance(value, str):
+                value = TextPattern(value)  # 未指定编码时按UTF-8查找
+            return self.search_pattern(value, compare_type, last_results, progress_callback,
+                                       scan_mode, region_filter)
+
         self.logger.info(f"开始搜索值: {value}, 类型: {value_type}, 比较方式: {compare_type}")
 
         # 保存原始值类型，避免影响其他任务
@@ -113,57 +171,44 @@ class MemoryReader:
         # 记录开始时间
         start_time = time.time()
 
-        # 初始化结果列表
-        results = []
+        # 初始化结果集合，超过内存预算时自动转存到临时文件
+        all_types = value_type == ALL_TYPES
+        results = CandidateSet(memory_budget=self.candidate_memory_budget,
+                               value_type=None if all_types else value_type)
 
         # 设置搜索参数
         self.is_running = True
 
         try:
-            # 转换值类型
-            if value_type == 'int32':
-                value_num = int(value)
-                value_size = 4
-                alignment = 4  # 整数通常是4字节对齐
-                pattern = struct.pack('<i', value_num)
-            elif value_type == 'float':
-                value_num = float(value)
-                value_size = 4
-                alignment = 4  # 浮点数通常是4字节对齐
-                pattern = struct.pack('<f', value_num)
-            elif value_type == 'double':
-                value_num = float(value)
-                value_size = 8
-                alignment = 8  # 双精度浮点数通常是8字节对齐
-                pattern = struct.pack('<d', value_num)
+            # 转换值类型，未知初始值扫描和与先前值比较时没有搜索值
+            if all_types:
+                value_size = max(get_value_size(target) for target, _ in types_for_value(0))
+                if compare_type == 'unknown':
+                    raise ValueError("模糊值扫描需要指定数值类型")
             else:
-                raise ValueError(f"不支持的值类型: {value_type}")
-
-            # 记录搜索模式的十六进制表示，便于调试
-            hex_pattern = ' '.join([f'{b:02x}' for b in pattern])
-            self.logger.debug(f"搜索模式: {hex_pattern} (类型: {value_type})")
-
-            # 辅助函数：比较浮点数
-            def compare_float(a, b, epsilon=None):
-                # 根据值的大小动态调整精度
-                if epsilon is None:
-                    if value_type == 'float':
-                        # 单精度浮点数使用更宽松的比较
-                        epsilon = max(1e-4, abs(b) * 1e-4)
-                    else:  # double
-                        # 双精度浮点数使用更精确的比较
-                        epsilon = max(1e-8, abs(b) * 1e-8)
-
-                # 检查是否为有效浮点数
-                if math.isnan(a) or math.isinf(a) or math.isnan(b) or math.isinf(b):
-                    return False
-
-                # 对于接近0的值使用绝对比较
-                if abs(b) < 1e-6:
-                    return abs(a) < 1e-6
-
-                # 对于其他值使用相对比较
-                return abs(a - b) < epsilon
+                value_size = get_value_size(value_type)  # 不支持的类型抛出ValueError
+            # 数值通常按自身大小对齐；非对齐扫描检查每个字节偏移，用于结构体或序列化数据中紧凑排列的数值
+            alignment = 1 if unaligned else value_size
+            if unaligned and compare_type == 'unknown':
+                self.logger.info("模糊值扫描按对齐位置保存快照，忽略非对齐选项")
+            if last_results is None and compare_type in RELATION_COMPARES:
+                raise ValueError("首次搜索无法与先前值比较")
+            if value is None:
+                value_num = None
+                if last_results is None and compare_type != 'unknown':
+                    raise ValueError("首次搜索需要提供搜索值")
+                # 没有搜索值时，大于/小于表示与先前值相比增大/减小
+                compare_type = {'bigger': 'increased', 'smaller': 'decreased'}.get(compare_type, compare_type)
+            elif all_types:
+                value_num = value
+            else:
+                value_num = parse_value(value, value_type)
+                try:
+                    # 记录搜索模式的十六进制表示，便于调试
+                    hex_pattern = ' '.join([f'{b:02x}' for b in pack_value(value_num, value_type)])
+                    self.logger.debug(f"搜索模式: {hex_pattern} (类型: {value_type})")
+                except ValueError:
+                    self.logger.debug(f"搜索值 {value_num} 超出 {value_type} 的范围")
 
             # 添加性能日志
             total_checked = 0
@@ -199,112 +244,83 @@ class MemoryReader:
                     # 让出CPU时间，减少UI卡顿
                     QThread.yieldCurrentThread()
 
+            # 当前搜索使用的比较引擎
+            engine = self.scan_engine
+            self.logger.info(f"使用 {engine.name} 比较引擎")
+
             # 如果是在指定结果中搜索
-            if last_results is not None:
+            if isinstance(last_results, SnapshotStore):
+                # 未知初始值扫描：将当前内存与上一次快照比较
+                if last_results.value_type != value_type:
+                    raise ValueError("模糊扫描过程中不能更改数值类型")
+                total_checked = len(last_results)
+                self.logger.info(f"在快照的 {total_checked} 个位置中搜索 ({last_results.page_count} 个页面)")
+                results = last_results.narrow(
+                    self.read_memory_view, engine, compare_type, value_num,
+                    is_running=lambda: self.is_running,
+                    progress_callback=throttled_progress_callback
+                )
+                total_bytes = last_results.page_count * PAGE_SIZE
+
+            elif isinstance(last_results, TaggedCandidateSet):
+                # 所有数值类型扫描的结果：按类型分组分别筛选
                 total_count = len(last_results)
-                self.logger.info(f"在 {total_count} 个先前结果中搜索")
-                # 批量读取内存以提高效率
-                batch_size = 1000  # 每批处理的地址数量
-                for i in range(0, total_count, batch_size):
-                    batch_addresses = last_results[i:i+batch_size]
-                    batch_results = []
-
-                    # 处理每个地址
-                    for addr in batch_addresses:
-                        try:
-                            data = self.read_memory(addr, value_size)
-                            total_checked += 1
-                            if data and len(data) == value_size:
-                                # 根据类型解析内存值
-                                try:
-                                    if value_type == 'int32':
-                                        current_value = int.from_bytes(data, 'little', signed=True)
-                                        match = current_value == value_num if compare_type == 'exact' else \
-                                               current_value > value_num if compare_type == 'bigger' else \
-                                               current_value < value_num if compare_type == 'smaller' else False
-                                    else:  # float or double
-                                        try:
-                                            if value_type == 'float':
-                                                current_value = struct.unpack('<f', data)[0]
-                                            else:  # double
-                                                current_value = struct.unpack('<d', data)[0]
-
-                                            # 检查是否是有效的浮点数
-                                            if math.isnan(current_value) or math.isinf(current_value):
-                                                continue
-
-                                            # 对于浮点数，使用更宽松的比较
-                                            if compare_type == 'exact':
-                                                match = compare_float(current_value, value_num)
-                                                # 记录一些匹配的值，帮助调试
-                                                if match and i < 10:  # 只记录前10个匹配的值
-                                                    self.logger.debug(f"浮点数匹配: 内存值={current_value:.10f}, 搜索值={value_num:.10f}, 地址={hex(addr)}")
-                                            elif compare_type == 'bigger':
-                                                match = current_value > value_num
-                                            elif compare_type == 'smaller':
-                                                match = current_value < value_num
-                                            else:
-                                                match = False
-                                        except (struct.error, ValueError, OverflowError):
-                                            continue
-
-                                    if match:
-                                        batch_results.append(addr)
-                                except (struct.error, ValueError, OverflowError):
-                                    continue
-                        except Exception as e:
-                            self.logger.debug(f"读取内存失败: {str(e)}")
-
-                    # 添加批次结果
-                    results.extend(batch_results)
-
-                    # 更新进度
-                    throttled_progress_callback(i + batch_size if i + batch_size < total_count else total_count, total_count)
-
-                    # 检查是否被取消
+                self.logger.info(f"在 {total_count} 个先前结果中搜索 ({len(last_results.parts)} 种类型)")
+                scan_mode = scan_mode or self.scan_mode
+                if scan_mode not in SCAN_MODES:
+                    raise ValueError(f"不支持的扫描模式: {scan_mode}")
+
+                parts = {}
+                read_count = 0
+                for part_type, part in last_results.parts.items():
                     if not self.is_running:
-                        self.logger.info("搜索被用户取消")
                         break
+                    part_value = self._value_for_type(value_num, part_type, compare_type)
+                    if value_num is not None and part_value is None:
+                        continue  # 搜索值无法用该类型表示，该类型的候选全部淘汰
+                    offset = total_checked
+                    parts[part_type], part_checked, part_reads = self._filter_candidates_parallel(
+                        part, part_type, compare_type, part_value, scan_mode,
+                        lambda current, total, offset=offset: throttled_progress_callback(offset + current, total_count)
+                    )
+                    total_checked += part_checked
+                    read_count += part_reads
+                results = TaggedCandidateSet(parts)
+                self.logger.debug(f"后续扫描: {total_checked} 个候选地址, {read_count} 次内存读取")
+
+            elif last_results is not None:
+                if all_types:
+                    raise ValueError("上次结果不是所有类型扫描的结果，请指定数值类型")
+                total_count = len(last_results)
+                self.logger.info(f"在 {total_count} 个先前结果中搜索")
+                scan_mode = scan_mode or self.scan_mode
+                if scan_mode not in SCAN_MODES:
+                    raise ValueError(f"不支持的扫描模式: {scan_mode}")
 
-                    # 让出CPU时间，避免UI卡顿
-                    QThread.yieldCurrentThread()
+                # 候选地址按地址分片，在首次扫描使用的同一个执行器上并行筛选
+                results, total_checked, read_count = self._filter_candidates_parallel(
+                    CandidateSet.from_iterable(last_results), value_type, compare_type, value_num,
+                    scan_mode, throttled_progress_callback
+                )
+                self.logger.debug(f"后续扫描: {total_checked} 个候选地址, {read_count} 次内存读取")
 
             # 如果是搜索整个内存
             else:
-                # 获取系统信息
-                system_info = SYSTEM_INFO()
-                kernel32 = ctypes.windll.kernel32
-                kernel32.GetSystemInfo(ctypes.byref(system_info))
-
-                # 设置搜索范围
-                min_address = system_info.lpMinimumApplicationAddress
-                max_address = system_info.lpMaximumApplicationAddress
-
-                # 准备搜索
-                current_address = min_address
-                memory_regions = []  # 存储可搜索的内存区域
-
-                # 首先收集所有可搜索的内存区域
-                while current_address < max_address:
-                    mbi = MEMORY_BASIC_INFORMATION()
-                    if kernel32.VirtualQueryEx(
-                        self.process_handle.handle,
-                        ctypes.c_void_p(current_address),
-                        ctypes.byref(mbi),
-                        ctypes.sizeof(mbi)
-                    ):
-                        # 放宽内存区域筛选条件，包括更多可能包含浮点数的区域
-                        if (mbi.State == win32con.MEM_COMMIT and
-                            (mbi.Protect & PAGE_READABLE) and  # 使用可读常量
-                            not mbi.Protect & win32con.PAGE_GUARD):
-                            memory_regions.append((mbi.BaseAddress, mbi.RegionSize))
-                        current_address = mbi.BaseAddress + mbi.RegionSize
-                    else:
-                        break
+                # 刷新区域表（刚刷新过时直接使用，否则复用未变化的区域），收集所有可搜索的内存区域
+                region_map = self.get_region_map()
+                region_map.refresh(REGION_MAP_MAX_AGE)
+                if region_filter is None:
+                    region_filter = self.region_filter
+                # 所有数值类型扫描的各类型在扫描时各自对齐，裁剪后的起始地址不按最大的类型取整
+                memory_regions = region_map.readable_regions(region_filter, 1 if all_types else alignment)
+                if region_filter is not None:
+                    self.logger.info(f"区域筛选: {region_filter}")
 
                 total_count = len(memory_regions)
                 total_regions = total_count
-                self.logger.info(f"找到 {total_count} 个可搜索内存区域")
+                self.logger.info(f"找到 {total_count} 个可搜索内存区域 "
+                                 f"(共 {len(region_map)} 个区域, {region_map.changed} 个有变化, "
+                                 f"累计查询 {region_map.queries} 次, 省去 {region_map.saved} 次)")
 
                 region_start_time = time.time()
 
@@ -312,62 +328,20 @@ class MemoryReader:
                 # 定义区域搜索函数
                 def search_region(region_info):
                     base_address, region_size = region_info
-                    region_results = []
+                    region_results = CandidateSet(memory_budget=self.candidate_memory_budget, value_type=value_type)
                     region_checked = 0
+                    region_bytes = 0
 
                     try:
-                        # 读取内存区域
-                        data = self.read_memory(base_address, region_size)
-                        if not data:
-                            return [], 0, 0
-
-                        region_bytes = len(data)
-
-                        # 限制单次处理的数据量，避免处理过大的区域导致性能问题
-                        max_process_size = min(region_bytes, 10 * 1024 * 1024)  # 最多处理10MB
-
-                        # 根据数据类型的对齐方式搜索
-                        for i in range(0, max_process_size - value_size + 1, alignment):
-                            chunk = data[i:i + value_size]
-                            region_checked += 1
-
-                            if len(chunk) == value_size:
-                                try:
-                                    if value_type == 'int32':
-                                        current_value = int.from_bytes(chunk, 'little', signed=True)
-                                        match = current_value == value_num if compare_type == 'exact' else \
-                                               current_value > value_num if compare_type == 'bigger' else \
-                                               current_value < value_num if compare_type == 'smaller' else False
-                                    else:  # float or double
-                                        try:
-                                            if value_type == 'float':
-                                                current_value = struct.unpack('<f', chunk)[0]
-                                            else:  # double
-                                                current_value = struct.unpack('<d', chunk)[0]
-
-                                            # 检查是否是有效的浮点数
-                                            if math.isnan(current_value) or math.isinf(current_value):
-                                                continue
-
-                                            # 对于浮点数，使用更宽松的比较
-                                            if compare_type == 'exact':
-                                                match = compare_float(current_value, value_num)
-                                                # 记录一些匹配的值，帮助调试
-                                                if match and i < 10:  # 只记录前10个匹配的值
-                                                    self.logger.debug(f"浮点数匹配: 内存值={current_value:.10f}, 搜索值={value_num:.10f}, 地址={hex(base_address + i)}")
-                                            elif compare_type == 'bigger':
-                                                match = current_value > value_num
-                                            elif compare_type == 'smaller':
-                                                match = current_value < value_num
-                                            else:
-                                                match = False
-                                        except (struct.error, ValueError, OverflowError):
-                                            continue
-
-                                    if match:
-                                        region_results.append(base_address + i)
-                                except (struct.error, ValueError, OverflowError):
-                                    continue
+                        # 按固定大小的窗口流式读取区域，窗口之间重叠value_size-1字节
+                        for window_base, window in self.iter_region_windows(base_address, region_size, value_size - 1):
+                            # 使用比较引擎整体比较，得到匹配数值的偏移量
+                            offsets = engine.scan(window, value_type, compare_type, value_num, alignment)
+                            region_results.extend_offsets(window_base, offsets)
+                            # 同时记录匹配位置的数值，后续扫描与之比较
+                            region_results.values.extend(engine.read_values(window, value_type, offsets))
+                            region_checked += max(0, (len(window) - value_size) // alignment + 1)
+                            region_bytes += len(window)
 
                             # 检查是否被用户取消
                             if not self.is_running:
@@ -378,19 +352,45 @@ class MemoryReader:
 
                     return region_results, region_checked, region_bytes
 
-                # 使用线程池并行处理内存区域
-                max_workers = min(8, os.cpu_count() or 4)  # 最多使用8个线程
-                self.logger.info(f"使用 {max_workers} 个线程并行搜索")
+                scan_mode = scan_mode or self.scan_mode
+                if scan_mode not in SCAN_MODES:
+                    raise ValueError(f"不支持的扫描模式: {scan_mode}")
+
+                if compare_type == 'unknown':
+                    # 未知初始值：保存所有可读页面的快照，之后与快照比较
+                    results, total_bytes = self._capture_snapshot(memory_regions, value_type,
+                                                                  throttled_progress_callback)
+                    total_checked = len(results)
+                elif all_types:
+                    # 所有数值类型：每个区域只读取一次，同时按各类型比较
+                    targets = types_for_value(value_num)
+                    self.logger.info(f"所有数值类型扫描: {', '.join(target for target, _ in targets)}")
+                    parts, total_checked, total_bytes = self._scan_regions_tagged(
+                        memory_regions, [(target, target, target_value) for target, target_value in targets],
+                        compare_type, scan_mode, throttled_progress_callback, 1 if unaligned else None
+                    )
+                    results = TaggedCandidateSet(parts)
+                elif scan_mode == 'process':
+                    # 使用进程池并行处理内存区域，比较阶段不受GIL限制
+                    results, total_checked, total_bytes = self._scan_regions_multiprocess(
+                        memory_regions, value_type, compare_type, value_num, alignment,
+                        throttled_progress_callback
+                    )
+                else:
+                    # 使用线程池并行处理内存区域
+                    executor = self._get_thread_pool()
 
-                # 优化：分批提交任务，避免一次性创建过多线程导致内存占用过高
-                batch_size = 50  # 每批处理的区域数量
-                with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    # 优化：分批提交任务，避免一次性创建过多线程导致内存占用过高
+                    batch_size = 50  # 每批处理的区域数量
+                    pending = {}  # 已完成但尚未合并的区域结果 {区域索引: 结果}
+                    next_index = 0  # 下一个待合并的区域索引
                     for batch_start in range(0, len(memory_regions), batch_size):
                         batch_end = min(batch_start + batch_size, len(memory_regions))
                         batch_regions = memory_regions[batch_start:batch_end]
 
                         # 提交批次任务
-                        future_to_region = {executor.submit(search_region, region): region for region in batch_regions}
+                        future_to_region = {executor.submit(search_region, region): batch_start + index
+                                            for index, region in enumerate(batch_regions)}
 
                         # 处理完成的任务
                         for future in concurrent.futures.as_completed(future_to_region):
@@ -401,26 +401,33 @@ class MemoryReader:
                                 break
 
                             region_results, region_checked, region_bytes = future.result()
-                            results.extend(region_results)
+                            pending[future_to_region[future]] = region_results
                             total_checked += region_checked
                             total_bytes += region_bytes
 
+                            # 区域按地址升序排列，按区域顺序合并已完成的结果，保证结果集合有序
+                            while next_index in pending:
+                                region_results = pending.pop(next_index)
+                                results.extend(region_results)
+                                region_results.close()
+                                next_index += 1
+
                             # 更新进度
                             processed_regions = batch_start + len(future_to_region)
                             throttled_progress_callback(processed_regions if processed_regions <= total_regions else total_regions, total_regions)
 
-                            # 如果结果太多，提前返回
-                            if len(results) >= 100000:
-                                self.logger.info(f"搜索结果过多，提前返回前 {len(results)} 个结果")
-                                break
-
-                        # 检查是否被取消或结果过多
-                        if not self.is_running or len(results) >= 100000:
+                        # 检查是否被取消
+                        if not self.is_running:
                             break
 
                         # 让出CPU时间，避免UI卡顿
                         QThread.yieldCurrentThread()
 
+                    # 搜索被取消时合并剩余的已完成区域
+                    for index in sorted(pending):
+                        results.extend(pending[index])
+                        pending[index].close()
+
                 region_total_time = time.time() - region_start_time
                 if region_total_time > 0:
                     self.logger.info(f"区域处理总计: 区域数={total_regions}, 总字节数={total_bytes/1024/1024:.1f}MB, 总耗时={region_total_time:.3f}秒")
@@ -435,27 +442,15 @@ class MemoryReader:
             self.logger.info(f"搜索性能: 检查了 {total_checked} 个地址, 处理了 {total_bytes/1024/1024:.2f} MB 数据")
 
             # 添加详细日志，记录搜索结果的前几个地址和值，帮助调试
-            if len(results) > 0:
+            if len(results) > 0 and isinstance(results, CandidateSet):
                 try:
                     sample_size = min(5, len(results))
                     sample_values = []
                     for i in range(sample_size):
                         addr = results[i]
-                        if value_type == 'int32':
-                            data = self.read_memory(addr, 4)
-                            if data:
-                                val = int.from_bytes(data, 'little', signed=True)
-                                sample_values.append(f"{hex(addr)}={val}")
-                        elif value_type == 'float':
-                            data = self.read_memory(addr, 4)
-                            if data:
-                                val = struct.unpack('<f', data)[0]
-                                sample_values.append(f"{hex(addr)}={val:.6f}")
-                        elif value_type == 'double':
-                            data = self.read_memory(addr, 8)
-                            if data:
-                                val = struct.unpack('<d', data)[0]
-                                sample_values.append(f"{hex(addr)}={val:.6f}")
+                        data = self.read_memory(addr, value_size)
+                        if data:
+                            sample_values.append(f"{hex(addr)}={format_value(unpack_value(data, value_type), value_type)}")
 
                     self.logger.info(f"搜索结果样本: {', '.join(sample_values)}")
                 except Exception as e:
@@ -465,30 +460,578 @@ class MemoryReader:
         except Exception as e:
             self.logger.error(f"搜索值时出错: {str(e)}")
             self.logger.debug(traceback.format_exc())
-            return []
+            return CandidateSet()
         finally:
             # 恢复原始值类型，避免影响其他任务
             self.current_value_type = original_value_type
             self.is_running = False
 
-    def _compare_value(self, buffer, pattern, compare_type):
-        """比较内存值"""
-        if not buffer or len(buffer) != len(pattern):
-            return False
+    def get_region_map(self):
+        """获取目标进程的内存区域表，首次使用时创建并枚举"""
+        if self.region_map is None:
+            system_info = SYSTEM_INFO()
+            ctypes.windll.kernel32.GetSystemInfo(ctypes.byref(system_info))
+            self.region_map = RegionMap(
+                self._query_region,
+                system_info.lpMinimumApplicationAddress or 0,
+                system_info.lpMaximumApplicationAddress,
+                self._list_modules
+            )
+            self.region_map.refresh()
+            self.logger.info(f"内存区域表: {self.region_map}")
+        return self.region_map
+
+    def _query_region(self, address):
+        """使用VirtualQueryEx查询包含地址的内存区域，失败返回None"""
+        mbi = MEMORY_BASIC_INFORMATION()
+        if not ctypes.windll.kernel32.VirtualQueryEx(
+            self.process_handle.handle,
+            ctypes.c_void_p(address),
+            ctypes.byref(mbi),
+            ctypes.sizeof(mbi)
+        ):
+            return None
+        return Region(mbi.BaseAddress or 0, mbi.RegionSize, mbi.State, mbi.Protect, mbi.Type,
+                      mbi.AllocationBase or 0)
+
+    def _list_modules(self):
+        """枚举目标进程加载的模块，返回 {模块基址: 模块路径}"""
+        modules = {}
+        for module in win32process.EnumProcessModulesEx(self.process_handle, win32process.LIST_MODULES_ALL):
+            try:
+                modules[module] = win32process.GetModuleFileNameEx(self.process_handle, module)
+            except Exception as e:
+                self.logger.debug(f"获取模块路径失败: {hex(module)}, {str(e)}")
+        return modules
+
+    def _get_thread_pool(self):
+        """获取线程模式扫描使用的线程池，首次使用时创建，首次扫描和后续扫描共用"""
+        if self._thread_pool is None:
+            max_workers = min(8, os.cpu_count() or 4)  # 最多使用8个线程
+            self._thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+            self.logger.info(f"创建扫描线程池: {max_workers} 个线程")
+        return self._thread_pool
+
+    def shutdown_thread_pool(self):
+        """关闭线程模式扫描使用的线程池"""
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+
+    def _get_process_pool(self):
+        """获取多进程扫描使用的进程池，首次使用时创建"""
+        if self._process_pool is None:
+            max_workers = os.cpu_count() or 4
+            self._process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+            self.logger.info(f"创建扫描进程池: {max_workers} 个工作进程")
+        return self._process_pool
+
+    def shutdown_process_pool(self):
+        """关闭多进程扫描使用的进程池"""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+    def _capture_snapshot(self, memory_regions, value_type, progress_callback):
+        """读取所有内存区域，保存为未知初始值扫描的快照
+
+        返回:
+            (快照, 读取的字节数)
+        """
+        snapshot = SnapshotStore(value_type)
+        total_bytes = 0
+        for index, (base_address, region_size) in enumerate(memory_regions, 1):
+            if not self.is_running:
+                self.logger.info("搜索被用户取消")
+                break
+            for window_base, window in self.iter_region_windows(base_address, region_size):
+                snapshot.add_pages(window_base, window)
+                total_bytes += len(window)
+            progress_callback(index, len(memory_regions))
+        snapshot.finish_capture()
+
+        self.logger.info(f"内存快照: {snapshot.page_count} 个页面, 其中零页 {snapshot.zero_pages} 个, "
+                         f"去重后保存 {snapshot.stored_pages} 个页面")
+        return snapshot, total_bytes
+
+    def _filter_candidates_parallel(self, candidates, value_type, compare_type, value_num, scan_mode,
+                                    progress_callback):
+        """将候选地址按地址分片并行筛选（后续扫描）
+
+        分片按块从候选集合中流式取出（转存到文件时也不会一次性载入内存），
+        同时在途的分片数量有限；完成的分片按地址顺序合并，结果保持有序。
+
+        返回:
+            (结果候选集合, 检查的地址数, 读取次数)
+        """
+        total_count = len(candidates)
+
+        # 候选集合附带同类型的数值列时，才能与先前值比较
+        has_previous = candidates.values is not None and candidates.values.value_type == value_type
+        previous_chunks = candidates.iter_value_chunks(NEXT_SCAN_BATCH_SIZE) if has_previous else None
+
+        if scan_mode == 'process':
+            executor = self._get_process_pool()
+
+            def submit(chunk, previous):
+                return executor.submit(scan_worker.filter_addresses, self.process_id, chunk.tobytes(),
+                                       value_type, compare_type, value_num,
+                                       None if previous is None else previous.tobytes())
+        else:
+            executor = self._get_thread_pool()
+
+            def submit(chunk, previous):
+                return executor.submit(filter_candidates, self.scan_engine, self.read_memory_view, chunk,
+                                       value_type, compare_type, value_num, previous)
+
+        results = CandidateSet(memory_budget=self.candidate_memory_budget, value_type=value_type)
+        total_checked = 0
+        read_count = 0
+        chunks = candidates.iter_chunks(NEXT_SCAN_BATCH_SIZE)
+        max_in_flight = 2 * (os.cpu_count() or 4)  # 同时在途的分片数量上限
+        in_flight = {}  # {future: (分片索引, 分片地址数)}
+        pending = {}    # 已完成但尚未合并的分片结果 {分片索引: (匹配地址, 当前值)}
+
+        def merge(matched, matched_values):
+            # 工作进程返回字节串，线程返回数组
+            if isinstance(matched, bytes):
+                results.frombytes(matched)
+                results.values.frombytes(matched_values)
+            else:
+                results.extend(matched)
+                results.values.extend(matched_values)
+
+        next_index = 0
+        submitted = 0
+        try:
+            while True:
+                # 补充在途分片
+                while self.is_running and len(in_flight) < max_in_flight:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    previous = next(previous_chunks) if previous_chunks is not None else None
+                    in_flight[submit(chunk, previous)] = (submitted, len(chunk))
+                    submitted += 1
+                if not in_flight or not self.is_running:
+                    break
+
+                done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    index, chunk_length = in_flight.pop(future)
+                    try:
+                        matched, matched_values, chunk_reads = future.result()
+                    except Exception as e:
+                        self.logger.debug(f"筛选候选分片失败: {str(e)}")
+                        matched, matched_values, chunk_reads = b'', b'', 0
+                    pending[index] = (matched, matched_values)
+                    total_checked += chunk_length
+                    read_count += chunk_reads
+
+                # 按分片顺序合并已完成的结果，保证结果集合有序
+                while next_index in pending:
+                    merge(*pending.pop(next_index))
+                    next_index += 1
+
+                progress_callback(total_checked, total_count)
+        finally:
+            # 搜索被取消时取消尚未开始的分片
+            for future in in_flight:
+                future.cancel()
+
+        if not self.is_running:
+            self.logger.info("搜索被用户取消")
+
+        # 搜索被取消时合并剩余的已完成分片
+        for index in sorted(pending):
+            merge(*pending[index])
+
+        return results, total_checked, read_count
+
+    def _scan_regions_multiprocess(self, memory_regions, value_type, compare_type, value_num, alignment,
+                                   progress_callback):
+        """使用进程池扫描内存区域
+
+        区域按累计字节数切分为互不重叠的分片，每个工作进程独立读取并比较，
+        只把紧凑的地址数组传回主进程。
+
+        返回:
+            (结果候选集合, 检查的地址数, 读取的字节数)
+        """
+        value_size = get_value_size(value_type)
+        shards = scan_worker.split_regions(memory_regions, PROCESS_SHARD_BYTES, value_size - 1)
+        pool = self._get_process_pool()
+        self.logger.info(f"使用多进程模式搜索: {len(shards)} 个分片")
+
+        results = CandidateSet(memory_budget=self.candidate_memory_budget, value_type=value_type)
+        total_checked = 0
+        total_bytes = 0
+        future_to_shard = {
+            pool.submit(scan_worker.scan_regions, self.process_id, shard, value_type, compare_type,
+                        value_num, alignment, SCAN_WINDOW_SIZE): index
+            for index, shard in enumerate(shards)
+        }
+        pending = {}  # 已完成但尚未合并的分片结果 {分片索引: (地址字节串, 数值字节串)}
+        next_index = 0
+        try:
+            for completed, future in enumerate(concurrent.futures.as_completed(future_to_shard), 1):
+                if not self.is_running:
+                    self.logger.info("搜索被用户取消")
+                    break
+
+                try:
+                    address_bytes, value_bytes, shard_checked, shard_bytes = future.result()
+                except Exception as e:
+                    self.logger.debug(f"扫描分片失败: {str(e)}")
+                    address_bytes = value_bytes = b''
+                    shard_checked = shard_bytes = 0
+
+                pending[future_to_shard[future]] = (address_bytes, value_bytes)
+                total_checked += shard_checked
+                total_bytes += shard_bytes
+
+                # 分片按地址升序排列，按分片顺序合并，保证结果集合有序
+                while next_index in pending:
+                    address_bytes, value_bytes = pending.pop(next_index)
+                    results.frombytes(address_bytes)
+                    results.values.frombytes(value_bytes)
+                    next_index += 1
+
+                progress_callback(completed, len(future_to_shard))
+        finally:
+            # 取消尚未开始的分片
+            for future in future_to_shard:
+                future.cancel()
+
+        # 搜索被取消时合并剩余的已完成分片
+        for index in sorted(pending):
+            address_bytes, value_bytes = pending[index]
+            results.frombytes(address_bytes)
+            results.values.frombytes(value_bytes)
+
+        return results, total_checked, total_bytes
+
+    def _scan_regions_tagged(self, memory_regions, targets, compare_type, scan_mode, progress_callback,
+                             alignment=None):
+        """所有数值类型扫描和多值扫描：每个区域只读取一次，在同一缓冲区上查找各个搜索值
+
+        参数:
+            targets: [(标签, 数值类型, 搜索值), ...]，所有数值类型扫描以数值类型作为标签
+            alignment: 对齐步长，为None时各类型按自身大小对齐；1表示非对齐扫描
+
+        返回:
+            ({标签: 附带数值列的CandidateSet}, 检查的地址数, 读取的字节数)
+        """
+        overlap = max(get_value_size(value_type) for _, value_type, _ in targets) - 1
+        sizes = {label: get_value_size(value_type) for label, value_type, _ in targets}
+        parts = {label: CandidateSet(memory_budget=self.candidate_memory_budget, value_type=value_type)
+                 for label, value_type, _ in targets}
+        total_checked = 0
+        total_bytes = 0
+
+        if scan_mode == 'process':
+            pool = self._get_process_pool()
+            shards = scan_worker.split_regions(memory_regions, PROCESS_SHARD_BYTES, overlap, with_limits=True)
+            futures = [pool.submit(scan_worker.scan_regions_tagged, self.process_id, shard, targets,
+                                   compare_type, overlap, SCAN_WINDOW_SIZE, alignment) for shard in shards]
+        else:
+            executor = self._get_thread_pool()
+
+            def scan_region(base_address, region_size):
+                found = {label: (CandidateSet(memory_budget=None), []) for label, _, _ in targets}
+                checked = 0
+                scanned = 0
+                for window_base, window in self.iter_region_windows(base_address, region_size, overlap):
+                    # 重叠部分中的数值归属下一个窗口
+                    keep = window_keep(window_base - base_address, region_size, SCAN_WINDOW_SIZE, overlap)
+                    span = len(window) if keep is None else min(keep, len(window))
+                    for label, offsets, values in scan_labeled(self.scan_engine, window, targets,
+                                                                compare_type, keep, alignment, window_base):
+                        addresses, value_chunks = found[label]
+                        addresses.extend_offsets(window_base, offsets)
+                        value_chunks.append(values)
+                        checked += span // (alignment or sizes[label])
+                    scanned += len(window)
+                    if not self.is_running:
+                        break
+                return found, checked, scanned
+
+            futures = [executor.submit(scan_region, base_address, region_size)
+                       for base_address, region_size in memory_regions]
+
+        # 按提交顺序（地址升序）合并，保证各类型的结果有序
+        try:
+            for completed, future in enumerate(futures, 1):
+                if not self.is_running:
+                    self.logger.info("搜索被用户取消")
+                    break
+                try:
+                    found, checked, scanned = future.result()
+                except Exception as e:
+                    self.logger.debug(f"扫描区域失败: {str(e)}")
+                    continue
+                for label, (addresses, values) in found.items():
+                    part = parts[label]
+                    if isinstance(addresses, bytes):
+                        part.frombytes(addresses)
+                        part.values.frombytes(values)
+                    else:
+                        part.extend(addresses.as_array())
+                        for chunk in values:
+                            part.values.extend(chunk)
+                total_checked += checked
+                total_bytes += scanned
+                progress_callback(completed, len(futures))
+        finally:
+            for future in futures:
+                future.cancel()
+
+        return parts, total_checked, total_bytes
+
+    def search_values(self, targets, progress_callback=None, scan_mode=None, region_filter=None, unaligned=False):
+        """多值首次扫描：一次读取内存，同时精确查找多个带标签的数值
+
+        截图识别出的多个游戏数值（如 {"金币": 906, "生命": 87}）不必各自扫描整个内存，
+        每个区域只读取一次，同一类型的搜索值一起比较，再按标签拆分结果。
+
+        参数:
+            targets: [(标签, 搜索值, 数值类型), ...]，标签不能重复，数值类型不能是所有类型或模式类型
+            progress_callback, scan_mode, region_filter, unaligned: 与search_value相同
+
+        返回:
+            {标签: 附带数值列的CandidateSet}，按targets的顺序排列；出错时为空字典
+        """
+        start_time = time.time()
+        self.is_running = True
+        try:
+            labeled = []
+            for label, value, value_type in targets:
+                if value_type == ALL_TYPES or value_type in PATTERN_TYPES:
+                    raise ValueError(f"多值扫描需要为 {label} 指定数值类型")
+                labeled.append((label, value_type, parse_value(value, value_type)))
+            labels = [label for label, _, _ in labeled]
+            if not labeled:
+                raise ValueError("多值扫描至少需要一个搜索值")
+            if len(set(labels)) != len(labels):
+                raise ValueError("多值扫描的标签不能重复")
+            self.logger.info("开始多值扫描: " + ', '.join(f"{label}={value} ({value_type})"
+                                                      for label, value_type, value in labeled))
+
+            def report(current, total):
+                if progress_callback and self.is_running:
+                    percentage = (current / total * 100) if total > 0 else 0
+                    progress_callback(f"正在搜索... {current}/{total} ({percentage:.1f}%)", False)
+
+            region_map = self.get_region_map()
+            region_map.refresh(REGION_MAP_MAX_AGE)
+            # 各类型在扫描时按自身大小从裁剪后的起始地址对齐，这里不取整
+            memory_regions = region_map.readable_regions(region_filter if region_filter is not None
+                                                         else self.region_filter)
+            scan_mode = scan_mode or self.scan_mode
+            if scan_mode not in SCAN_MODES:
+                raise ValueError(f"不支持的扫描模式: {scan_mode}")
+            results, total_checked, total_bytes = self._scan_regions_tagged(
+                memory_regions, labeled, 'exact', scan_mode, report, 1 if unaligned else None
+            )
+
+            counts = ', '.join(f"{label}: {len(part)}" for label, part in results.items())
+            self.logger.info(f"多值扫描完成: {counts}, 检查了 {total_checked} 个地址, "
+                             f"{total_bytes/1024/1024:.1f}MB, 耗时 {time.time() - start_time:.2f} 秒")
+            return results
+        except Exception as e:
+            self.logger.error(f"多值扫描时出错: {str(e)}")
+            self.logger.debug(traceback.format_exc())
+            return {}
+        finally:
+            self.is_running = False
 
-        if compare_type == 'exact':
-            return buffer == pattern
-        elif compare_type == 'bigger':
-            return int.from_bytes(buffer, 'little') > int.from_bytes(pattern, 'little')
-        elif compare_type == 'smaller':
-            return int.from_bytes(buffer, 'little') < int.from_bytes(pattern, 'little')
-        elif compare_type == 'changed':
-            return buffer != pattern
-        elif compare_type == 'unchanged':
-            return buffer == pattern
+    def search_group(self, terms, window, progress_callback=None, scan_mode=None, region_filter=None,
+                     unaligned=False):
+        """分组扫描：查找多个数值都出现在window字节范围内的位置（如结构体中相邻的生命、最大生命、魔法）
+
+        各搜索项通过一次多值扫描得到升序的命中地址，再用join_groups连接，
+        通常一次扫描即可定位唯一的结构体，不需要多轮后续扫描。
+
+        参数:
+            terms: [(数值类型, 搜索值), ...]，同一搜索项出现多次时要求窗口内有相应数量的命中
+            window: 窗口大小（字节），不能小于最大的数值大小
+            progress_callback, scan_mode, region_filter, unaligned: 与search_value相同
+
+        返回:
+            按地址升序排列的基址CandidateSet（每组中地址最小的命中，不附带数值列）
+        """
+        start_time = time.time()
+        results = CandidateSet(memory_budget=self.candidate_memory_budget)
+        try:
+            counts = {}
+            for value_type, value in terms:
+                if value_type == ALL_TYPES or value_type in PATTERN_TYPES:
+                    raise ValueError("分组扫描需要为每个搜索项指定数值类型")
+                key = (value_type, parse_value(value, value_type))
+                counts[key] = counts.get(key, 0) + 1
+            if not counts:
+                raise ValueError("分组扫描至少需要一个搜索项")
+            window = int(window)
+            largest = max(get_value_size(value_type) for value_type, _ in counts)
+            if window < largest:
+                raise ValueError(f"分组扫描的窗口不能小于 {largest} 字节")
+
+            keys = list(counts)
+            parts = self.search_values([(index, value, value_type) for index, (value_type, value) in enumerate(keys)],
+                                       progress_callback, scan_mode, region_filter, unaligned)
+            if len(parts) != len(keys):
+                return results  # 扫描出错或被取消
+
+            def hits(part):
+                return part.as_numpy() if HAS_NUMPY else part.as_array()
+
+            bases = join_groups([(hits(parts[index]), get_value_size(value_type), counts[(value_type, value)])
+                                 for index, (value_type, value) in enumerate(keys)], window)
+            results.extend(bases)
+            self.logger.info(f"分组扫描完成: 窗口 {window} 字节, "
+                             + ', '.join(f"{value}({value_type}) {len(parts[index])} 个命中"
+                                         for index, (value_type, value) in enumerate(keys))
+                             + f", 找到 {len(results)} 组, 耗时 {time.time() - start_time:.2f} 秒")
+        except Exception as e:
+            self.logger.error(f"分组扫描时出错: {str(e)}")
+            self.logger.debug(traceback.format_exc())
+        return results
+
+    def search_pattern(self, pattern, compare_type='exact', last_results=None, progress_callback=None,
+                       scan_mode=None, region_filter=None):
+        """搜索字节模式（特征码、文本）的所有出现位置
+
+        参数:
+            pattern: BytePattern、TextPattern或特征码文本（如 "8B 45 ?? 89 ?? 10"）
+            compare_type: 只支持'exact'
+            last_results: 上次搜索结果，不为None时只检查其中仍然匹配的地址
+            scan_mode, region_filter: 与search_value相同
+
+        返回:
+            按地址升序排列的CandidateSet（不附带数值列）
+        """
+        start_time = time.time()
+        self.is_running = True
+        try:
+            if compare_type != 'exact':
+                raise ValueError("字节数组和文本搜索只支持精确匹配")
+            if not isinstance(pattern, BytePattern):
+                pattern = BytePattern.parse(str(pattern))
+            self.logger.info(f"开始搜索字节模式: {pattern} ({pattern.length} 字节)")
+
+            def report(current, total):
+                if progress_callback and self.is_running:
+                    percentage = (current / total * 100) if total > 0 else 0
+                    progress_callback(f"正在搜索... {current}/{total} ({percentage:.1f}%)", False)
+
+            if last_results is not None:
+                # 后续扫描：只在上次的结果中重新校验
+                results = CandidateSet(memory_budget=self.candidate_memory_budget)
+                total = len(last_results)
+                checked = 0
+                for chunk in CandidateSet.from_iterable(last_results).iter_chunks(NEXT_SCAN_BATCH_SIZE):
+                    if not self.is_running:
+                        break
+                    matched, _ = filter_pattern_candidates(self.read_memory_view, chunk, pattern)
+                    results.extend(matched)
+                    checked += len(chunk)
+                    report(checked, total)
+            else:
+                region_map = self.get_region_map()
+                region_map.refresh(REGION_MAP_MAX_AGE)
+                memory_regions = region_map.readable_regions(region_filter if region_filter is not None
+                                                             else self.region_filter)
+                scan_mode = scan_mode or self.scan_mode
+                if scan_mode not in SCAN_MODES:
+                    raise ValueError(f"不支持的扫描模式: {scan_mode}")
+                results, total_bytes = self._scan_pattern_regions(memory_regions, pattern, scan_mode, report)
+                self.logger.info(f"字节模式扫描: {len(memory_regions)} 个区域, {total_bytes/1024/1024:.1f}MB")
+
+            self.logger.info(f"搜索完成: 找到 {len(results)} 个结果, 耗时 {time.time() - start_time:.2f} 秒")
+            return results
+        except Exception as e:
+            self.logger.error(f"搜索字节模式时出错: {str(e)}")
+            self.logger.debug(traceback.format_exc())
+            return CandidateSet()
+        finally:
+            self.is_running = False
+
+    def _scan_pattern_regions(self, memory_regions, pattern, scan_mode, progress_callback):
+        """在各内存区域中查找字节模式，窗口之间重叠 模式长度-1 字节
+
+        返回:
+            (结果候选集合, 读取的字节数)
+        """
+        overlap = pattern.length - 1
+        results = CandidateSet(memory_budget=self.candidate_memory_budget)
+        total_bytes = 0
+
+        if scan_mode == 'process':
+            pool = self._get_process_pool()
+            shards = scan_worker.split_regions(memory_regions, PROCESS_SHARD_BYTES, overlap, with_limits=True)
+            futures = [pool.submit(scan_worker.find_pattern_regions, self.process_id, shard, pattern,
+                                   SCAN_WINDOW_SIZE) for shard in shards]
+        else:
+            executor = self._get_thread_pool()
+
+            def scan_region(base_address, region_size):
+                found = array('Q')
+                scanned = 0
+                for window_base, window in self.iter_region_windows(base_address, region_size, overlap):
+                    # 从重叠部分开始的匹配归属下一个窗口
+                    keep = window_keep(window_base - base_address, region_size, SCAN_WINDOW_SIZE, overlap)
+                    found.extend(window_base + offset for offset in pattern.find_all(window, keep))
+                    scanned += len(window)
+                    if not self.is_running:
+                        break
+                return found, scanned
+
+            futures = [executor.submit(scan_region, base_address, region_size)
+                       for base_address, region_size in memory_regions]
+
+        # 按提交顺序（地址升序）合并，保证结果有序
+        try:
+            for completed, future in enumerate(futures, 1):
+                if not self.is_running:
+                    self.logger.info("搜索被用户取消")
+                    break
+                try:
+                    found, scanned = future.result()
+                except Exception as e:
+                    self.logger.debug(f"扫描区域失败: {str(e)}")
+                    continue
+                if isinstance(found, bytes):
+                    results.frombytes(found)
+                else:
+                    results.extend(found)
+                total_bytes += scanned
+                progress_callback(completed, len(futures))
+        finally:
+            for future in futures:
+                future.cancel()
+
+        return results, total_bytes
+
+    @staticmethod
+    def _value_for_type(value, value_type, compare_type):
+        """将所有数值类型扫描的搜索值转换为指定类型的搜索值，无法表示时返回None
+
+        小数与整数类型比较大小时取整到等价的边界（大于3.5即大于3，小于3.5即小于4）。
+        """
+        if value is None or get_type_info(value_type)['is_float']:
+            return None if value is None else float(value)
+        if not math.isfinite(float(value)):
+            return None
+        if float(value) == int(value):
+            return int(value)
+        if compare_type == 'bigger':
+            return math.floor(value)
+        if compare_type == 'smaller':
+            return math.ceil(value)
+        return None
 
     def read_memory(self, address, size):
-        """读取内存"""
+        """读取内存，返回独立的bytes副本"""
         if not self.process_handle:
             return None
 
@@ -499,50 +1042,98 @@ class MemoryReader:
             # 对于小块内存，直接读取
             return self._read_memory_chunk(address, size)
         else:
-            # 对于大块内存，分块读取
-            result = bytearray()
+            # 对于大块内存，分块直接读入同一个结果缓冲区，避免中间副本
+            result = bytearray(size)
+            total_read = 0
             for offset in range(0, size, max_chunk_size):
                 chunk_size = min(max_chunk_size, size - offset)
-                chunk = self._read_memory_chunk(address + offset, chunk_size)
-                if chunk:
-                    result.extend(chunk)
-                else:
+                bytes_read = self._read_memory_into(address + offset, result, chunk_size, offset)
+                total_read += bytes_read
+                if bytes_read < chunk_size:
                     # 如果读取失败，返回已读取的部分
-                    return bytes(result) if result else None
-            return bytes(result)
+                    break
+            if not total_read:
+                return None
+            return bytes(memoryview(result)[:total_read])
 
-    def _read_memory_chunk(self, address, size):
-        """读取一块内存"""
+    def read_memory_view(self, address, size):
+        """读取内存到当前线程的复用缓冲区，返回memoryview（不复制数据）
+
+        返回的memoryview在同一线程下一次调用本方法时会被覆盖，
+        调用方应立即解析，需要保存时自行复制。读取失败返回None。
+        """
+        if not self.process_handle:
+            return None
+
+        buffer = self._read_pool.get(size)
+        bytes_read = self._read_memory_into(address, buffer, size)
+        if not bytes_read:
+            return None
+        return memoryview(buffer)[:bytes_read]
+
+    def iter_region_windows(self, base_address, region_size, overlap=0, window_size=None):
+        """按固定大小的窗口流式读取内存区域
+
+        所有窗口复用当前线程的窗口缓冲区，无论区域多大，内存占用都不超过 window_size + overlap。
+        window_size为None时使用SCAN_WINDOW_SIZE，与window_keep的窗口划分一致。
+        读取失败的窗口会被跳过，不影响区域中其余部分的扫描。
+
+        注意：返回的memoryview在读取下一个窗口时会被覆盖，调用方需在迭代内处理完毕。
+
+        返回:
+            (窗口起始地址, memoryview) 的迭代器
+        """
+        window_size = window_size or SCAN_WINDOW_SIZE
+        buffer = self._window_pool.get(min(region_size, window_size + overlap))
+        view = memoryview(buffer)
+        for offset, length in iter_scan_windows(region_size, window_size, overlap):
+            bytes_read = self._read_memory_into(base_address + offset, buffer, length)
+            if bytes_read:
+                yield base_address + offset, view[:bytes_read]
+
+    def _read_memory_into(self, address, buffer, size, offset=0):
+        """读取内存到调用方提供的可写缓冲区的offset处，返回实际读取的字节数"""
         try:
-            # 优化：使用缓存减少重复读取
-            buffer = ctypes.create_string_buffer(size)
+            target = (ctypes.c_char * size).from_buffer(buffer, offset)
             bytes_read = ctypes.c_size_t()
 
             result = ctypes.windll.kernel32.ReadProcessMemory(
                 self.process_handle.handle,
-                ctypes.c_void_p(address),  # 转换地址为c_void_p
-                buffer,
+                ctypes.c_void_p(address),
+                target,
                 size,
                 ctypes.byref(bytes_read)
             )
 
             if result and bytes_read.value > 0:
-                return buffer.raw[:bytes_read.value]
-            return None
+                return bytes_read.value
+            return 0
         except Exception as e:
+            self.logger.debug(f"读取内存失败: 地址={hex(address)}, 大小={size}, 错误={str(e)}")
+            return 0
+
+    def _read_memory_chunk(self, address, size):
+        """读取一块内存，返回bytes副本"""
+        view = self.read_memory_view(address, size)
+        if view is None:
             # 减少日志输出频率，避免日志过多影响性能
             if size > 1024:  # 只记录大于1KB的读取失败
-                self.logger.debug(f"读取内存失败: 地址={hex(address)}, 大小={size}, 错误={str(e)}")
+                self.logger.debug(f"读取内存失败: 地址={hex(address)}, 大小={size}")
             return None
+        return bytes(view)
+
+    def write_memory(self, address, buffer, quiet=False):
+        """写入内存
 
-    def write_memory(self, address, buffer):
-        """写入内存"""
+        参数:
+            quiet: 写入失败时不记录日志（由调用方汇总，如锁定写入线程）
+        """
         if not self.process_handle:
             return False
 
         try:
             bytes_written = ctypes.c_size_t()
-            result = ctypes.windll.kernel32.WriteProcessMemory(
+            result = kernel32.WriteProcessMemory(
                 self.process_handle.handle,
                 ctypes.c_void_p(address),  # 转换地址为c_void_p
                 buffer,
@@ -551,16 +1142,24 @@ class MemoryReader:
             )
 
             success = result != 0 and bytes_written.value == len(buffer)
-            if not success:
+            if not success and not quiet:
                 self.logger.error(f"写入内存失败: 地址={hex(address)}, 错误码={ctypes.get_last_error()}")
             return success
 
         except Exception as e:
-            self.logger.error(f"写入内存失败: {str(e)}")
+            if not quiet:
+                self.logger.error(f"写入内存失败: {str(e)}")
             return False
 
-    def read_value(self, address):
-        """读取指定地址的值，根据当前设置的值类型返回对应类型的值"""
+    def read_value(self, address, value_type=None):
+        """读取指定地址的值
+
+        参数:
+            value_type: 数值类型，为None时使用当前设置的值类型
+
+        返回:
+            对应类型的值；读取失败或浮点数无效（NaN、无穷大）时返回None
+        """
         if not self.process_handle:
             self.logger.error("读取值失败：未附加到进程")
             return None
@@ -572,28 +1171,19 @@ class MemoryReader:
                 return None
 
             # 验证值类型是否有效
-            valid_types = ['int32', 'float', 'double']
-            if self.current_value_type not in valid_types:
-                self.logger.error(f"读取值失败：不支持的值类型 {self.current_value_type}，支持的类型: {', '.join(valid_types)}")
+            value_type = value_type or self.current_value_type
+            try:
+                info = get_type_info(value_type)
+            except ValueError as e:
+                self.logger.error(f"读取值失败：{str(e)}")
                 return None
 
             # 根据值类型确定读取大小
-            if self.current_value_type == 'int32':
-                size = 4
-            elif self.current_value_type == 'float':
-                size = 4
-            elif self.current_value_type == 'double':
-                size = 8
-            else:
-                # 这里是冗余检查，前面已经验证过类型了
-                self.logger.error(f"不支持的值类型: {self.current_value_type}")
-                return None
-
-            # self.logger.debug(f"尝试读取地址 {hex(address)} 的值，类型: {self.current_value_type}, 大小: {size}")
+            size = info['size']
 
             # 读取内存
             try:
-                data = self.read_memory(address, size)
+                data = self.read_memory_view(address, size)
                 if not data:
                     self.logger.debug(f"读取地址 {hex(address)} 的值失败: 无法读取内存")
                     return None
@@ -608,43 +1198,15 @@ class MemoryReader:
 
             # 根据值类型解析数据
             try:
-                if self.current_value_type == 'int32':
-                    try:
-                        value = int.from_bytes(data, 'little', signed=True)
-                        # self.logger.debug(f"成功读取整数值: {value}")
-                        return value
-                    except Exception as e:
-                        self.logger.error(f"解析整数值失败: {str(e)}, 数据: {data.hex()}")
-                        return None
-                elif self.current_value_type == 'float':
-                    try:
-                        value = struct.unpack('<f', data)[0]
-                        # 检查是否为有效的浮点数
-                        if math.isnan(value) or math.isinf(value):
-                            self.logger.debug(f"读取地址 {hex(address)} 的浮点数值无效: {value}")
-                            return None
-                        # self.logger.debug(f"成功读取浮点数值: {value}")
-                        return value
-                    except struct.error as e:
-                        self.logger.error(f"解析浮点数值失败: {str(e)}, 数据: {data.hex()}")
-                        return None
-                elif self.current_value_type == 'double':
-                    try:
-                        value = struct.unpack('<d', data)[0]
-                        # 检查是否为有效的浮点数
-                        if math.isnan(value) or math.isinf(value):
-                            self.logger.debug(f"读取地址 {hex(address)} 的双精度浮点数值无效: {value}")
-                            return None
-                        # self.logger.debug(f"成功读取双精度浮点数值: {value}")
-                        return value
-                    except struct.error as e:
-                        self.logger.error(f"解析双精度浮点数值失败: {str(e)}, 数据: {data.hex()}")
-                        return None
-            except Exception as e:
-                self.logger.error(f"解析地址 {hex(address)} 的值失败: {str(e)}, 值类型: {self.current_value_type}")
-                import traceback
-                self.logger.debug(traceback.format_exc())
+                value = unpack_value(data, value_type)
+            except struct.error as e:
+                self.logger.error(f"解析{value_type}值失败: {str(e)}, 数据: {bytes(data).hex()}")
+                return None
+            # 检查是否为有效的浮点数
+            if info['is_float'] and (math.isnan(value) or math.isinf(value)):
+                self.logger.debug(f"读取地址 {hex(address)} 的{value_type}值无效: {value}")
                 return None
+            return value
         except Exception as e:
             self.logger.error(f"读取地址 {hex(address)} 的值时发生异常: {str(e)}")
             import traceback
@@ -653,6 +1215,8 @@ class MemoryReader:
 
     def __del__(self):
         """清理资源"""
+        self.shutdown_thread_pool()
+        self.shutdown_process_pool()
         if self.process_handle:
             self.process_handle.Close()
 
@@ -0,0 +1,85 @@
+"""测试共用的模拟对象
+
+各测试模块从这里导入模拟的目标进程内存和候选集合的构造函数，不再各自复制。
+"""
+import struct
+
+from utils.candidate_set import CandidateSet
+
+PAGE_SIZE = 4096
+
+
+class FakeMemory:
+    """模拟目标进程内存，记录每次读取和写入
+
+    read/write与MemoryReader.read_memory_view/write_memory的约定一致：
+    读取失败返回None，写入只接受bytes（WriteProcessMemory没有声明参数类型，
+    ctypes无法转换bytearray等其他缓冲区，写入失败）。
+    """
+
+    def __init__(self, data=0x1000, base=0x10000):
+        """
+        参数:
+            data: 初始内容（bytes等缓冲区），或全零内容的字节数
+            base: 内容的起始地址
+        """
+        self.base = base
+        self.data = bytearray(data)
+        self.current_value_type = None  # MemoryReader的当前值类型
+        self.reads = []        # 读取的地址
+        self.writes = []       # 成功写入的 (地址, 字节)
+        self.rejected = 0      # 因不是bytes而失败的写入次数
+        self.readonly = ()     # 不可写的地址范围 [(起始地址, 结束地址), ...]
+        self.unreadable = set()  # 不可读的页面序号（相对base）
+
+    def _valid(self, address, size):
+        offset = address - self.base
+        return 0 <= offset and offset + size <= len(self.data)
+
+    def read(self, address, size):
+        self.reads.append(address)
+        if not self._valid(address, size):
+            return None
+        first = (address - self.base) // PAGE_SIZE
+        last = (address + size - 1 - self.base) // PAGE_SIZE
+        if any(page in self.unreadable for page in range(first, last + 1)):
+            return None
+        return memoryview(self.data)[address - self.base:address - self.base + size]
+
+    read_memory_view = read
+
+    def read_into(self, address, buffer, size, offset=0):
+        """与MemoryReader._read_memory_into一致：读取到buffer的offset处，返回读取的字节数"""
+        data = self.read(address, size)
+        if data is None:
+            return 0
+        buffer[offset:offset + size] = data
+        return size
+
+    def write(self, address, data):
+        if type(data) is not bytes:
+            self.rejected += 1
+            return False
+        if not self._valid(address, len(data)):
+            return False
+        if any(address < end and start < address + len(data) for start, end in self.readonly):
+            return False
+        offset = address - self.base
+        self.data[offset:offset + len(data)] = data
+        self.writes.append((address, data))
+        return True
+
+    def value(self, address, fmt):
+        """按struct格式字符读取数值"""
+        return struct.unpack_from('<' + fmt, self.data, address - self.base)[0]
+
+    def set_int(self, address, value):
+        """模拟游戏修改int32数值"""
+        struct.pack_into('<i', self.data, address - self.base, value)
+
+
+def make_candidates(addresses, values, value_type='int32'):
+    """创建附带数值列的候选集合"""
+    candidates = CandidateSet(addresses, value_type=value_type)
+    candidates.values.extend(values)
+    return candidates
@@ -0,0 +1,111 @@
+import sys
+import unittest
+from array import array
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from tests.fakes import FakeMemory
+from utils.byte_pattern import BytePattern, TextPattern, filter_pattern_candidates
+from utils.scan_engine import iter_scan_windows, window_keep
+
+
+class TestBytePattern(unittest.TestCase):
+    """测试字节数组特征码"""
+
+    def test_parse(self):
+        """解析带通配符的特征码，选取最长的固定字节作为锚点"""
+        pattern = BytePattern.parse("8b 45 ?? 89 ? 10 20 30")
+        self.assertEqual(str(pattern), "8B 45 ?? 89 ?? 10 20 30")
+        self.assertEqual(pattern.length, 8)
+        self.assertEqual((pattern.anchor, pattern.anchor_offset), (b'\x10\x20\x30', 5))
+        self.assertEqual(str(BytePattern.parse("8B45??89")), "8B 45 ?? 89")
+        for text in ("", "?? ??", "8B 4", "GG", "8B 123"):
+            with self.assertRaises(ValueError):
+                BytePattern.parse(text)
+
+    def test_find_all(self):
+        """查找所有（包括互相重叠的）匹配位置，通配符匹配任意字节"""
+        pattern = BytePattern.parse("8B 45 ?? 89")
+        data = b'\x00\x8b\x45\x01\x89\x8b\x45\x89\x89\x8b\x45\x02\x88\x8b\x45'
+        self.assertEqual(list(pattern.find_all(data)), [1, 5])
+        self.assertEqual(list(pattern.find_all(memoryview(data), limit=5)), [1])
+        self.assertEqual(list(BytePattern.parse("00 00").find_all(b'\x00' * 4)), [0, 1, 2])
+        self.assertEqual(pattern.format(data[5:9]), "8B 45 89 89")
+        self.assertEqual(pattern.format(b'\x8b'), "-")
+
+    def test_windows(self):
+        """分窗口查找时跨越窗口边界的匹配不会遗漏或重复"""
+        pattern = BytePattern.parse("AA ?? BB")
+        data = bytes(range(256)) + b'\xaa\x01\xbb\xaa\xbb\xbb' * 50
+        expected = list(pattern.find_all(data))
+        overlap = pattern.length - 1
+        for window_size in (7, 64, 1000):
+            found = []
+            for offset, length in iter_scan_windows(len(data), window_size, overlap):
+                keep = window_keep(offset, len(data), window_size, overlap)
+                found.extend(offset + o for o in pattern.find_all(data[offset:offset + length], keep))
+            self.assertEqual(found, expected, window_size)
+
+    def test_filter_candidates(self):
+        """后续扫描只保留仍然匹配的地址，区间不可读时逐个读取"""
+        base = 0x10000
+        memory = bytearray(0x20000)
+        for address in (0x10010, 0x18000, 0x1fffc):
+            memory[address - base:address - base + 3] = b'\x01\x02\x03'
+        read = FakeMemory(memory, base).read
+
+        pattern = BytePattern.parse("01 ?? 03")
+        candidates = array('Q', [0x10010, 0x10020, 0x18000, 0x1fffc, 0x1fffe])
+        matched, read_count = filter_pattern_candidates(read, candidates, pattern)
+        self.assertEqual(list(matched), [0x10010, 0x18000, 0x1fffc])
+        self.assertGreater(read_count, 0)
+
+
+
+class TestTextPattern(unittest.TestCase):
+    """测试文本字符串搜索"""
+
+    def test_encodings(self):
+        """一次扫描同时查找UTF-8和UTF-16LE编码的文本，并按匹配的编码解码显示"""
+        buffer = b'xx' + '金币'.encode('utf-8') + b'yy' + '金币'.encode('utf-16-le') + b'zz'
+        utf16_offset = 2 + 6 + 2
+        pattern = TextPattern('金币', ('utf-8', 'utf-16-le'))
+        self.assertEqual((pattern.min_length, pattern.length), (4, 6))
+        # 与BytePattern相同的属性取第一种编码的字节
+        self.assertEqual((pattern.data, pattern.mask), ('金币'.encode('utf-8'), (True,) * 6))
+        self.assertEqual(pattern.find_all(buffer).tolist(), [2, utf16_offset])
+        self.assertEqual(pattern.format(buffer[2:2 + pattern.length]), '金币')
+        self.assertEqual(pattern.format(buffer[utf16_offset:utf16_offset + pattern.length]), '金币')
+        self.assertEqual(TextPattern('金币', ('utf-16-le',)).find_all(buffer).tolist(), [utf16_offset])
+        # 较短的编码可以紧靠缓冲区末尾
+        self.assertEqual(pattern.find_all(buffer[:utf16_offset + 4]).tolist(), [2, utf16_offset])
+        for args in (('',), ('abc', ()), ('abc', ('no-such-codec',))):
+            with self.assertRaises(ValueError):
+                TextPattern(*args)
+
+    def test_ignore_case(self):
+        """忽略大小写只作用于ASCII字母"""
+        buffer = b'Player player PLAYER'
+        self.assertEqual(TextPattern('player').find_all(buffer).tolist(), [7])
+        self.assertEqual(TextPattern('player', ignore_case=True).find_all(buffer).tolist(), [0, 7, 14])
+        self.assertEqual(TextPattern('PLAYER', ('utf-16-le',), True).find_all('pLaYeR'.encode('utf-16-le')).tolist(), [0])
+
+    def test_windows(self):
+        """分窗口扫描文本时结果与整体扫描一致且没有重复"""
+        pattern = TextPattern('hp', ('utf-8', 'utf-16-le'), True)
+        buffer = bytes(range(256)) * 8 + b'HP' + 'hP'.encode('utf-16-le') + bytes(100) + b'hp'
+        expected = pattern.find_all(buffer).tolist()
+        overlap = pattern.length - 1
+        found = []
+        for offset, length in iter_scan_windows(len(buffer), 512, overlap):
+            keep = window_keep(offset, len(buffer), 512, overlap)
+            found.extend(offset + o for o in pattern.find_all(buffer[offset:offset + length], keep))
+        self.assertEqual(found, expected)
+        self.assertEqual(len(expected), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
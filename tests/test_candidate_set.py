@@ -0,0 +1,153 @@
+import sys
+import unittest
+from array import array
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from utils import candidate_set
+from utils.candidate_set import CandidateSet, TaggedCandidateSet
+
+
+class TestCandidateSet(unittest.TestCase):
+    """测试候选地址集合"""
+
+    def _run_both(self, check):
+        """分别在NumPy可用和不可用时运行检查"""
+        check()
+        with mock.patch.object(candidate_set, 'np', None):
+            check()
+
+    def test_basic_api(self):
+        """长度、迭代、索引和切片"""
+        def check():
+            candidates = CandidateSet([0x3000, 0x1000, 0x2000], sort=True)
+            self.assertEqual(len(candidates), 3)
+            self.assertEqual(list(candidates), [0x1000, 0x2000, 0x3000])
+            self.assertEqual(candidates[0], 0x1000)
+            self.assertEqual(candidates[-1], 0x3000)
+            self.assertIsInstance(candidates[1:], CandidateSet)
+            self.assertEqual(candidates[1:].to_list(), [0x2000, 0x3000])
+            self.assertIn(0x2000, candidates)
+            self.assertNotIn(0x2004, candidates)
+            self.assertEqual(candidates.nbytes, 24)
+            self.assertFalse(CandidateSet())
+        self._run_both(check)
+
+    def test_extend_offsets(self):
+        """按基址和偏移量追加地址"""
+        def check():
+            candidates = CandidateSet()
+            candidates.extend_offsets(0x10000, array('Q', [0, 4, 8]))
+            if candidate_set.np is not None:
+                candidates.extend_offsets(0x20000, candidate_set.np.array([16], dtype=candidate_set.np.uint64))
+            else:
+                candidates.extend_offsets(0x20000, [16])
+            candidates.frombytes(array('Q', [0x30000]).tobytes())
+            self.assertEqual(candidates.to_list(), [0x10000, 0x10004, 0x10008, 0x20010, 0x30000])
+        self._run_both(check)
+
+    def test_take(self):
+        """按索引筛选地址"""
+        def check():
+            candidates = CandidateSet(range(0, 100, 4))
+            self.assertEqual(candidates.take([1, 3]).to_list(), [4, 12])
+            if candidate_set.np is not None:
+                mask = candidates.as_numpy() % 8 == 0
+                self.assertEqual(len(candidates.take(mask)), 13)
+        self._run_both(check)
+
+    def test_spill_to_file(self):
+        """超过内存预算后转存到临时文件，接口行为不变"""
+        def check():
+            candidates = CandidateSet(memory_budget=64)
+            for base in range(0, 4000, 1000):
+                candidates.extend(range(base, base + 1000, 4))
+            self.assertTrue(candidates.is_spilled)
+            expected = list(range(0, 4000, 4))
+            self.assertEqual(len(candidates), len(expected))
+            self.assertEqual(candidates.to_list(), expected)
+            self.assertEqual(candidates[5], 20)
+            self.assertEqual(candidates[-1], 3996)
+            self.assertEqual(candidates[10:13].to_list(), [40, 44, 48])
+            self.assertIn(2000, candidates)
+            chunks = list(candidates.iter_chunks(300))
+            self.assertEqual(sum(len(chunk) for chunk in chunks), len(expected))
+            candidates.close()
+            self.assertFalse(candidates.is_spilled)
+        self._run_both(check)
+
+    def test_spilled_sort(self):
+        """转存后的地址可以在文件上排序"""
+        def check():
+            candidates = CandidateSet(range(1000, 0, -1), memory_budget=64)
+            candidates.sort()
+            self.assertEqual(candidates.to_list(), list(range(1, 1001)))
+        self._run_both(check)
+
+    def test_value_column(self):
+        """数值列与地址一一对应，切片、选取、合并时保持对应"""
+        def check():
+            candidates = CandidateSet(memory_budget=64, value_type='int32')
+            candidates.extend(range(0, 400, 4))
+            candidates.values.extend(range(100))
+            self.assertTrue(candidates.values.is_spilled)
+            self.assertEqual(candidates[10:12].values.to_list(), [10, 11])
+            self.assertEqual(candidates.take([1, 3]).values.to_list(), [1, 3])
+
+            merged = CandidateSet(value_type='int32')
+            merged.extend(candidates)
+            self.assertEqual(merged.values.to_list(), list(range(100)))
+            chunks = list(zip(merged.iter_chunks(30), merged.iter_value_chunks(30)))
+            self.assertEqual([len(values) for _, values in chunks], [30, 30, 30, 10])
+
+            doubles = CandidateSet(value_type='double')
+            doubles.extend([8])
+            doubles.values.extend([1.5])
+            self.assertEqual(doubles.values[0], 1.5)
+
+            # 排序后无法保持对应，数值列被丢弃
+            merged.sort()
+            self.assertIsNone(merged.values)
+            self.assertEqual(list(CandidateSet([4]).iter_value_chunks()), [None])
+        self._run_both(check)
+
+    def test_index_of(self):
+        """查找子集地址在集合中的索引"""
+        def check():
+            candidates = CandidateSet(range(0, 400, 4), memory_budget=64)
+            survivors = CandidateSet([0, 40, 396])
+            self.assertEqual(list(candidates.index_of(survivors)), [0, 10, 99])
+            self.assertEqual(list(candidates.index_of(CandidateSet())), [])
+        self._run_both(check)
+
+    def test_tagged(self):
+        """按类型分组的候选集合按分组顺序迭代、索引和切片"""
+        tagged = TaggedCandidateSet({
+            'int8': CandidateSet([1, 2, 3]),
+            'int32': CandidateSet(),
+            'double': CandidateSet([8, 16]),
+        })
+        self.assertEqual(tagged.value_types, ['int8', 'double'])
+        self.assertEqual(len(tagged), 5)
+        self.assertEqual(list(tagged), [1, 2, 3, 8, 16])
+        self.assertEqual(list(tagged[2:4].iter_tagged()), [(3, 'int8'), (8, 'double')])
+        self.assertEqual(len(tagged[:100]), 5)
+        self.assertEqual((tagged[3], tagged.tagged_at(-1)), (8, (16, 'double')))
+        with self.assertRaises(IndexError):
+            tagged[5]
+        with self.assertRaises(TypeError):
+            tagged[::2]
+
+    def test_from_iterable(self):
+        """普通列表会被排序转换，已是候选集合时直接返回"""
+        candidates = CandidateSet.from_iterable([8, 4])
+        self.assertEqual(candidates, [4, 8])
+        self.assertIs(CandidateSet.from_iterable(candidates), candidates)
+
+
+if __name__ == '__main__':
+    unittest.main()
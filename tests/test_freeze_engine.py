@@ -0,0 +1,202 @@
+import struct
+import sys
+import time
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from tests.fakes import FakeMemory
+from utils.freeze_engine import FreezeEngine, LockRegistry, MIN_PERIOD, plan_spans
+
+
+class TestFreezeEngine(unittest.TestCase):
+    """测试锁定值的后台写入引擎"""
+
+    def setUp(self):
+        self.memory = FakeMemory()
+        self.registry = LockRegistry()
+        self.engine = FreezeEngine(self.memory.write, registry=self.registry)
+
+    def tearDown(self):
+        self.engine.stop()
+
+    def test_add_update_remove(self):
+        """按类型打包锁定值，修改和解除锁定后下一次写入即生效"""
+        self.registry.add(0x10008, 'double', 2.5)
+        self.registry.add(0x10000, 'int32', '100')
+        entry = self.registry.get(0x10000)
+        self.assertEqual((entry.value_type, entry.value, entry.data), ('int32', 100, struct.pack('<i', 100)))
+        self.assertEqual([entry.address for entry in self.registry], [0x10000, 0x10008])
+        self.assertEqual(self.engine.tick(), 0)
+        self.assertEqual(self.memory.value(0x10000, 'i'), 100)
+        self.assertEqual(self.memory.value(0x10008, 'd'), 2.5)
+
+        self.assertIsNotNone(self.registry.update(0x10000, 7))
+        self.assertIsNone(self.registry.update(0x10100, 7))
+        self.registry.remove(0x10008)
+        self.memory.writes.clear()
+        self.engine.tick()
+        self.assertEqual(self.memory.writes, [(0x10000, struct.pack('<i', 7))])
+        self.assertNotIn(0x10008, self.registry)
+
+        # 修改类型时按新类型重新打包锁定值
+        self.registry.update(0x10000, value_type='int16')
+        self.assertEqual(self.registry.get(0x10000).data, struct.pack('<h', 7))
+        with self.assertRaises(ValueError):
+            self.registry.add(0x10010, 'int8', 300)
+        self.assertNotIn(0x10010, self.registry)
+        self.registry.clear()
+        self.assertEqual(len(self.registry), 0)
+
+    def test_failed_write(self):
+        """写入失败的地址不影响其他地址"""
+        self.registry.add(0x1, 'int32', 1)
+        self.registry.add(0x10004, 'int32', 2)
+        self.assertEqual(self.engine.tick(), 1)
+        self.assertEqual(self.memory.value(0x10004, 'i'), 2)
+
+    def test_coalesced_writes(self):
+        """同一结构体中的锁定地址合并为一次写入，间隔中的字节保持原样"""
+        self.memory.data[0x14:0x18] = b'\xaa' * 4
+        engine = FreezeEngine(self.memory.write, registry=self.registry, read=self.memory.read)
+        for index in range(4):
+            self.registry.add(0x10000 + index * 4, 'int32', index)   # 首尾相接
+        for offset in (0x18, 0x20, 0x30):
+            self.registry.add(0x10000 + offset, 'int16', offset)   # 有间隔
+        self.registry.add(0x10800, 'float', 1.0)                   # 距离较远
+
+        spans = plan_spans(self.registry.snapshot)
+        self.assertEqual([(span.start, span.length, span.needs_read) for span in spans],
+                         [(0x10000, 0x32, True), (0x10800, 4, False)])
+        self.assertEqual([(span.start, span.length, span.needs_read) for span in plan_spans(self.registry.snapshot, False)],
+                         [(0x10000, 0x10, False), (0x10018, 2, False), (0x10020, 2, False),
+                          (0x10030, 2, False), (0x10800, 4, False)])
+
+        self.assertIs(type(spans[0].patch(bytes(spans[0].length))), bytes)
+
+        self.assertEqual(engine.tick(), 0)
+        self.assertEqual((len(self.memory.writes), len(self.memory.reads), self.memory.rejected), (2, 1, 0))
+        self.assertEqual((engine.last_syscalls, engine.last_saved), (3, 5))
+        self.assertEqual([self.memory.value(0x10000 + index * 4, 'i') for index in range(4)], [0, 1, 2, 3])
+        self.assertEqual([self.memory.value(0x10000 + offset, 'h') for offset in (0x18, 0x20, 0x30)],
+                         [0x18, 0x20, 0x30])
+        self.assertEqual(bytes(self.memory.data[0x14:0x18]), b'\xaa' * 4)
+        self.assertEqual(self.memory.value(0x10800, 'f'), 1.0)
+
+        # 区间写入失败时逐个写入，不可写的地址之外的锁定值仍然写入
+        self.memory.readonly = [(0x10028, 0x1002a)]
+        self.memory.writes.clear()
+        struct.pack_into('<h', self.memory.data, 0x30, 0)
+        self.assertEqual(engine.tick(), 0)
+        self.assertEqual(self.memory.value(0x10030, 'h'), 0x30)
+        self.assertEqual(len(self.memory.writes), 1 + 7)
+
+    def test_freeze_modes(self):
+        """条件锁定只在数值不满足条件时写入，合并的区间只读取一次"""
+        engine = FreezeEngine(self.memory.write, registry=self.registry, read=self.memory.read)
+        self.registry.add(0x10000, 'int32', 100, 'changed')
+        self.registry.add(0x10004, 'int32', 50, 'floor')
+        self.registry.add(0x10008, 'int32', 10, 'ceiling')
+        self.registry.add(0x1000c, 'float', 10.0, 'increase', 4)
+        with self.assertRaises(ValueError):
+            self.registry.add(0x10010, 'int32', 1, 'sometimes')
+        with self.assertRaises(ValueError):
+            self.registry.add(0x10010, 'int32', 1, 'decrease', 0)
+
+        struct.pack_into('<iiif', self.memory.data, 0, 100, 60, 5, 1.0)
+        engine.tick()
+        self.assertEqual(len(self.memory.reads), 1)
+        self.assertEqual([self.memory.value(0x1000c, 'f')], [5.0])
+        self.assertEqual(struct.unpack_from('<iii', self.memory.data, 0), (100, 60, 5))
+        self.assertEqual(engine.observed(0x1000c), struct.pack('<f', 5.0))
+
+        # 游戏修改数值后只写入不满足条件的锁定值，整个区间一次写入
+        struct.pack_into('<iii', self.memory.data, 0, 99, 40, 20)
+        self.memory.writes.clear()
+        engine.tick()
+        self.assertEqual(len(self.memory.writes), 1)
+        self.assertEqual((engine.last_syscalls, engine.last_saved), (2, 6))
+        engine.tick()
+        self.assertEqual(struct.unpack_from('<iiif', self.memory.data, 0), (100, 50, 10, 10.0))
+        self.assertEqual(self.memory.rejected, 0)
+
+        # 数值都满足条件时只读取，不写入
+        self.memory.writes.clear()
+        engine.tick()
+        self.assertEqual(self.memory.writes, [])
+        self.assertEqual((engine.last_syscalls, engine.last_saved), (1, 3))
+
+        # 区间写入失败后逐个写入，节省的调用次数按逐个处理的调用次数计算
+        self.memory.readonly = [(0x10004, 0x10008)]
+        struct.pack_into('<ii', self.memory.data, 0, 1, 1)
+        engine.tick()
+        self.assertEqual(self.memory.value(0x10000, 'i'), 100)
+        self.assertEqual((engine.last_syscalls, engine.last_saved), (4, 2))
+        self.memory.readonly = ()
+
+        # 逐个处理时也按条件写入
+        self.registry.update(0x10004, mode='decrease')
+        self.registry.add(0x10800, 'int16', 7, 'changed')
+        struct.pack_into('<h', self.memory.data, 0x800, 7)
+        self.memory.writes.clear()
+        engine.tick()
+        self.assertEqual(self.memory.writes, [])
+        self.assertEqual(self.registry.get(0x10004).amount, 1)
+
+    def test_overlapping_conditional(self):
+        """重叠的条件锁定按前一项写入后的内容判断，不用读取到的旧字节决定"""
+        engine = FreezeEngine(self.memory.write, registry=self.registry, read=self.memory.read)
+        self.registry.add(0x10000, 'int32', 0x11112222, 'changed')
+        self.registry.add(0x10002, 'int16', 0x3333, 'changed')
+        spans = plan_spans(self.registry.snapshot)
+        self.assertEqual(len(spans), 1)
+
+        # 读取到的内容满足后一项，但前一项写入后不再满足，后一项仍要写入
+        current = struct.pack('<hh', 0, 0x3333)
+        data, decisions = spans[0].resolve(current)
+        self.assertEqual(data, struct.pack('<hh', 0x2222, 0x3333))
+        self.assertEqual([patch for entry, patch in decisions], [struct.pack('<i', 0x11112222), struct.pack('<h', 0x3333)])
+
+        self.memory.data[0:4] = current
+        engine.tick()
+        self.assertEqual(self.memory.value(0x10000, 'i'), 0x33332222)
+        self.assertEqual(len(self.memory.writes), 1)
+
+    def test_tick_cost(self):
+        """锁定表中的数值已预先打包，200个地址的一次写入周期只遍历锁定表"""
+        for index in range(200):
+            self.registry.add(0x10000 + index * 8, 'float' if index % 2 else 'double', index)
+        engine = FreezeEngine(lambda address, data: True, registry=self.registry)
+        start = time.perf_counter()
+        for _ in range(100):
+            engine.tick()
+        self.assertLess((time.perf_counter() - start) / 100, 0.002)
+
+    def test_background_thread(self):
+        """后台线程按周期持续写入，游戏修改后的值很快被改回"""
+        self.engine.period = 0
+        self.assertEqual(self.engine.period, MIN_PERIOD)
+        self.engine.period = 0.002
+        self.registry.add(0x10000, 'int32', 100)
+        self.engine.start()
+        self.assertTrue(self.engine.is_running)
+        deadline = time.monotonic() + 2
+        while self.engine.tick_count < 5 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.assertGreaterEqual(self.engine.tick_count, 5)
+
+        struct.pack_into('<i', self.memory.data, 0, 99)  # 模拟游戏扣减数值
+        deadline = time.monotonic() + 2
+        while self.memory.value(0x10000, 'i') != 100 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        self.assertEqual(self.memory.value(0x10000, 'i'), 100)
+
+        self.engine.stop()
+        self.assertFalse(self.engine.is_running)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,7 @@ import unittest
 from pathlib import Path
 import time
 import json
-from PyQt5.QtWidgets import QApplication, QTableWidgetItem
+from PyQt5.QtWidgets import QApplication
 from PyQt5.QtTest import QTest
 from PyQt5.QtCore import Qt
 
@@ -13,6 +13,8 @@ project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
 from main import GameCheater
+from utils.candidate_set import CandidateSet
+from utils.memory_helper import update_memory_table
 from tests.test_utils import TestUtils
 
 # 添加update_search_results方法
@@ -28,40 +30,13 @@ def update_search_results(self, results):
         print("当前任务或内存表格不存在")
         return
 
-    # 清空表格
-    current_task.memory_table.setRowCount(0)
-
-    # 添加结果到表格
-    for i, addr in enumerate(results):
-        current_task.memory_table.insertRow(i)
-        current_task.memory_table.setItem(i, 0, QTableWidgetItem(hex(addr)))
-
-        # 读取内存值
-        if hasattr(self.memory_reader, 'current_value_type'):
-            value_type = self.memory_reader.current_value_type
-        else:
-            value_type = 'int32'
-
-        if value_type == 'int32':
-            size = 4
-            data = self.memory_reader.read_memory(addr, size)
-            if data and len(data) == size:
-                value = int.from_bytes(data, 'little', signed=True)
-                current_task.memory_table.setItem(i, 1, QTableWidgetItem(str(value)))
-        elif value_type == 'float':
-            size = 4
-            data = self.memory_reader.read_memory(addr, size)
-            if data and len(data) == size:
-                import struct
-                value = struct.unpack('<f', data)[0]
-                current_task.memory_table.setItem(i, 1, QTableWidgetItem(f"{value:.6f}"))
-        elif value_type == 'double':
-            size = 8
-            data = self.memory_reader.read_memory(addr, size)
-            if data and len(data) == size:
-                import struct
-                value = struct.unpack('<d', data)[0]
-                current_task.memory_table.setItem(i, 1, QTableWidgetItem(f"{value:.10f}"))
+    # 按任务的值类型显示结果，表格各行在显示时读取内存
+    if hasattr(self.memory_reader, 'current_value_type') and self.memory_reader.current_value_type:
+        value_type = self.memory_reader.current_value_type
+    else:
+        value_type = 'int32'
+    update_memory_table(current_task.memory_table, CandidateSet.from_iterable(results),
+                        self.memory_reader, task_value_type=value_type)
 
 # 添加方法到GameCheater类
 GameCheater.update_search_results = update_search_results
@@ -143,7 +118,7 @@ class TestGameCheater(unittest.TestCase):
             # 验证搜索结果
             current_task = self.window.task_manager.get_current_task()
             if current_task and current_task.memory_table:
-                row_count = current_task.memory_table.rowCount()
+                row_count = current_task.memory_table.model().rowCount()
                 print(f"搜索结果数量: {row_count}")
                 self.assertTrue(row_count >= 0)
 
@@ -303,7 +278,7 @@ class TestGameCheater(unittest.TestCase):
         # 验证搜索结果
         current_task = self.window.task_manager.get_current_task()
         if current_task and current_task.memory_table:
-            row_count = current_task.memory_table.rowCount()
+            row_count = current_task.memory_table.model().rowCount()
             print(f"浮点数搜索结果数量: {row_count}")
             self.assertTrue(row_count >= 0)
 
@@ -334,7 +309,7 @@ class TestGameCheater(unittest.TestCase):
         # 验证搜索结果
         current_task = self.window.task_manager.get_current_task()
         if current_task and current_task.memory_table:
-            row_count = current_task.memory_table.rowCount()
+            row_count = current_task.memory_table.model().rowCount()
             print(f"双精度搜索结果数量: {row_count}")
             self.assertTrue(row_count >= 0)
 
@@ -407,7 +382,7 @@ class TestGameCheater(unittest.TestCase):
             # 验证搜索结果
             current_task = self.window.task_manager.get_current_task()
             if current_task and current_task.memory_table:
-                row_count = current_task.memory_table.rowCount()
+                row_count = current_task.memory_table.model().rowCount()
                 print(f"比较模式 '{mode}' 搜索结果数量: {row_count}")
                 self.assertTrue(row_count >= 0)
 
@@ -0,0 +1,114 @@
+import struct
+import sys
+import unittest
+from pathlib import Path
+
+from PyQt5.QtCore import QPersistentModelIndex, Qt
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from tests.fakes import FakeMemory, make_candidates
+from utils.candidate_set import TaggedCandidateSet
+from utils.memory_model import MemoryTableModel
+from utils.value_history import ValueHistory
+
+BASE = 0x10000
+
+
+class TestMemoryTableModel(unittest.TestCase):
+    """测试按需读取搜索结果的内存表格模型"""
+
+    def setUp(self):
+        self.reader = FakeMemory(base=BASE)
+        self.model = MemoryTableModel()
+
+    def text(self, row, column):
+        return self.model.data(self.model.index(row, column))
+
+    def test_lazy_rows(self):
+        """设置结果时不读取内存，只有请求的行才读取和格式化"""
+        candidates = make_candidates(range(BASE, BASE + 0x1000, 4), range(1024))
+        history = ValueHistory()
+        history.start(candidates)
+        struct.pack_into('<i', self.reader.data, 8, 5)
+
+        self.model.set_results(candidates, self.reader, history, 'int32')
+        self.assertEqual((self.model.rowCount(), self.model.columnCount()), (1024, 5))
+        self.assertEqual(self.reader.reads, [])
+
+        self.assertEqual([self.text(2, column) for column in range(5)], [hex(BASE + 8), '5', '-', '2', '整数'])
+        self.assertEqual(self.reader.reads, [BASE + 8])
+
+        # 同一次刷新内不重复读取，刷新后重新读取
+        self.text(2, 1)
+        self.assertEqual(len(self.reader.reads), 1)
+        self.model.refresh(0, 10)
+        self.text(2, 1)
+        self.assertEqual(len(self.reader.reads), 2)
+
+        self.model.clear()
+        self.assertEqual(self.model.rowCount(), 0)
+
+    def test_changed_value(self):
+        """当前值与先前值不同时标记背景色"""
+        first = make_candidates([BASE, BASE + 4], [1, 2])
+        second = make_candidates([BASE, BASE + 4], [1, 2])
+        history = ValueHistory()
+        history.start(first)
+        history.advance(first, second)
+        struct.pack_into('<ii', self.reader.data, 0, 1, 3)
+
+        self.model.set_results(second, self.reader, history, 'int32')
+        self.assertIsNone(self.model.data(self.model.index(0, 1), Qt.BackgroundRole))
+        self.assertIsNotNone(self.model.data(self.model.index(1, 1), Qt.BackgroundRole))
+
+    def test_tagged_rows(self):
+        """所有类型扫描的结果各行使用所在分组的类型"""
+        tagged = TaggedCandidateSet({
+            'int16': make_candidates([BASE, BASE + 2], [7, 7], 'int16'),
+            'float': make_candidates([BASE + 0x10], [7.0], 'float'),
+        })
+        history = ValueHistory()
+        history.start(tagged)
+        struct.pack_into('<f', self.reader.data, 0x10, 7.0)
+
+        self.model.set_results(tagged, self.reader, history, 'all')
+        self.assertEqual(self.model.rowCount(), 3)
+        self.assertEqual([self.text(row, 4) for row in range(3)], ['2字节', '2字节', '浮点'])
+        self.assertEqual(self.text(2, 1), '7.000000')
+
+    def test_sort(self):
+        """排序只改变行的排列，按地址或记录的数值排序"""
+        candidates = make_candidates([BASE, BASE + 4, BASE + 8], [30, 10, 20])
+        history = ValueHistory()
+        history.start(candidates)
+        self.model.set_results(candidates, self.reader, history, 'int32')
+
+        self.model.sort(0, Qt.DescendingOrder)
+        self.assertEqual([self.text(row, 0) for row in range(3)], [hex(BASE + 8), hex(BASE + 4), hex(BASE)])
+        self.model.sort(3, Qt.AscendingOrder)
+        self.assertEqual([self.text(row, 0) for row in range(3)], [hex(BASE + 4), hex(BASE + 8), hex(BASE)])
+
+        # 没有先前值时不能按先前值排序，保持原来的排列
+        self.model.sort(2, Qt.AscendingOrder)
+        self.assertEqual(self.text(0, 0), hex(BASE + 4))
+
+    def test_sort_persistent_index(self):
+        """排序后视图持有的索引（选中行）仍指向原来的地址"""
+        candidates = make_candidates([BASE, BASE + 4, BASE + 8], [30, 10, 20])
+        history = ValueHistory()
+        history.start(candidates)
+        self.model.set_results(candidates, self.reader, history, 'int32')
+
+        selected = QPersistentModelIndex(self.model.index(0, 1))
+        self.model.sort(3, Qt.AscendingOrder)
+        self.assertEqual((selected.row(), selected.column()), (2, 1))
+        self.model.sort(0, Qt.DescendingOrder)
+        self.assertEqual(selected.row(), 2)
+        self.assertEqual(self.text(selected.row(), 0), hex(BASE))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,343 @@
+import struct
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+import memory_reader
+from memory_reader import MemoryReader
+from tests.fakes import FakeMemory
+from utils.region_map import MEM_COMMIT, MEM_PRIVATE, Region, RegionFilter, RegionMap
+from utils.scan_engine import HAS_NUMPY, PythonScanEngine, get_scan_engine
+from utils.candidate_set import TaggedCandidateSet
+from utils.value_types import ALL_TYPES, get_type_info, types_for_value
+
+BASE = 0x100000
+PAGE_READWRITE = 0x04
+
+
+class MemoryReaderTestCase(unittest.TestCase):
+    """MemoryReader的扫描测试，目标进程的内存读取和区域表由FakeMemory模拟"""
+
+    SIZE = 0x10000
+    REGION_SIZE = 0x1000
+
+    def setUp(self):
+        self.memory = FakeMemory(self.SIZE, base=BASE)
+        self.reader = MemoryReader()
+        self.reader.process_handle = True
+        self.reader._read_memory_into = self.memory.read_into
+        self.reader.region_map = RegionMap(self.query, BASE, BASE + self.SIZE, dict)
+        self.reader.region_map.refresh()
+        self.engines = [PythonScanEngine()]
+        if HAS_NUMPY:
+            self.engines.append(get_scan_engine('numpy'))
+
+    def tearDown(self):
+        self.reader.shutdown_thread_pool()
+        self.reader.process_handle = None
+
+    def query(self, address):
+        """模拟VirtualQueryEx：FakeMemory的内容分为大小相同的可读写私有区域"""
+        if not BASE <= address < BASE + self.SIZE:
+            return None
+        base = address - (address - BASE) % self.REGION_SIZE
+        return Region(base, self.REGION_SIZE, MEM_COMMIT, PAGE_READWRITE, MEM_PRIVATE, base)
+
+    def fill(self, fmt, values):
+        """从BASE开始依次写入数值"""
+        size = struct.calcsize('<' + fmt)
+        for index, value in enumerate(values):
+            struct.pack_into('<' + fmt, self.memory.data, index * size, value)
+
+    def find(self, fmt, predicate):
+        """逐个对齐位置解析FakeMemory的内容，返回满足条件的地址，作为比较基准"""
+        size = struct.calcsize('<' + fmt)
+        return [BASE + offset for offset in range(0, self.SIZE, size)
+                if predicate(struct.unpack_from('<' + fmt, self.memory.data, offset)[0])]
+
+
+class TestSearchValue(MemoryReaderTestCase):
+    """测试首次扫描：各比较引擎的结果一致，各区域的结果按地址顺序合并"""
+
+    def test_exact(self):
+        """精确查找int32、float、double，结果按地址升序并附带数值"""
+        cases = [('int32', 'i', [0, 1, 100, -5, 100, 7], 100),
+                 ('float', 'f', [0.5, 3.25, -2.0, 3.25, 100.0], 3.25),
+                 ('double', 'd', [1e10, -0.125, 2.5, 2.5], 2.5)]
+        for value_type, fmt, pattern, target in cases:
+            self.memory.data[:] = bytes(self.SIZE)
+            self.fill(fmt, pattern * (self.SIZE // struct.calcsize('<' + fmt) // len(pattern)))
+            expected = self.find(fmt, lambda value: value == target)
+            for engine in self.engines:
+                self.reader.scan_engine = engine
+                results = self.reader.search_value(target, value_type)
+                self.assertEqual(results.to_list(), expected, f"{engine.name}: {value_type}")
+                self.assertEqual(results.values.to_list(), [target] * len(expected))
+
+    def test_compare(self):
+        """大于/小于比较与逐个解析的结果一致"""
+        self.fill('i', [(index * 37) % 200 - 100 for index in range(self.SIZE // 4)])
+        for engine in self.engines:
+            self.reader.scan_engine = engine
+            self.assertEqual(self.reader.search_value(90, 'int32', 'bigger').to_list(),
+                             self.find('i', lambda value: value > 90), engine.name)
+            self.assertEqual(self.reader.search_value(-90, 'int32', 'smaller').to_list(),
+                             self.find('i', lambda value: value < -90), engine.name)
+
+    def test_merge_order(self):
+        """线程池中各区域完成的顺序不同，结果仍按区域顺序合并；不可读的区域被跳过"""
+        for region in range(self.SIZE // self.REGION_SIZE):
+            self.memory.set_int(BASE + region * self.REGION_SIZE + 0x10, 42)
+            self.memory.set_int(BASE + region * self.REGION_SIZE + 0xff0, 42)
+        self.memory.unreadable = {3}
+        expected = [address for address in self.find('i', lambda value: value == 42)
+                    if not BASE + 0x3000 <= address < BASE + 0x4000]
+        results = self.reader.search_value(42, 'int32')
+        self.assertEqual(results.to_list(), expected)
+        self.assertEqual(len(results), 30)
+
+
+class TestRegionFilterScan(MemoryReaderTestCase):
+    """测试首次扫描使用的区域筛选"""
+
+    def test_clipped_mixed_types(self):
+        """裁剪后的起始地址不对齐时，各类型按自身大小对齐，较小的类型不丢失结果"""
+        clipped = RegionFilter(address_ranges=[(BASE + 3, BASE + 0x100)])
+
+        results = self.reader.search_value(0, ALL_TYPES, region_filter=clipped)
+        counts = {value_type: len(part) for value_type, part in results.parts.items()}
+        self.assertEqual((counts['int8'], counts['int16'], counts['int32'], counts['int64']), (253, 126, 63, 31))
+        self.assertEqual(results.parts['int32'][0], BASE + 4)
+        self.assertEqual(results.parts['int16'][0], BASE + 4)
+        self.assertEqual(results.parts['int8'][0], BASE + 3)
+
+        parts = self.reader.search_values([('a', 0, 'int8'), ('b', 0, 'int32'), ('c', 0.0, 'double')],
+                                          region_filter=clipped)
+        self.assertEqual([len(part) for part in parts.values()], [253, 63, 31])
+
+        # 单一类型的扫描不受影响，默认使用读取器的筛选条件
+        self.reader.region_filter = clipped
+        self.assertEqual(len(self.reader.search_value(0, 'int32')), 63)
+        self.assertEqual(list(self.reader.search_value(0, 'int32', region_filter=RegionFilter(
+            address_ranges=[(BASE + 0x10, BASE + 0x18)]))), [BASE + 0x10, BASE + 0x14])
+
+
+
+class TestScanWindows(MemoryReaderTestCase):
+    """测试大区域按重叠的窗口流式扫描"""
+
+    STRADDLING = [BASE + 0xfe, BASE + 0x1fd, BASE + 0x2ff, BASE + 0x3fc]
+
+    def setUp(self):
+        super().setUp()
+        for address in self.STRADDLING:
+            struct.pack_into('<i', self.memory.data, address - BASE, 0x12345678)
+
+    def test_window_overlap(self):
+        """跨越窗口边界的数值只找到一次，结果与整个区域一次扫描一致"""
+        whole = self.reader.search_value(0x12345678, 'int32', unaligned=True).to_list()
+        self.assertEqual(whole, self.STRADDLING)
+        self.assertNotIn(BASE + 0x100, self.memory.reads)
+
+        with mock.patch.object(memory_reader, 'SCAN_WINDOW_SIZE', 0x100):
+            for engine in self.engines:
+                self.reader.scan_engine = engine
+                self.assertEqual(self.reader.search_value(0x12345678, 'int32', unaligned=True).to_list(),
+                                 whole, engine.name)
+                self.assertEqual(self.reader.search_value(0x12345678, 'int32').to_list(), [BASE + 0x3fc])
+        self.assertIn(BASE + 0x100, self.memory.reads)
+
+    def test_tagged_window_overlap(self):
+        """所有类型扫描的窗口重叠最大数值大小减1字节，较小的类型不会在重叠部分重复"""
+        expected = self.reader.search_value(0x12345678, ALL_TYPES, unaligned=True)
+        self.assertEqual(expected.parts['int32'].to_list(), self.STRADDLING)
+        with mock.patch.object(memory_reader, 'SCAN_WINDOW_SIZE', 0x100):
+            results = self.reader.search_value(0x12345678, ALL_TYPES, unaligned=True)
+        self.assertEqual({value_type: part.to_list() for value_type, part in results.parts.items()},
+                         {value_type: part.to_list() for value_type, part in expected.parts.items()})
+
+
+
+class TestNextScan(MemoryReaderTestCase):
+    """测试后续扫描：候选地址分片并行筛选，结果按分片顺序合并"""
+
+    def setUp(self):
+        super().setUp()
+        self.fill('i', [index % 3 for index in range(self.SIZE // 4)])
+
+    def test_filter_shards(self):
+        """分片数量多于线程数时，合并后的结果与逐个比较一致且有序"""
+        first = self.reader.search_value(1, 'int32')
+        self.assertEqual(len(first), self.SIZE // 12)
+        changed = set(first.to_list()[::5])
+        for address in changed:
+            self.memory.set_int(address, 2)
+
+        with mock.patch.object(memory_reader, 'NEXT_SCAN_BATCH_SIZE', 64):
+            for engine in self.engines:
+                self.reader.scan_engine = engine
+                self.reader.is_running = True  # 由search_value设置
+                results, checked, reads = self.reader._filter_candidates_parallel(
+                    first, 'int32', 'exact', 1, 'thread', lambda current, total: None)
+                self.assertEqual(results.to_list(), [address for address in first if address not in changed])
+                self.assertEqual(results.values.to_list(), [1] * len(results))
+                self.assertEqual(checked, len(first))
+                self.assertGreater(reads, 0)
+
+                # 与先前值比较使用首次扫描记录的数值列
+                increased = self.reader.search_value(None, 'int32', 'increased', last_results=first)
+                self.assertEqual(increased.to_list(), sorted(changed))
+                self.assertEqual(increased.values.to_list(), [2] * len(changed))
+
+    def test_cancelled(self):
+        """取消后续扫描时只合并已完成的分片，结果仍然有序"""
+        first = self.reader.search_value(0, 'int32')
+        calls = []
+
+        def progress(current, total):
+            calls.append(current)
+            self.reader.is_running = False
+
+        with mock.patch.object(memory_reader, 'NEXT_SCAN_BATCH_SIZE', 64):
+            self.reader.is_running = True
+            results, checked, _ = self.reader._filter_candidates_parallel(first, 'int32', 'exact', 0, 'thread', progress)
+        self.assertEqual(len(calls), 1)
+        self.assertLess(checked, len(first))
+        self.assertEqual(results.to_list(), sorted(set(results.to_list()) & set(first.to_list())))
+
+
+
+class TestAllTypesScan(MemoryReaderTestCase):
+    """测试所有数值类型扫描：每个区域只读取一次，结果按类型分组，后续扫描按类型筛选"""
+
+    def setUp(self):
+        super().setUp()
+        for region in range(self.SIZE // self.REGION_SIZE):
+            offset = region * self.REGION_SIZE
+            struct.pack_into('<hhifiqd', self.memory.data, offset + 0x100, 300, 0, 300, 300.0, 0, 300, 300.0)
+
+    def expected(self, value):
+        """各类型逐个对齐位置解析的结果"""
+        return {value_type: self.find(get_type_info(value_type)['format'], lambda found: found == target)
+                for value_type, target in types_for_value(value)}
+
+    def test_first_scan(self):
+        """各类型的结果与逐个类型解析一致，内存只读取一遍"""
+        for engine in self.engines:
+            self.reader.scan_engine = engine
+            self.memory.reads.clear()
+            results = self.reader.search_value(300, ALL_TYPES)
+            self.assertIsInstance(results, TaggedCandidateSet)
+            self.assertEqual({value_type: part.to_list() for value_type, part in results.parts.items()},
+                             self.expected(300), engine.name)
+            self.assertEqual(len(self.memory.reads), self.SIZE // self.REGION_SIZE)
+            self.assertEqual(results.parts['int32'].values.to_list(), [300] * len(results.parts['int32']))
+
+    def test_scan_regions_tagged(self):
+        """带标签的扫描返回各标签的结果、检查的地址数和读取的字节数"""
+        self.reader.is_running = True  # 由search_value设置
+        parts, checked, scanned = self.reader._scan_regions_tagged(
+            self.reader.region_map.readable_regions(), [('a', 'int16', 300), ('b', 'float', 300.0)],
+            'exact', 'thread', lambda current, total: None)
+        self.assertEqual(parts['a'].to_list(), self.find('h', lambda found: found == 300))
+        self.assertEqual(parts['b'].to_list(), self.find('f', lambda found: found == 300.0))
+        self.assertEqual(scanned, self.SIZE)
+        self.assertEqual(checked, self.SIZE // 2 + self.SIZE // 4)
+
+    def test_next_scan(self):
+        """后续扫描按类型分组筛选，搜索值无法表示的类型全部淘汰"""
+        first = self.reader.search_value(300, ALL_TYPES)
+        self.memory.set_int(BASE + 0x104, 301)
+        results = self.reader.search_value(300, ALL_TYPES, last_results=first)
+        for value_type in ('int16', 'int32'):
+            self.assertEqual(results.parts[value_type].to_list(),
+                             [address for address in first.parts[value_type] if address != BASE + 0x104])
+        self.assertEqual(results.parts['double'].to_list(), first.parts['double'].to_list())
+
+        for region in range(self.SIZE // self.REGION_SIZE):
+            self.memory.set_int(BASE + region * self.REGION_SIZE + 0x104, 70000)
+        results = self.reader.search_value(70000, ALL_TYPES, last_results=first)
+        self.assertNotIn('int16', results.parts)
+        self.assertEqual(results.parts['int32'].to_list(), self.find('i', lambda found: found == 70000))
+
+        # 不是所有类型扫描的结果不能按所有类型筛选
+        self.assertEqual(len(self.reader.search_value(300, ALL_TYPES, last_results=first.parts['int32'])), 0)
+
+
+
+class TestMultiValueScan(MemoryReaderTestCase):
+    """测试多值扫描：一次读取内存，同时查找多个带标签的数值"""
+
+    def setUp(self):
+        super().setUp()
+        for address in (BASE + 0x40, BASE + 0x3000, BASE + 0xfffc):
+            self.memory.set_int(address, 906)
+        for address in (BASE + 0x44, BASE + 0x5000):
+            self.memory.set_int(address, 87)
+        struct.pack_into('<f', self.memory.data, 0x7008, 1.5)
+
+    def test_search_values(self):
+        """各标签的结果与单独扫描一致，按targets的顺序返回"""
+        for engine in self.engines:
+            self.reader.scan_engine = engine
+            self.memory.reads.clear()
+            parts = self.reader.search_values([('金币', '906', 'int32'), ('生命', 87, 'int32'),
+                                               ('速度', '1.5', 'float'), ('钻石', 12345, 'int32')])
+            self.assertEqual(list(parts), ['金币', '生命', '速度', '钻石'])
+            self.assertEqual(parts['金币'].to_list(), [BASE + 0x40, BASE + 0x3000, BASE + 0xfffc], engine.name)
+            self.assertEqual(parts['生命'].to_list(), [BASE + 0x44, BASE + 0x5000])
+            self.assertEqual(parts['速度'].to_list(), [BASE + 0x7008])
+            self.assertEqual(parts['速度'].values.to_list(), [1.5])
+            self.assertEqual(len(parts['钻石']), 0)
+            self.assertEqual(len(self.memory.reads), self.SIZE // self.REGION_SIZE)
+
+    def test_invalid_targets(self):
+        """标签重复、没有指定类型或没有搜索值时返回空字典"""
+        self.assertEqual(self.reader.search_values([('a', 1, 'int32'), ('a', 2, 'int32')]), {})
+        self.assertEqual(self.reader.search_values([('a', 1, ALL_TYPES)]), {})
+        self.assertEqual(self.reader.search_values([]), {})
+        self.assertEqual(self.memory.reads, [])
+
+
+
+class TestGroupScan(MemoryReaderTestCase):
+    """测试分组扫描：多个数值都出现在窗口范围内的位置"""
+
+    def setUp(self):
+        super().setUp()
+        # 生命、最大生命、魔法相邻的结构体，以及只有部分数值的干扰项
+        struct.pack_into('<iih', self.memory.data, 0x5120, 100, 100, 50)
+        struct.pack_into('<ii', self.memory.data, 0x2000, 100, 100)
+        struct.pack_into('<h', self.memory.data, 0x2040, 50)
+        self.memory.set_int(BASE + 0x9000, 100)
+        struct.pack_into('<h', self.memory.data, 0x9004, 50)
+
+    def test_search_group(self):
+        """重复的搜索项要求窗口内有相应数量的命中"""
+        terms = [('int32', 100), ('int32', '100'), ('int16', 50)]
+        for engine in self.engines:
+            self.reader.scan_engine = engine
+            self.assertEqual(self.reader.search_group(terms, 16).to_list(), [BASE + 0x5120], engine.name)
+        self.assertEqual(self.reader.search_group(terms[1:], 8).to_list(), [BASE + 0x5124, BASE + 0x9000])
+        self.assertEqual(self.reader.search_group(terms, 0x48).to_list(), [BASE + 0x2000, BASE + 0x5120])
+
+    def test_region_filter(self):
+        """分组扫描使用多值扫描的区域筛选"""
+        terms = [('int32', 100), ('int16', 50)]
+        in_range = RegionFilter(address_ranges=[(BASE + 0x9000, BASE + 0xa000)])
+        self.assertEqual(self.reader.search_group(terms, 8, region_filter=in_range).to_list(), [BASE + 0x9000])
+
+    def test_invalid_terms(self):
+        """窗口小于最大的数值大小或没有指定类型时返回空结果"""
+        self.assertEqual(len(self.reader.search_group([('int32', 100)], 2)), 0)
+        self.assertEqual(len(self.reader.search_group([(ALL_TYPES, 100)], 16)), 0)
+        self.assertEqual(self.memory.reads, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -125,7 +125,7 @@ class TestPerformance(unittest.TestCase):
         # 获取搜索结果数量
         row_count = 0
         if current_task and current_task.memory_table:
-            row_count = current_task.memory_table.rowCount()
+            row_count = current_task.memory_table.model().rowCount()
 
         print(f"整数搜索耗时: {elapsed:.6f} 秒, 找到 {row_count} 个结果")
         print("✓ 整数搜索性能测试完成")
@@ -155,7 +155,7 @@ class TestPerformance(unittest.TestCase):
         # 获取搜索结果数量
         row_count = 0
         if current_task and current_task.memory_table:
-            row_count = current_task.memory_table.rowCount()
+            row_count = current_task.memory_table.model().rowCount()
 
         print(f"浮点数搜索耗时: {elapsed:.6f} 秒, 找到 {row_count} 个结果")
         print("✓ 浮点数搜索性能测试完成")
@@ -185,7 +185,7 @@ class TestPerformance(unittest.TestCase):
         # 获取搜索结果数量
         row_count = 0
         if current_task and current_task.memory_table:
-            row_count = current_task.memory_table.rowCount()
+            row_count = current_task.memory_table.model().rowCount()
 
         print(f"双精度搜索耗时: {elapsed:.6f} 秒, 找到 {row_count} 个结果")
         print("✓ 双精度搜索性能测试完成")
@@ -249,14 +249,14 @@ class TestPerformance(unittest.TestCase):
         task1 = self.window.task_manager.get_current_task()
         row_count1 = 0
         if task1 and task1.memory_table:
-            row_count1 = task1.memory_table.rowCount()
+            row_count1 = task1.memory_table.model().rowCount()
 
         self.window.task_manager.setCurrentIndex(1)
         TestUtils.wait(500)
         task2 = self.window.task_manager.get_current_task()
         row_count2 = 0
         if task2 and task2.memory_table:
-            row_count2 = task2.memory_table.rowCount()
+            row_count2 = task2.memory_table.model().rowCount()
 
         print(f"整数搜索耗时: {elapsed1:.6f} 秒, 找到 {row_count1} 个结果")
         print(f"浮点数搜索耗时: {elapsed2:.6f} 秒, 找到 {row_count2} 个结果")
@@ -297,7 +297,7 @@ class TestPerformance(unittest.TestCase):
         # 获取搜索结果数量
         row_count = 0
         if current_task and current_task.memory_table:
-            row_count = current_task.memory_table.rowCount()
+            row_count = current_task.memory_table.model().rowCount()
 
         print(f"搜索前内存使用: {memory_before:.2f} MB")
         print(f"搜索后内存使用: {memory_after:.2f} MB")
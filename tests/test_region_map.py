@@ -0,0 +1,112 @@
+import sys
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from utils.region_map import (MEM_COMMIT, MEM_FREE, MEM_IMAGE, MEM_MAPPED, MEM_PRIVATE, PAGE_GUARD,
+                              Region, RegionFilter, RegionMap, get_region_filter)
+
+PAGE_READWRITE = 0x04
+PAGE_NOACCESS = 0x01
+
+
+class FakeProcess:
+    """模拟VirtualQueryEx和模块枚举，记录查询次数"""
+
+    def __init__(self, regions):
+        self.regions = regions  # [(基址, 大小, 状态, 保护属性, 类型, 分配基址)]
+        self.modules = {0x10000: 'C:\\game\\game.exe'}
+        self.queries = 0
+        self.module_lists = 0
+
+    def query(self, address):
+        self.queries += 1
+        for base, size, state, protect, type_, allocation_base in self.regions:
+            if base <= address < base + size:
+                return Region(base, size, state, protect, type_, allocation_base)
+        return None
+
+    def list_modules(self):
+        self.module_lists += 1
+        return self.modules
+
+
+class TestRegionMap(unittest.TestCase):
+    """测试内存区域表"""
+
+    def setUp(self):
+        self.process = FakeProcess([
+            (0x0, 0x10000, MEM_FREE, PAGE_NOACCESS, 0, 0),
+            (0x10000, 0x1000, MEM_COMMIT, 0x02, MEM_IMAGE, 0x10000),
+            (0x11000, 0x2000, MEM_COMMIT, PAGE_READWRITE, MEM_IMAGE, 0x10000),
+            (0x13000, 0x1000, MEM_COMMIT, PAGE_READWRITE | PAGE_GUARD, MEM_PRIVATE, 0x13000),
+            (0x14000, 0xC000, MEM_COMMIT, PAGE_READWRITE, MEM_PRIVATE, 0x14000),
+            (0x20000, 0x4000, MEM_COMMIT, 0x02, MEM_MAPPED, 0x20000),
+        ])
+        self.region_map = RegionMap(self.process.query, 0, 0x24000, self.process.list_modules)
+
+    def test_enumerate(self):
+        """枚举区域，筛选可读区域并解析所属模块"""
+        self.assertEqual(self.region_map.refresh(), 6)
+        self.assertEqual(len(self.region_map), 6)
+        self.assertEqual(self.region_map.readable_regions(),
+                         [(0x10000, 0x1000), (0x11000, 0x2000), (0x14000, 0xC000), (0x20000, 0x4000)])
+        self.assertEqual(self.region_map.module_of(0x11800), 'C:\\game\\game.exe')
+        self.assertIsNone(self.region_map.module_of(0x15000))
+        self.assertEqual(self.region_map.find(0x13fff).base, 0x13000)
+        self.assertIsNone(self.region_map.find(0x24000))
+
+    def test_incremental_refresh(self):
+        """刷新时复用未变化的区域，模块只在映像区域变化时重新枚举"""
+        self.region_map.refresh()
+        first = self.region_map.find(0x14000)
+        self.process.regions[3] = (0x13000, 0x1000, MEM_COMMIT, PAGE_READWRITE, MEM_PRIVATE, 0x13000)
+
+        self.assertEqual(self.region_map.refresh(), 1)
+        self.assertEqual(self.region_map.queries, 12)
+        self.assertIs(self.region_map.find(0x14000), first)
+        self.assertEqual(self.process.module_lists, 1)
+        self.assertIn((0x13000, 0x1000), self.region_map.readable_regions())
+
+        # 刚刷新过的区域表直接使用，省去每个区域的一次查询
+        self.assertEqual(self.region_map.refresh(max_age=60), 0)
+        self.assertEqual((self.process.queries, self.region_map.queries, self.region_map.saved), (12, 12, 6))
+        self.region_map.refresh()
+        self.assertEqual((self.process.queries, self.region_map.saved), (18, 6))
+
+    def test_region_filter(self):
+        """按预设方案、模块和地址范围筛选区域"""
+        self.region_map.refresh()
+        regions = self.region_map.readable_regions
+
+        self.assertEqual(regions(get_region_filter('private_writable')), [(0x14000, 0xC000)])
+        self.assertEqual(regions(get_region_filter('writable')), [(0x11000, 0x2000), (0x14000, 0xC000)])
+        self.assertEqual(regions(get_region_filter('no_image_mapped')), [(0x14000, 0xC000)])
+        self.assertEqual(regions(RegionFilter(include_modules=['GAME.EXE'])),
+                         [(0x10000, 0x1000), (0x11000, 0x2000)])
+        self.assertEqual(len(regions(RegionFilter(exclude_modules=['game.exe']))), 2)
+
+        # 区域被裁剪到地址范围内
+        ranges = RegionFilter(address_ranges=[(0x12000, 0x15000), (0x23000, 0x30000)])
+        self.assertEqual(regions(ranges), [(0x12000, 0x1000), (0x14000, 0x1000), (0x23000, 0x1000)])
+
+        # 未对齐的起始地址向上取整到扫描的对齐步长，对齐扫描不会错过范围内的数值
+        unaligned = RegionFilter(address_ranges=[(0x12001, 0x12100)])
+        self.assertEqual(regions(unaligned), [(0x12001, 0xFF)])
+        self.assertEqual(regions(unaligned, 4), [(0x12004, 0xFC)])
+        self.assertEqual(regions(unaligned, 8), [(0x12008, 0xF8)])
+
+        restored = RegionFilter.from_dict(get_region_filter('private_writable', exclude_modules=['a.dll']).to_dict())
+        self.assertTrue(restored.private_only)
+        self.assertEqual(restored.exclude_modules, {'a.dll'})
+        with self.assertRaises(ValueError):
+            RegionFilter(address_ranges=[(0x2000, 0x1000)])
+        with self.assertRaises(ValueError):
+            get_region_filter('unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,378 @@
+import sys
+import math
+import random
+import struct
+import unittest
+from array import array
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from tests.fakes import FakeMemory
+from utils import scan_engine
+from utils.scan_engine import (PythonScanEngine, HAS_NUMPY, get_scan_engine, coalesce_spans, filter_candidates,
+                                find_pattern_offsets, iter_scan_windows, join_groups, scan_labeled, scan_tagged,
+                                window_keep)
+from utils.value_types import get_type_info, types_for_value
+from utils.scan_worker import split_regions
+
+
+def reference_scan(data, value_type, compare_type, value):
+    """原先逐个切片解析的实现，作为比较基准"""
+    size = 8 if value_type == 'double' else 4
+    results = []
+    for i in range(0, len(data) - size + 1, size):
+        chunk = data[i:i + size]
+        if value_type == 'int32':
+            current = int.from_bytes(chunk, 'little', signed=True)
+            match = current == value if compare_type == 'exact' else \
+                current > value if compare_type == 'bigger' else \
+                current < value if compare_type == 'smaller' else False
+        else:
+            current = struct.unpack('<f' if value_type == 'float' else '<d', chunk)[0]
+            if math.isnan(current) or math.isinf(current):
+                continue
+            if compare_type == 'exact':
+                if value_type == 'float':
+                    epsilon = max(1e-4, abs(value) * 1e-4)
+                else:
+                    epsilon = max(1e-8, abs(value) * 1e-8)
+                if abs(value) < 1e-6:
+                    match = abs(current) < 1e-6
+                else:
+                    match = abs(current - value) < epsilon
+            elif compare_type == 'bigger':
+                match = current > value
+            elif compare_type == 'smaller':
+                match = current < value
+            else:
+                match = False
+        if match:
+            results.append(i)
+    return results
+
+
+def build_buffer(value_type, values):
+    """按类型打包测试数据"""
+    fmt = {'int32': '<i', 'float': '<f', 'double': '<d'}[value_type]
+    return b''.join(struct.pack(fmt, v) for v in values)
+
+
+class TestScanEngine(unittest.TestCase):
+    """测试比较引擎与原实现结果一致"""
+
+    def setUp(self):
+        rng = random.Random(1234)
+        self.int_values = [rng.choice([0, 1, 100, -5, 2 ** 31 - 1, -2 ** 31]) for _ in range(500)]
+        self.float_values = [rng.choice([0.0, 1e-7, 3.14, 3.14001, -2.5, 1e10, math.nan, math.inf])
+                             for _ in range(500)]
+        self.engines = [PythonScanEngine()]
+        if HAS_NUMPY:
+            self.engines.append(get_scan_engine('numpy'))
+
+    def _check(self, value_type, values, targets):
+        data = build_buffer(value_type, values) + b'\x01\x02\x03'  # 末尾不完整的数值应被忽略
+        for engine in self.engines:
+            for compare_type in ['exact', 'bigger', 'smaller', 'changed']:
+                for target in targets:
+                    expected = reference_scan(data, value_type, compare_type, target)
+                    offsets = [int(o) for o in engine.scan(data, value_type, compare_type, target)]
+                    self.assertEqual(offsets, expected,
+                                     f"{engine.name}: {value_type} {compare_type} {target}")
+
+    def test_int32(self):
+        """整数比较结果一致，包括超出范围的搜索值"""
+        self._check('int32', self.int_values, [0, 100, -5, 2 ** 31 - 1, 2 ** 40, -2 ** 40])
+
+    def test_float(self):
+        """单精度浮点数比较结果一致，包括NaN/Inf过滤"""
+        self._check('float', self.float_values, [0.0, 3.14, -2.5, 1e10, math.inf])
+
+    def test_double(self):
+        """双精度浮点数比较结果一致"""
+        self._check('double', self.float_values, [0.0, 3.14, 3.14001, -2.5, math.nan])
+
+    def test_empty_buffer(self):
+        """缓冲区小于数值大小时没有结果"""
+        for engine in self.engines:
+            self.assertEqual(len(engine.scan(b'\x00\x00', 'int32', 'exact', 0)), 0)
+
+    def test_unaligned_scan(self):
+        """非对齐扫描检查每个字节偏移，与逐字节解析的结果一致"""
+        data = b'\x07' + struct.pack('<i', 100) + b'\x00\x00' + struct.pack('<d', 2.5) + struct.pack('<h', 100) + b'\x09'
+        cases = [('int32', 'exact', 100), ('int32', 'bigger', 1000), ('double', 'exact', 2.5),
+                 ('float', 'smaller', -1.0), ('int16', 'exact', 100), ('int64', 'smaller', 0)]
+        for value_type, compare_type, target in cases:
+            fmt = '<' + get_type_info(value_type)['format']
+            size = struct.calcsize(fmt)
+            for alignment in (1, 2):
+                expected = []
+                for offset in range(0, len(data) - size + 1, alignment):
+                    number = struct.unpack_from(fmt, data, offset)[0]
+                    if PythonScanEngine().make_predicate(value_type, compare_type, target)(number):
+                        expected.append(offset)
+                for engine in self.engines:
+                    offsets = [int(o) for o in engine.scan(data, value_type, compare_type, target, alignment)]
+                    self.assertEqual(offsets, expected, f"{engine.name}: {value_type} {compare_type} {alignment}")
+        for engine in self.engines:
+            self.assertEqual([int(o) for o in engine.scan(data, 'int32', 'exact', 100, 1)], [1])
+            self.assertEqual([int(o) for o in engine.scan(data, 'double', 'exact', 2.5, 1)], [7])
+            self.assertEqual(len(engine.scan(b'\x00' * 3, 'int32', 'exact', 0, 1)), 0)
+
+    def test_find_pattern_alignment(self):
+        """字节模式搜索只保留对齐的命中，且不会因未对齐命中漏掉后续结果"""
+        data = b'\xff' + b'\x00' * 11 + b'\x01\x00\x00\x00'
+        self.assertEqual(list(find_pattern_offsets(data, b'\x00' * 4, 4)), [4, 8])
+        self.assertEqual(list(find_pattern_offsets(data, b'\x00' * 4, 1)), list(range(1, 9)))
+        self.assertEqual(list(find_pattern_offsets(memoryview(data), b'\x01\x00', 4)), [12])
+        self.assertEqual(len(find_pattern_offsets(data, b'', 4)), 0)
+
+    def test_scan_windows_cover_region(self):
+        """分窗口扫描与整块扫描结果一致，跨越窗口边界的数值不会遗漏或重复"""
+        values = [i % 7 for i in range(1000)]
+        for value_type, window_size in [('int32', 64), ('double', 64), ('int32', 4000)]:
+            data = build_buffer(value_type, values)
+            size = 8 if value_type == 'double' else 4
+            for engine in self.engines:
+                expected = [int(o) for o in engine.scan(data, value_type, 'exact', 3)]
+                offsets = []
+                for window_offset, length in iter_scan_windows(len(data), window_size, size - 1):
+                    window = memoryview(data)[window_offset:window_offset + length]
+                    offsets.extend(window_offset + int(o) for o in engine.scan(window, value_type, 'exact', 3))
+                self.assertEqual(offsets, expected)
+
+        # 剩余部分已被上一个窗口的重叠区覆盖时，不再产生多余的窗口
+        windows = list(iter_scan_windows(10, 4, 3))
+        self.assertEqual(windows, [(0, 7), (4, 6)])
+        with self.assertRaises(ValueError):
+            list(iter_scan_windows(10, 0))
+
+    def test_split_regions(self):
+        """多进程分片覆盖所有区域，大区域拆分时保留重叠部分"""
+        regions = [(0x1000, 0x100), (0x2000, 0x100), (0x10000, 0x450)]
+        shards = split_regions(regions, 0x200, 3)
+        pieces = [piece for shard in shards for piece in shard]
+        self.assertEqual(pieces[:2], regions[:2])
+        self.assertEqual(pieces[2:], [(0x10000, 0x203), (0x10200, 0x203), (0x10400, 0x50)])
+        self.assertTrue(all(sum(size for _, size in shard) >= 0x200 for shard in shards[:-1]))
+
+    def test_split_regions_with_limits(self):
+        """带归属上限的分片中，重叠部分的数值只归属下一段"""
+        shards = split_regions([(0x10000, 0x450)], 0x200, 7, with_limits=True)
+        pieces = [piece for shard in shards for piece in shard]
+        self.assertEqual(pieces, [(0x10000, 0x207, 0x200), (0x10200, 0x207, 0x200), (0x10400, 0x50, 0x50)])
+
+    def test_scan_tagged_windows(self):
+        """所有类型扫描分窗口读取时，按较小类型扫描重叠部分不会产生重复结果"""
+        data = bytes(range(1, 9)) * 4 + struct.pack('<q', 3) + b'\x03\x00' * 20
+        targets = types_for_value(3)
+        overlap = 7
+        for engine in self.engines:
+            expected = {value_type: [int(o) for o in offsets]
+                        for value_type, offsets, _ in scan_tagged(engine, data, targets, 'exact')}
+            for window_size in (8, 24):
+                found = {value_type: [] for value_type, _ in targets}
+                for offset, length in iter_scan_windows(len(data), window_size, overlap):
+                    window = memoryview(data)[offset:offset + length]
+                    keep = window_keep(offset, len(data), window_size, overlap)
+                    for value_type, offsets, values in scan_tagged(engine, window, targets, 'exact', keep):
+                        self.assertEqual(len(values), len(offsets))
+                        found[value_type].extend(offset + int(o) for o in offsets)
+                self.assertEqual(found, expected, f"{engine.name}: {window_size}")
+            self.assertIn(32, expected['int64'])
+            self.assertEqual(len(expected['int16']), 21)
+
+    def test_scan_labeled(self):
+        """多值扫描一次比较同一类型的多个搜索值，结果按标签拆分，与逐个扫描一致"""
+        data = struct.pack('<8i', 906, 87, 1, 906, 100, 87, 5, 2 ** 31 - 1) + struct.pack('<2f', 1.5, 87.0)
+        targets = [('金币', 'int32', 906), ('生命', 'int32', 87), ('资源', 'int32', 2 ** 40),
+                   ('速度', 'float', 1.5), ('血量', 'float', 87.0), ('重复', 'int32', 906)]
+        for engine in self.engines:
+            for alignment in (None, 1):
+                found = {label: ([int(o) for o in offsets], [v for v in values])
+                         for label, offsets, values in scan_labeled(engine, data, targets, 'exact', None, alignment)}
+                self.assertEqual(list(found), [label for label, _, _ in targets])
+                for label, value_type, value in targets:
+                    expected = [int(o) for o in engine.scan(data, value_type, 'exact', value, alignment)]
+                    self.assertEqual(found[label][0], expected, f"{engine.name}: {label}")
+                    self.assertEqual(len(found[label][1]), len(expected))
+                self.assertEqual(found['金币'], ([0, 12], [906, 906]))
+                self.assertEqual(found['生命'][0], [4, 20])
+                self.assertEqual(found['速度'][0], [32])
+                self.assertEqual(found['资源'][0], [])
+                self.assertEqual(found['重复'], found['金币'])
+
+    def test_scan_tagged_clipped_start(self):
+        """区域起始地址不对齐时，各类型从各自的第一个对齐地址开始扫描"""
+        base, end = 0x100003, 0x100100
+        data = bytes(end - base)
+        targets = [(value_type, 0) for value_type in ('int8', 'int16', 'int32', 'int64')]
+        overlap = 7
+        for engine in self.engines:
+            found = {value_type: [base + int(o) for o in offsets]
+                     for value_type, offsets, _ in scan_tagged(engine, data, targets, 'exact', base=base)}
+            for value_type, size in (('int8', 1), ('int16', 2), ('int32', 4), ('int64', 8)):
+                first = base + -base % size
+                self.assertEqual(found[value_type], list(range(first, end - size + 1, size)), f"{engine.name}: {value_type}")
+            self.assertEqual([len(found[value_type]) for value_type, _ in targets], [253, 126, 63, 31])
+
+            # 分窗口扫描时各窗口按自身的起始地址对齐，结果与整体扫描一致
+            windowed = {value_type: [] for value_type, _ in targets}
+            for offset, length in iter_scan_windows(len(data), 24, overlap):
+                keep = window_keep(offset, len(data), 24, overlap)
+                for value_type, offsets, _ in scan_tagged(engine, data[offset:offset + length], targets, 'exact',
+                                                          keep, base=base + offset):
+                    windowed[value_type].extend(base + offset + int(o) for o in offsets)
+            self.assertEqual(windowed, found, engine.name)
+
+            # 非对齐扫描不跳过任何字节
+            unaligned = scan_tagged(engine, data, targets, 'exact', alignment=1, base=base)
+            self.assertEqual([len(offsets) for _, offsets, _ in unaligned], [253, 252, 250, 246])
+
+    def test_join_groups(self):
+        """分组扫描只返回所有搜索项都在窗口内的基址，数值须完整落在窗口内"""
+        hp = array('Q', [0x1000, 0x2000, 0x3000, 0x5000])
+        max_hp = array('Q', [0x1004, 0x2100, 0x3038, 0x5004, 0x5008])
+        mp = array('Q', [0x0f00, 0x1010, 0x2008, 0x303c, 0x500c])
+
+        def check():
+            terms = [(hp, 4, 1), (max_hp, 4, 1), (mp, 4, 1)]
+            self.assertEqual([int(b) for b in join_groups(terms, 64)], [0x1000, 0x3000, 0x5000])
+            # 0x303c处的数值超出0x3000开始的60字节窗口
+            self.assertEqual([int(b) for b in join_groups(terms, 60)], [0x1000, 0x5000])
+            # 同一搜索项出现两次时，窗口内需要两个命中
+            self.assertEqual([int(b) for b in join_groups([(hp, 4, 1), (max_hp, 4, 2)], 16)], [0x5000])
+            self.assertEqual(len(join_groups(terms, 2)), 0)
+            self.assertEqual(len(join_groups([(hp, 4, 1), (array('Q'), 4, 1)], 64)), 0)
+
+        check()
+        with mock.patch.object(scan_engine, 'np', None):
+            check()
+
+    def test_compare_64bit(self):
+        """64位整数的差值比较不会溢出"""
+        previous = struct.pack('<2q', -2 ** 63, 0)
+        current = struct.pack('<2q', 2 ** 63 - 1, 5)
+        unsigned = struct.pack('<2Q', 0, 2 ** 64 - 1)
+        for engine in self.engines:
+            offsets = array('Q', [0, 8])
+            old = engine.read_values(previous, 'int64', offsets)
+            new = engine.read_values(current, 'int64', offsets)
+            self.assertEqual([bool(m) for m in engine.compare_values(new, old, 'int64', 'increased_by', 2 ** 64 - 1)],
+                             [True, False], engine.name)
+            self.assertEqual([bool(m) for m in engine.compare_values(new, old, 'int64', 'increased')],
+                             [True, True], engine.name)
+            high = engine.read_values(unsigned, 'uint64', offsets)
+            self.assertEqual([bool(m) for m in engine.compare_values(high, high, 'uint64', 'unchanged')],
+                             [True, True], engine.name)
+            self.assertEqual([int(o) for o in engine.scan(unsigned, 'uint64', 'exact', 2 ** 64 - 1)], [8])
+
+    def test_coalesce_spans(self):
+        """同一对齐区间内的候选地址合并为一次读取，区间延伸到最后一个数值末尾"""
+        addresses = array('Q', [0x1000, 0x1004, 0x1ff0, 0x2000, 0x9000])
+
+        def check():
+            spans = [(start, length, [int(o) for o in offsets])
+                     for start, length, offsets in coalesce_spans(addresses, 4, 0x1000)]
+            self.assertEqual(spans, [
+                (0x1000, 0xff4, [0, 4, 0xff0]),
+                (0x2000, 4, [0]),
+                (0x9000, 4, [0]),
+            ])
+            self.assertEqual(coalesce_spans(array('Q'), 4), [])
+
+        check()
+        with mock.patch.object(scan_engine, 'np', None):
+            check()
+
+    def test_read_values(self):
+        """按偏移量解析数值与逐个比较的结果一致"""
+        for value_type, values, target in [('int32', self.int_values, 100),
+                                           ('float', self.float_values, 3.14),
+                                           ('double', self.float_values, 0.0)]:
+            data = build_buffer(value_type, values)
+            size = 8 if value_type == 'double' else 4
+            offsets = array('Q', range(0, len(data), size * 3))
+            expected = [o for o in reference_scan(data, value_type, 'exact', target) if o % (size * 3) == 0]
+            for engine in self.engines:
+                current = engine.read_values(data, value_type, offsets)
+                self.assertEqual(len(current), len(offsets))
+                mask = engine.compare_values(current, None, value_type, 'exact', target)
+                self.assertEqual([o for o, m in zip(offsets, mask) if m], expected, f"{engine.name}: {value_type}")
+                # 没有先前值时无法与先前值比较
+                self.assertFalse(any(engine.compare_values(current, None, value_type, 'changed')))
+
+    def test_compare_relations(self):
+        """与先前值比较的各种方式在两种引擎中结果一致"""
+        cases = [
+            ('int32', [5, 5, 7, 3, -2 ** 31], [5, 6, 5, 8, 2 ** 31 - 1]),
+            ('float', [1.0, math.nan, 2.5, 1.0, math.inf], [1.0, math.nan, 2.0, 3.5, 1.0]),
+            ('double', [1.0, 0.1, 2.5, 1.0, 4.0], [1.0, 0.3, 2.0, 3.5, math.nan]),
+        ]
+        expected = {
+            'changed': [False, True, True, True, True],
+            'unchanged': [True, False, False, False, False],
+            'increased': [False, True, False, True, True],
+            'decreased': [False, False, True, False, False],
+        }
+        for value_type, previous, current in cases:
+            info_size = 8 if value_type == 'double' else 4
+            current_buffer = build_buffer(value_type, current)
+            previous_buffer = build_buffer(value_type, previous)
+            for engine in self.engines:
+                offsets = array('Q', range(0, len(current_buffer), info_size))
+                values = engine.read_values(current_buffer, value_type, offsets)
+                old = engine.read_values(previous_buffer, value_type, offsets)
+                results = {compare_type: [bool(m) for m in engine.compare_values(values, old, value_type, compare_type)]
+                           for compare_type in expected}
+                if value_type == 'int32':
+                    self.assertEqual(results, expected, engine.name)
+                    self.assertEqual([bool(m) for m in engine.compare_values(values, old, value_type, 'increased_by', 2 ** 32 - 1)],
+                                     [False, False, False, False, True])
+                    self.assertEqual([bool(m) for m in engine.compare_values(values, old, value_type, 'decreased_by', 2)],
+                                     [False, False, True, False, False])
+                else:
+                    self.assertEqual(results['unchanged'][:2], [True, value_type == 'float'], engine.name)
+                    self.assertEqual([bool(m) for m in engine.compare_values(values, old, value_type, 'increased_by', 2.5)],
+                                     [False, False, False, True, False], engine.name)
+                # compare_previous直接比较缓冲区，结果与逐个比较一致
+                self.assertEqual([bool(m) for m in engine.compare_previous(current_buffer, previous_buffer, value_type, 'changed')],
+                                 results['changed'])
+
+    def test_filter_candidates(self):
+        """合并读取筛选候选地址，区间不可读时退回逐个读取"""
+        base = 0x100000
+        memory = build_buffer('int32', [i % 5 for i in range(0x8000)])
+        unreadable = range(base + 0x10000, base + 0x11000)
+        fake = FakeMemory(memory, base)
+        fake.unreadable.add(0x10)  # 模拟不可读的页面
+        read = fake.read
+
+        addresses = array('Q', range(base, base + len(memory), 12))
+        expected = [a for a in addresses if a not in unreadable and (a - base) // 4 % 5 == 2]
+        for engine in self.engines:
+            matched, values, read_count = filter_candidates(engine, read, addresses, 'int32', 'exact', 2)
+            self.assertEqual([int(a) for a in matched], expected, engine.name)
+            self.assertEqual(list(values), [2] * len(expected))
+            self.assertLess(read_count, len(addresses) // 10)
+
+            # 与先前值比较：先前值全部为1时，已增加的就是当前值大于1的位置
+            previous = array('i', [1] * len(addresses))
+            matched, values, _ = filter_candidates(engine, read, addresses, 'int32', 'increased', None, previous)
+            self.assertEqual([int(a) for a in matched],
+                             [a for a in addresses if a not in unreadable and (a - base) // 4 % 5 > 1])
+            self.assertTrue(all(v > 1 for v in values))
+
+    def test_engine_selection(self):
+        """默认引擎在NumPy可用时使用NumPy"""
+        self.assertEqual(get_scan_engine().name, 'numpy' if HAS_NUMPY else 'python')
+        self.assertEqual(get_scan_engine('python').name, 'python')
+        with self.assertRaises(ValueError):
+            get_scan_engine('unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
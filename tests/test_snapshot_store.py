@@ -0,0 +1,136 @@
+import sys
+import struct
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from tests.fakes import FakeMemory
+from utils import snapshot_store
+from utils.scan_engine import PythonScanEngine, HAS_NUMPY, get_scan_engine
+from utils.snapshot_store import PAGE_SIZE, SnapshotStore
+
+BASE = 0x400000
+
+
+class TestSnapshotStore(unittest.TestCase):
+    """测试未知初始值扫描的快照"""
+
+    def setUp(self):
+        # 第0页全零，第1、2页内容相同，第3页为递增整数
+        pattern = struct.pack('<1024i', *([7] * 1024))
+        counter = struct.pack('<1024i', *range(1024))
+        self.memory = FakeMemory(bytes(PAGE_SIZE) + pattern + pattern + counter, BASE)
+        self.engines = [PythonScanEngine()]
+        if HAS_NUMPY:
+            self.engines.append(get_scan_engine('numpy'))
+
+    def _capture(self):
+        snapshot = SnapshotStore('int32')
+        snapshot.add_pages(BASE, self.memory.read(BASE, len(self.memory.data)))
+        return snapshot
+
+    def _run_both(self, check):
+        """分别在NumPy可用和不可用时运行检查"""
+        for engine in self.engines:
+            check(engine)
+        with mock.patch.object(snapshot_store, 'np', None):
+            check(PythonScanEngine())
+
+    def test_capture(self):
+        """零页不保存内容，内容相同的页面只保存一份"""
+        snapshot = self._capture()
+        self.assertEqual(len(snapshot), 4 * 1024)
+        self.assertEqual(snapshot.page_count, 4)
+        self.assertEqual(snapshot.zero_pages, 1)
+        self.assertEqual(snapshot.stored_pages, 2)
+        self.assertEqual(bytes(snapshot.page_data(0)), bytes(PAGE_SIZE))
+        self.assertEqual(snapshot[:2].to_list(), [BASE, BASE + 4])
+        self.assertEqual((snapshot[1025], snapshot[-1]), (BASE + PAGE_SIZE + 4, BASE + 4 * PAGE_SIZE - 4))
+        with self.assertRaises(IndexError):
+            snapshot[4 * 1024]
+        snapshot.close()
+
+    def test_shared_blobs(self):
+        """后续扫描的快照与先前快照共用内容文件，未变化的页面不重新写入"""
+        snapshot = self._capture()
+        snapshot.finish_capture()
+        blobs = snapshot._blobs
+        self.assertIsNone(blobs.index)
+        self.assertEqual(len(blobs), 2)
+
+        self.memory.set_int(BASE + 3 * PAGE_SIZE + 12, 99)
+        unchanged = snapshot.narrow(self.memory.read, PythonScanEngine(), 'unchanged')
+        self.assertIs(unchanged._blobs, blobs)
+        self.assertEqual(len(blobs), 3)  # 只追加了变化的页面
+        self.assertEqual(unchanged.stored_pages, 2)
+
+        # 先前快照关闭后新快照仍可读取，全部关闭后删除文件
+        snapshot.close()
+        self.assertEqual(bytes(unchanged.page_data(1)), bytes(self.memory.read(BASE + PAGE_SIZE, PAGE_SIZE)))
+        self.assertEqual(struct.unpack_from('<i', unchanged.page_data(3), 12)[0], 99)
+        unchanged.close()
+        self.assertIsNone(blobs.file)
+
+    def test_narrow_relations(self):
+        """与先前快照比较：已改变、未改变、增大、减小、增大了指定值"""
+        def check(engine):
+            snapshot = self._capture()
+            self.memory.set_int(BASE + 8, -1)                  # 零页中的值减小
+            self.memory.set_int(BASE + PAGE_SIZE + 4, 9)       # 重复页面之一中的值增大
+            self.memory.set_int(BASE + 3 * PAGE_SIZE + 12, 3)  # 未变化（原值即为3）
+
+            changed = snapshot.narrow(self.memory.read, engine, 'changed')
+            self.assertEqual(changed.to_candidates().to_list(), [BASE + 8, BASE + PAGE_SIZE + 4])
+            self.assertEqual([changed[i] for i in range(len(changed))], [BASE + 8, BASE + PAGE_SIZE + 4])
+
+            unchanged = snapshot.narrow(self.memory.read, engine, 'unchanged')
+            self.assertEqual(len(unchanged), 4 * 1024 - 2)
+            self.assertEqual([unchanged[i] for i in range(len(unchanged))], list(unchanged))
+
+            bigger = snapshot.narrow(self.memory.read, engine, 'increased')
+            self.assertEqual(list(bigger), [BASE + PAGE_SIZE + 4])
+            smaller = snapshot.narrow(self.memory.read, engine, 'decreased')
+            self.assertEqual(list(smaller), [BASE + 8])
+
+            # 在上一次结果的基础上继续比较，只保留仍然存活的位置
+            self.memory.set_int(BASE + 8, 5)
+            again = smaller.narrow(self.memory.read, engine, 'increased_by', 6)
+            self.assertEqual(list(again), [BASE + 8])
+            for store in (snapshot, changed, unchanged, bigger, smaller, again):
+                store.close()
+            self.setUp()
+        self._run_both(check)
+
+    def test_narrow_with_value(self):
+        """给定搜索值时与该值比较"""
+        def check(engine):
+            snapshot = self._capture()
+            exact = snapshot.narrow(self.memory.read, engine, 'exact', 1000)
+            self.assertEqual(list(exact), [BASE + 3 * PAGE_SIZE + 4000])
+            snapshot.close()
+        self._run_both(check)
+
+    def test_unreadable_pages(self):
+        """不可读页面中的位置被淘汰，其余页面不受影响"""
+        def check(engine):
+            snapshot = self._capture()
+            self.memory.unreadable.add(1)
+            unchanged = snapshot.narrow(self.memory.read, engine, 'unchanged')
+            self.assertEqual(unchanged.page_count, 3)
+            self.assertNotIn(BASE + PAGE_SIZE, set(unchanged))
+            self.memory.unreadable.clear()
+        self._run_both(check)
+
+    def test_cancel(self):
+        """中止比较时返回已比较的部分"""
+        snapshot = self._capture()
+        result = snapshot.narrow(self.memory.read, PythonScanEngine(), 'unchanged', is_running=lambda: False)
+        self.assertEqual(len(result), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -237,6 +237,7 @@ class TestUtils:
         original_functions = {
             "attach_process": window.memory_reader.attach_process,
             "read_memory": window.memory_reader.read_memory,
+            "read_memory_view": window.memory_reader.read_memory_view,
             "search_value": window.memory_reader.search_value,
             "process_handle": window.memory_reader.process_handle
         }
@@ -254,7 +255,8 @@ class TestUtils:
                     return struct.pack('<d', value)
             return None
 
-        def mock_search_value(value, value_type='int32', compare_type='exact', last_results=None, progress_callback=None):
+        def mock_search_value(value, value_type='int32', compare_type='exact', last_results=None, progress_callback=None,
+                              scan_mode=None, region_filter=None, unaligned=False):
             """模拟搜索内存"""
             # 转换比较类型
             comparison = "equals"
@@ -287,6 +289,7 @@ class TestUtils:
         # 替换函数
         window.memory_reader.attach_process = lambda process_id: (True, "成功")
         window.memory_reader.read_memory = mock_read_memory
+        window.memory_reader.read_memory_view = mock_read_memory
         window.memory_reader.search_value = mock_search_value
 
         # 设置已附加标志
@@ -307,6 +310,7 @@ class TestUtils:
         # 恢复原始函数
         window.memory_reader.attach_process = original_functions["attach_process"]
         window.memory_reader.read_memory = original_functions["read_memory"]
+        window.memory_reader.read_memory_view = original_functions["read_memory_view"]
         window.memory_reader.search_value = original_functions["search_value"]
         window.memory_reader.process_handle = original_functions["process_handle"]
 
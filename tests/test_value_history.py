@@ -0,0 +1,83 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from tests.fakes import make_candidates
+from utils import candidate_set
+from utils.candidate_set import CandidateSet, TaggedCandidateSet
+from utils.value_history import ValueHistory
+
+
+class TestValueHistory(unittest.TestCase):
+    """测试与候选地址对齐的数值历史"""
+
+    def _run_both(self, check):
+        """分别在NumPy可用和不可用时运行检查"""
+        check()
+        with mock.patch.object(candidate_set, 'np', None):
+            check()
+
+    def test_rotation(self):
+        """后续搜索时当前值轮换为先前值，各列压缩到存活地址"""
+        def check():
+            history = ValueHistory()
+            first = make_candidates([0x10, 0x20, 0x30, 0x40], [1, 2, 3, 4])
+            history.start(first)
+            self.assertIs(history.first, first.values)
+            self.assertEqual(history.row(2), (3, None, 3))
+
+            second = make_candidates([0x20, 0x40], [20, 40])
+            history.advance(first, second)
+            self.assertIs(history.current, second.values)
+            self.assertEqual(len(history), 2)
+            self.assertEqual(history.row(0), (2, 2, 20))
+            self.assertEqual(history.row(1), (4, 4, 40))
+
+            third = make_candidates([0x40], [41])
+            history.advance(second, third)
+            self.assertEqual(history.row(0), (4, 40, 41))
+            self.assertEqual(history.previous.value_type, 'int32')
+        self._run_both(check)
+
+    def test_missing_values(self):
+        """结果没有数值列时各行的值为None"""
+        history = ValueHistory()
+        history.start(CandidateSet([0x10, 0x20]))
+        self.assertEqual(history.row(0), (None, None, None))
+
+        doubles = make_candidates([0x10, 0x18], [1.5, 2.5], 'double')
+        history.start(doubles)
+        history.advance(doubles, CandidateSet([0x18]))
+        self.assertEqual(history.row(0), (2.5, 2.5, None))
+
+        history.clear()
+        self.assertEqual(len(history), 0)
+
+
+    def test_tagged(self):
+        """所有类型扫描的结果按类型分组记录历史，行号跨分组连续"""
+        first = TaggedCandidateSet({
+            'int16': make_candidates([0x10, 0x12], [7, 7], 'int16'),
+            'double': make_candidates([0x18], [7.0], 'double'),
+        })
+        history = ValueHistory()
+        history.start(first)
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history.row(2), (7.0, None, 7.0))
+
+        second = TaggedCandidateSet({
+            'int16': make_candidates([0x12], [8], 'int16'),
+            'double': make_candidates([0x18], [8.0], 'double'),
+        })
+        history.advance(first, second)
+        self.assertEqual(history.row(0), (7, 7, 8))
+        self.assertEqual(history.row(1), (7.0, 7.0, 8.0))
+        self.assertEqual(history.row(5), (None, None, None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import sys
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from utils.value_types import (ALL_TYPES, format_value, get_int_range, get_type_by_text, get_type_text,
+                               pack_value, parse_value, types_for_value, unpack_value)
+
+
+class TestValueTypes(unittest.TestCase):
+    """测试数值类型定义"""
+
+    def test_type_texts(self):
+        """下拉框文本和表格中的类型名称都能映射到数值类型"""
+        self.assertEqual(get_type_by_text('整数'), 'int32')
+        self.assertEqual(get_type_by_text('浮点'), 'float')
+        self.assertEqual(get_type_by_text('无符号2字节'), 'uint16')
+        self.assertEqual(get_type_by_text('所有类型'), ALL_TYPES)
+        self.assertEqual(get_type_by_text('未知', 'int32'), 'int32')
+        self.assertEqual(get_type_text('int64'), '8字节')
+        self.assertEqual(get_type_text('float'), '浮点数')
+
+    def test_pack_values(self):
+        """打包与解析互为逆运算，超出范围时抛出ValueError"""
+        self.assertEqual(get_int_range('int8'), (-128, 127))
+        self.assertEqual(get_int_range('uint16'), (0, 65535))
+        for value_type, value in [('int8', -5), ('uint8', 255), ('int16', -300), ('uint32', 2 ** 32 - 1),
+                                  ('int64', -2 ** 63), ('uint64', 2 ** 64 - 1), ('double', 0.1)]:
+            self.assertEqual(unpack_value(pack_value(value, value_type), value_type), value)
+        self.assertEqual(len(pack_value('7', 'int16')), 2)
+        with self.assertRaises(ValueError):
+            pack_value(256, 'uint8')
+        with self.assertRaises(ValueError):
+            pack_value(-1, 'uint64')
+        self.assertEqual(parse_value('1.5', 'float'), 1.5)
+        self.assertEqual(format_value(2.5, 'float'), '2.500000')
+        self.assertEqual(format_value(-3, 'int8'), '-3')
+        self.assertEqual(format_value(None, 'int8'), '-')
+
+    def test_types_for_value(self):
+        """所有类型扫描按搜索值选择可表示的类型"""
+        self.assertEqual([t for t, _ in types_for_value(100)],
+                         ['int8', 'int16', 'int32', 'int64', 'float', 'double'])
+        self.assertEqual([t for t, _ in types_for_value(200)],
+                         ['uint8', 'int16', 'int32', 'int64', 'float', 'double'])
+        self.assertEqual([t for t, _ in types_for_value(-1000)],
+                         ['int16', 'int32', 'int64', 'float', 'double'])
+        self.assertEqual(types_for_value(1.5), [('float', 1.5), ('double', 1.5)])
+        self.assertEqual(dict(types_for_value(2.0))['int32'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
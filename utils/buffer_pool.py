@@ -0,0 +1,31 @@
+"""读取缓冲区池
+
+为每个线程保留一块可复用的bytearray，读取内存时直接写入该缓冲区并返回memoryview，
+避免每次读取都分配新缓冲区并复制数据。
+"""
+import threading
+
+
+class BufferPool:
+    """按线程复用的读取缓冲区池
+
+    同一线程每次获取到的是同一块缓冲区，因此上一次返回的memoryview在下一次读取后会被覆盖；
+    需要长期保存的数据应由调用方自行复制（例如 bytes(view)）。
+    """
+
+    def __init__(self, initial_size=4096):
+        self.initial_size = initial_size
+        self._local = threading.local()
+
+    def get(self, size):
+        """获取当前线程的缓冲区，长度至少为size字节"""
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None or len(buffer) < size:
+            # 按需扩容：替换为新的缓冲区，已返回的memoryview仍指向旧缓冲区，不会失效
+            buffer = bytearray(max(size, self.initial_size))
+            self._local.buffer = buffer
+        return buffer
+
+    def release(self):
+        """释放当前线程的缓冲区"""
+        self._local.buffer = None
@@ -0,0 +1,251 @@
+"""字节模式扫描：字节数组（AOB）特征码和文本字符串
+
+特征码是一串十六进制字节，可以用 ?? 表示任意字节，例如 "8B 45 ?? 89 ?? 10"，
+游戏更新后可用它重新定位代码或数据结构。
+文本按选定的编码（UTF-8、UTF-16LE）转换为字节后查找，可以一次查找多种编码，并可忽略ASCII字母的大小写。
+
+查找时先用C实现的字节搜索定位特征码中最长的一段固定字节（锚点），只在锚点命中时
+回到Python层，再用编译好的正则表达式校验完整的特征码，不逐字节比较。
+文本没有单一锚点时（多种编码或忽略大小写）直接用编译好的正则表达式在C层查找。
+"""
+import re
+from array import array
+
+from utils.scan_engine import PAGE_SIZE, SPAN_SIZE, coalesce_spans
+
+# 特征码的最大长度，扫描窗口之间需要重叠 长度-1 字节
+MAX_PATTERN_LENGTH = 4096
+
+# 表示任意字节的通配符
+WILDCARDS = ('?', '??', '*', '**')
+
+
+class BytePattern:
+    """带通配符的字节模式"""
+
+    def __init__(self, data, mask=None):
+        """
+        参数:
+            data: 模式字节，通配符位置的字节被忽略
+            mask: 与data等长的布尔序列，True表示该字节固定；为None时全部固定
+        """
+        data = bytes(data)
+        mask = [True] * len(data) if mask is None else [bool(fixed) for fixed in mask]
+        if len(mask) != len(data):
+            raise ValueError("特征码的掩码长度与字节数不一致")
+        if not data:
+            raise ValueError("特征码不能为空")
+        if len(data) > MAX_PATTERN_LENGTH:
+            raise ValueError(f"特征码过长: {len(data)} 字节，最多 {MAX_PATTERN_LENGTH} 字节")
+
+        self.data = data
+        self.mask = tuple(mask)
+        self.length = len(data)      # 最长匹配的字节数，扫描窗口之间重叠 length-1 字节
+        self.min_length = len(data)  # 最短匹配的字节数
+
+        # 选取最长的一段连续固定字节作为锚点
+        best_start, best_length = 0, 0
+        start = None
+        for index, fixed in enumerate(self.mask + (False,)):
+            if fixed and start is None:
+                start = index
+            elif not fixed and start is not None:
+                if index - start > best_length:
+                    best_start, best_length = start, index - start
+                start = None
+        if not best_length:
+            raise ValueError("特征码至少需要一个固定字节")
+        self.anchor = data[best_start:best_start + best_length]
+        self.anchor_offset = best_start
+
+        source = b''.join(re.escape(data[i:i + 1]) if fixed else b'.' for i, fixed in enumerate(self.mask))
+        self._regex = re.compile(source, re.DOTALL)
+        self._anchor_search = re.compile(re.escape(self.anchor)).search
+
+    @classmethod
+    def parse(cls, text):
+        """解析特征码文本，字节之间可以用空格分隔，也可以连写（如 "8B45??89"）
+
+        不合法的特征码抛出ValueError。
+        """
+        tokens = []
+        for token in text.split():
+            if token in WILDCARDS:
+                tokens.append(token)
+                continue
+            if len(token) % 2:
+                raise ValueError(f"无效的特征码字节: {token}")
+            tokens.extend(token[i:i + 2] for i in range(0, len(token), 2))
+
+        data = bytearray()
+        mask = []
+        for token in tokens:
+            if token in WILDCARDS:
+                data.append(0)
+                mask.append(False)
+                continue
+            try:
+                data.append(int(token, 16))
+            except ValueError:
+                raise ValueError(f"无效的特征码字节: {token}") from None
+            mask.append(True)
+        return cls(data, mask)
+
+    def __str__(self):
+        return ' '.join(f"{byte:02X}" if fixed else '??' for byte, fixed in zip(self.data, self.mask))
+
+    def __repr__(self):
+        return f"BytePattern({self})"
+
+    def matches_at(self, buffer, offset=0):
+        """缓冲区的offset处是否匹配"""
+        return offset >= 0 and self._regex.match(buffer, offset) is not None
+
+    def find_all(self, buffer, limit=None):
+        """查找缓冲区中所有匹配的起始偏移（可以互相重叠）
+
+        参数:
+            buffer: 内存缓冲区（bytes、bytearray或memoryview）
+            limit: 只返回起始偏移小于limit的匹配，见scan_engine.window_keep
+
+        返回:
+            升序的偏移量数组 array('Q')
+        """
+        offsets = array('Q')
+        end = len(buffer) - self.min_length
+        if limit is not None:
+            end = min(end, limit - 1)
+        match = self._regex.match
+        if self._anchor_search is None:
+            # 没有锚点时直接查找完整模式，从上一个匹配的下一字节继续，保留重叠的匹配
+            search = self._regex.search
+            position = 0
+            while position <= end:
+                found = search(buffer, position)
+                if found is None or found.start() > end:
+                    break
+                offsets.append(found.start())
+                position = found.start() + 1
+            return offsets
+
+        anchor_search = self._anchor_search
+        position = self.anchor_offset
+        while True:
+            found = anchor_search(buffer, position)
+            if found is None:
+                break
+            start = found.start() - self.anchor_offset
+            if start > end:
+                break
+            if match(buffer, start):
+                offsets.append(start)
+            position = found.start() + 1
+        return offsets
+
+    def format(self, data):
+        """格式化内存中的字节，用于表格显示"""
+        if data is None or len(data) < self.length:
+            return "-"
+        return ' '.join(f"{byte:02X}" for byte in bytes(data[:self.length]))
+
+
+class TextPattern(BytePattern):
+    """文本字符串，按一种或多种编码查找"""
+
+    def __init__(self, text, encodings=('utf-8',), ignore_case=False):
+        """
+        参数:
+            text: 要查找的文本
+            encodings: 编码列表（Python编码名，如 'utf-8'、'utf-16-le'），一次查找所有编码
+            ignore_case: 是否忽略ASCII字母的大小写
+        """
+        if not text:
+            raise ValueError("搜索文本不能为空")
+        encodings = tuple(dict.fromkeys(encodings))
+        if not encodings:
+            raise ValueError("至少需要选择一种编码")
+        encoded = []
+        for encoding in encodings:
+            try:
+                encoded.append(text.encode(encoding))
+            except (LookupError, UnicodeEncodeError) as e:
+                raise ValueError(f"无法使用 {encoding} 编码文本: {str(e)}") from None
+
+        length = max(len(data) for data in encoded)
+        if length > MAX_PATTERN_LENGTH:
+            raise ValueError(f"搜索文本过长: {length} 字节，最多 {MAX_PATTERN_LENGTH} 字节")
+
+        # data/mask为第一种编码的字节，其余属性按所有编码重新设置
+        super().__init__(encoded[0])
+        self.text = text
+        self.encodings = encodings
+        self.ignore_case = ignore_case
+        self.length = length
+        self.min_length = min(len(data) for data in encoded)
+
+        # 每种编码一个分组，匹配后根据分组序号得知编码；bytes模式的IGNORECASE只作用于ASCII字母
+        flags = re.IGNORECASE if ignore_case else 0
+        self._regex = re.compile(b'|'.join(b'(' + re.escape(data) + b')' for data in encoded), flags)
+        if len(encoded) == 1 and not (ignore_case and text.lower() != text.upper()):
+            # 只有一种编码且大小写无关时，整个文本就是锚点
+            self.anchor = encoded[0]
+            self.anchor_offset = 0
+            self._anchor_search = re.compile(re.escape(self.anchor)).search
+        else:
+            self.anchor = None
+            self.anchor_offset = 0
+            self._anchor_search = None
+
+    def __str__(self):
+        options = '/'.join(self.encodings) + (', 忽略大小写' if self.ignore_case else '')
+        return f"\"{self.text}\" ({options})"
+
+    def __repr__(self):
+        return f"TextPattern({self})"
+
+    def format(self, data):
+        """按匹配的编码解码内存中的文本，不再匹配时显示为字节"""
+        if data is None:
+            return "-"
+        found = self._regex.match(data)
+        if found is None:
+            return ' '.join(f"{byte:02X}" for byte in bytes(data[:self.min_length]))
+        return found.group().decode(self.encodings[found.lastindex - 1], errors='replace')
+
+
+def filter_pattern_candidates(read, addresses, pattern):
+    """按区间合并读取候选地址，保留仍然匹配模式的地址（后续扫描）
+
+    参数:
+        read: 读取函数 read(地址, 大小)，返回缓冲区，读取失败返回None
+        addresses: 升序地址，array('Q')或NumPy uint64数组
+        pattern: BytePattern
+
+    返回:
+        (匹配的地址数组 array('Q'), 读取次数)
+    """
+    matched = array('Q')
+    read_count = 0
+
+    def filter_spans(span_addresses, span_size):
+        nonlocal read_count
+        for span_start, span_length, offsets in coalesce_spans(span_addresses, pattern.length, span_size):
+            read_count += 1
+            data = read(span_start, span_length)
+            if data is not None and len(data) == span_length:
+                matched.extend(span_start + offset for offset in offsets.tolist()
+                               if pattern.matches_at(data, offset))
+            elif span_size > PAGE_SIZE:
+                # 区间中包含不可读的页面，按页重新读取
+                filter_spans(array('Q', (span_start + offset for offset in offsets.tolist())), PAGE_SIZE)
+            else:
+                for offset in offsets.tolist():
+                    read_count += 1
+                    data = read(span_start + offset, pattern.length)
+                    if data is None and pattern.min_length < pattern.length:
+                        data = read(span_start + offset, pattern.min_length)  # 较短的编码可能紧靠不可读区域
+                    if data is not None and pattern.matches_at(data):
+                        matched.append(span_start + offset)
+
+    filter_spans(addresses, SPAN_SIZE)
+    return matched, read_count
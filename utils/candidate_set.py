@@ -0,0 +1,435 @@
+"""搜索结果候选地址集合
+
+候选地址按升序保存在紧凑的uint64数组中，每个地址只占8字节，
+替代Python整数列表（每个约36字节）。任务、表格和后续扫描共用同一套接口。
+
+当占用内存超过预算时，地址会被转存到临时文件，并通过内存映射读取，
+因此首次扫描可以保留数亿个候选地址而不会耗尽内存。
+
+候选集合可以附带一列与地址一一对应的数值（ValueColumn），记录扫描时读到的值，
+后续扫描据此与先前值比较（已改变、已增加等）。
+"""
+import mmap
+import tempfile
+from array import array
+
+from utils.value_types import get_type_info
+
+try:
+    import numpy as np
+except ImportError:  # NumPy为可选依赖
+    np = None
+
+# 默认的内存预算（字节），超过后转存到临时文件
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+# 分块读取转存文件时每块的元素数量
+CHUNK_LENGTH = 1024 * 1024
+
+ITEM_SIZE = array('Q').itemsize
+
+
+class SpillableArray:
+    """可转存到临时文件的类型化数组，超过内存预算后追加的数据写入文件"""
+
+    typecode = 'Q'
+
+    def __init__(self, items=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """
+        参数:
+            items: 初始元素，可以是任意可迭代对象、array、NumPy数组或同类集合
+            memory_budget: 内存预算（字节），超过后转存到临时文件；为None时不限制
+        """
+        self.memory_budget = memory_budget
+        self.itemsize = array(self.typecode).itemsize
+        self._items = array(self.typecode)  # 内存中的元素（转存后为尚未写入文件的部分）
+        self._file = None                   # 转存使用的临时文件
+        self._file_count = 0                # 已写入文件的元素数量
+        self._mmap = None                   # 文件的只读内存映射，按需创建
+        if items is not None:
+            self.extend(items)
+
+    @property
+    def dtype(self):
+        """元素的NumPy dtype"""
+        return np.dtype(self.typecode)
+
+    @property
+    def is_spilled(self):
+        """元素是否已转存到临时文件"""
+        return self._file is not None
+
+    def __len__(self):
+        return self._file_count + len(self._items)
+
+    def __iter__(self):
+        for chunk in self.iter_chunks():
+            # 统一返回Python数值，避免NumPy标量传入ctypes等接口
+            yield from (chunk.tolist() if np is not None and isinstance(chunk, np.ndarray) else chunk)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            result = self._empty_like()
+            if not self.is_spilled:
+                result._items = self._items[index]
+            elif step == 1:
+                for chunk_start in range(start, stop, CHUNK_LENGTH):
+                    result.extend(self._slice(chunk_start, min(chunk_start + CHUNK_LENGTH, stop)))
+            else:
+                result.extend(self[i] for i in range(start, stop, step))
+            return result
+
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("索引超出范围")
+        if index < self._file_count:
+            return self._file_view()[index]
+        return self._items[index - self._file_count]
+
+    def __del__(self):
+        self.close()
+
+    def _empty_like(self):
+        """创建同类型的空集合"""
+        return type(self)(memory_budget=self.memory_budget)
+
+    @property
+    def nbytes(self):
+        """元素占用的字节数（包括转存到文件的部分）"""
+        return len(self) * self.itemsize
+
+    def close(self):
+        """关闭并删除转存文件"""
+        self._mmap = None
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+            self._file_count = 0
+
+    def _file_view(self):
+        """返回转存文件的只读类型化视图"""
+        if self._mmap is None:
+            self._file.flush()
+            self._mmap = memoryview(
+                mmap.mmap(self._file.fileno(), self._file_count * self.itemsize, access=mmap.ACCESS_READ)
+            ).cast(self.typecode)
+        return self._mmap
+
+    def _slice(self, start, stop):
+        """读取[start, stop)范围内的元素，返回array或NumPy数组"""
+        if stop <= self._file_count:
+            view = self._file_view()[start:stop]
+            return np.frombuffer(view, dtype=self.dtype) if np is not None else array(self.typecode, view)
+        if start >= self._file_count:
+            return self._items[start - self._file_count:stop - self._file_count]
+        head = array(self.typecode, self._file_view()[start:self._file_count])
+        head.extend(self._items[:stop - self._file_count])
+        return head
+
+    def _spill(self):
+        """将内存中的元素写入临时文件"""
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix='up2me_candidates_')
+        self._file.seek(0, 2)
+        self._file.write(memoryview(self._items).cast('B'))
+        self._file_count += len(self._items)
+        self._items = array(self.typecode)
+        self._mmap = None  # 文件已增长，下次读取时重新映射
+
+    def _check_budget(self):
+        """内存中的元素超过预算时转存到临时文件"""
+        if self.memory_budget is not None and len(self._items) * self.itemsize > self.memory_budget:
+            self._spill()
+
+    def iter_chunks(self, chunk_length=CHUNK_LENGTH):
+        """按块迭代元素，转存文件按块流式读取，避免一次性载入内存"""
+        length = len(self)
+        for start in range(0, length, chunk_length):
+            yield self._slice(start, min(start + chunk_length, length))
+
+    def extend(self, items):
+        """追加元素"""
+        if isinstance(items, SpillableArray):
+            for chunk in items.iter_chunks():
+                self.extend(chunk)
+            return
+        if isinstance(items, array) and items.typecode == self.typecode:
+            self._items.extend(items)
+        elif np is not None and isinstance(items, np.ndarray):
+            self._items.frombytes(items.astype(self.dtype, copy=False).tobytes())
+        else:
+            self._items.extend(items)
+        self._check_budget()
+
+    def frombytes(self, data):
+        """追加以本机字节序表示的元素"""
+        self._items.frombytes(data)
+        self._check_budget()
+
+    def as_numpy(self):
+        """返回全部元素的NumPy数组（需要NumPy）
+
+        未转存时与集合共享内存，持有期间不能追加元素；转存后返回文件映射的只读视图。
+        """
+        if self.is_spilled:
+            if self._items:
+                self._spill()
+            return np.frombuffer(self._file_view(), dtype=self.dtype)
+        return np.frombuffer(self._items, dtype=self.dtype)
+
+    def as_array(self):
+        """返回全部元素的array（转存时会载入内存）"""
+        if self.is_spilled:
+            return array(self.typecode, self)
+        return self._items
+
+    def _take_items(self, indices):
+        """按索引选取元素，返回新的同类集合"""
+        result = self._empty_like()
+        if np is not None and isinstance(indices, np.ndarray):
+            result.extend(self.as_numpy()[indices])
+        else:
+            result.extend(self[i] for i in indices)
+        return result
+
+    def to_list(self):
+        """转换为Python列表"""
+        return list(self)
+
+
+class ValueColumn(SpillableArray):
+    """与候选地址一一对应的数值列，按数值类型紧凑保存"""
+
+    def __init__(self, value_type, items=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """
+        参数:
+            value_type: 数值类型，决定每个数值占用的字节数
+        """
+        self.value_type = value_type
+        self.typecode = get_type_info(value_type)['typecode']
+        super().__init__(items, memory_budget)
+
+    def _empty_like(self):
+        return ValueColumn(self.value_type, memory_budget=self.memory_budget)
+
+    def take(self, indices):
+        """按索引选取数值，返回新的数值列"""
+        return self._take_items(indices)
+
+    def __repr__(self):
+        return f"ValueColumn({self.value_type}, {len(self)} 个数值)"
+
+
+class CandidateSet(SpillableArray):
+    """候选地址集合，支持长度、迭代、索引和切片
+
+    values为与地址一一对应的数值列（可选），由扫描时填充。
+    """
+
+    def __init__(self, addresses=None, sort=False, memory_budget=DEFAULT_MEMORY_BUDGET, value_type=None):
+        """
+        参数:
+            addresses: 初始地址，可以是任意整数可迭代对象、array('Q')、NumPy数组或CandidateSet
+            sort: 是否对初始地址排序（调用方已保证有序时无需排序）
+            memory_budget: 内存预算（字节），超过后转存到临时文件；为None时不限制
+            value_type: 给定时创建对应类型的空数值列
+        """
+        self.values = ValueColumn(value_type, memory_budget=memory_budget) if value_type else None
+        super().__init__(addresses, memory_budget)
+        if sort:
+            self.sort()
+
+    @classmethod
+    def from_iterable(cls, addresses):
+        """从任意地址集合创建候选集合，已是CandidateSet时直接返回"""
+        if isinstance(addresses, cls):
+            return addresses
+        return cls(addresses, sort=True)
+
+    def _empty_like(self):
+        return CandidateSet(memory_budget=self.memory_budget)
+
+    def __getitem__(self, index):
+        result = super().__getitem__(index)
+        if isinstance(index, slice) and self.values is not None:
+            result.values = self.values[index]
+        return result
+
+    def __contains__(self, address):
+        """二分查找地址是否在集合中"""
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self[middle] < address:
+                low = middle + 1
+            else:
+                high = middle
+        return low < len(self) and self[low] == address
+
+    def __eq__(self, other):
+        if isinstance(other, CandidateSet):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        location = "临时文件" if self.is_spilled else "内存"
+        return f"CandidateSet({len(self)} 个地址, {location})"
+
+    def iter_value_chunks(self, chunk_length=CHUNK_LENGTH):
+        """按块迭代数值列，与iter_chunks一一对应；没有数值列时每块为None"""
+        if self.values is not None and len(self.values) == len(self):
+            yield from self.values.iter_chunks(chunk_length)
+            return
+        for _ in range(0, len(self), chunk_length):
+            yield None
+
+    def extend(self, addresses):
+        """追加地址；追加另一个候选集合时一并追加其数值列"""
+        if isinstance(addresses, CandidateSet) and self.values is not None:
+            if addresses.values is not None and addresses.values.value_type == self.values.value_type:
+                self.values.extend(addresses.values)
+            else:
+                self.values = None  # 数值列无法与地址保持对应，丢弃
+        super().extend(addresses)
+
+    def extend_offsets(self, base_address, offsets):
+        """追加 base_address + offset 形式的地址，offsets为比较引擎返回的偏移量数组"""
+        if np is not None and isinstance(offsets, np.ndarray):
+            self.extend(offsets.astype(np.uint64, copy=False) + np.uint64(base_address))
+        else:
+            self.extend(array('Q', (base_address + offset for offset in offsets)))
+
+    def sort(self):
+        """按地址升序排序；排序后数值列无法保持对应，会被丢弃"""
+        self.values = None
+        if self.is_spilled:
+            # 转存的地址直接在文件映射上排序
+            if self._items:
+                self._spill()
+            self._mmap = None
+            if np is not None:
+                self._file.flush()
+                addresses = np.memmap(self._file, dtype=np.uint64, mode='r+', shape=(self._file_count,))
+                addresses.sort()
+                addresses.flush()
+                del addresses
+            else:
+                addresses = array('Q', sorted(self._file_view()))
+                self._mmap = None
+                self._file.seek(0)
+                self._file.write(memoryview(addresses).cast('B'))
+            return
+        if np is not None:
+            self.as_numpy().sort()
+        else:
+            self._items = array('Q', sorted(self._items))
+
+    def index_of(self, addresses):
+        """返回一组升序地址在集合中的索引，地址必须都在集合中
+
+        用于后续扫描后把首次值、先前值等数值列对齐到存活的候选地址。
+        """
+        if np is not None:
+            if isinstance(addresses, SpillableArray):
+                addresses = addresses.as_numpy()
+            return np.searchsorted(self.as_numpy(), np.asarray(addresses, dtype=np.uint64))
+        # 两个集合都有序，同时向前遍历即可
+        indices = array('q')
+        position = 0
+        source = iter(self)
+        current = next(source, None)
+        for address in addresses:
+            while current is not None and current < address:
+                current = next(source, None)
+                position += 1
+            indices.append(position)
+        return indices
+
+    def take(self, indices):
+        """按索引选取地址，返回新的候选集合（数值列一并选取）
+
+        参数:
+            indices: 升序索引序列，或与集合等长的布尔掩码（NumPy数组）
+        """
+        result = self._take_items(indices)
+        if self.values is not None:
+            result.values = self.values.take(indices)
+        return result
+
+
+class TaggedCandidateSet:
+    """多种数值类型的候选地址（所有数值类型扫描的结果）
+
+    每种类型保存为一个附带该类型数值列的CandidateSet，按类型分组依次排列；
+    迭代、切片时按分组顺序访问，iter_tagged同时给出每个地址的类型。
+    """
+
+    def __init__(self, parts=None):
+        """
+        参数:
+            parts: {数值类型: CandidateSet}，空的分组会被忽略
+        """
+        self.parts = {value_type: part for value_type, part in (parts or {}).items() if len(part)}
+
+    @property
+    def value_types(self):
+        """包含结果的数值类型"""
+        return list(self.parts)
+
+    def __len__(self):
+        return sum(len(part) for part in self.parts.values())
+
+    def __iter__(self):
+        for part in self.parts.values():
+            yield from part
+
+    def iter_tagged(self):
+        """按分组顺序迭代 (地址, 数值类型)"""
+        for value_type, part in self.parts.items():
+            for address in part:
+                yield address, value_type
+
+    def tagged_at(self, index):
+        """返回按分组顺序的第index个 (地址, 数值类型)"""
+        if index < 0:
+            index += len(self)
+        if index >= 0:
+            for value_type, part in self.parts.items():
+                if index < len(part):
+                    return part[index], value_type
+                index -= len(part)
+        raise IndexError("索引超出范围")
+
+    def __getitem__(self, index):
+        """按索引取出地址，或按连续切片取出各分组的对应部分"""
+        if not isinstance(index, slice):
+            return self.tagged_at(index)[0]
+        if index.step not in (None, 1):
+            raise TypeError("按类型分组的候选集合只支持连续切片")
+        start, stop, _ = index.indices(len(self))
+        parts = {}
+        position = 0
+        for value_type, part in self.parts.items():
+            low, high = max(start - position, 0), min(stop - position, len(part))
+            if low < high:
+                parts[value_type] = part[low:high]
+            position += len(part)
+        return TaggedCandidateSet(parts)
+
+    def __repr__(self):
+        counts = ', '.join(f"{value_type}: {len(part)}" for value_type, part in self.parts.items())
+        return f"TaggedCandidateSet({counts})"
+
+    def close(self):
+        """关闭各分组的转存文件"""
+        for part in self.parts.values():
+            part.close()
@@ -1,11 +1,13 @@
 from PyQt5.QtWidgets import QComboBox, QStyledItemDelegate
 from PyQt5.QtCore import Qt
+from utils.freeze_engine import FREEZE_MODES
 
 class LockStateDelegate(QStyledItemDelegate):
-    """锁定状态下拉菜单代理"""
+    """锁定状态下拉菜单代理：否、是（始终写入）及各条件锁定方式"""
     def createEditor(self, parent, option, index):
         editor = QComboBox(parent)
-        editor.addItems(["是", "否"])
+        editor.addItems([FREEZE_MODES['always'], "否"] +
+                        [text for mode, text in FREEZE_MODES.items() if mode != 'always'])
         editor.currentTextChanged.connect(lambda: self.commitData.emit(editor))
         return editor
 
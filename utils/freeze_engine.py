@@ -0,0 +1,462 @@
+"""锁定（冻结）数值的后台写入引擎
+
+LockRegistry是按地址索引的锁定表，每项保存数值类型、锁定值和打包后的字节，
+只在用户锁定、修改或解除锁定时更新；写入时直接使用打包好的字节，无需再查找类型或转换数值。
+FreezeEngine在独立的后台线程中按固定周期（最短1毫秒）把锁定表写回内存，不依赖Qt事件循环，
+界面繁忙时锁定也不会中断。界面只修改锁定表，不再自行写入内存。
+
+锁定表变化时生成不可变的快照，写入线程每个周期只遍历快照，修改锁定表时无需等待写入线程。
+
+同一结构体中的多个锁定地址（背包格子、队伍属性）合并为写入区间（WriteSpan）：
+首尾相接的地址直接拼接后一次写入；间隔不超过MERGE_GAP字节的地址先读取整个区间，
+填入锁定值后一次写回，区间写入失败时退回逐个地址写入。
+间隔中的字节按读取时的内容写回，读取和写入之间游戏对间隔的修改会被覆盖，因此间隔不宜过大。
+
+除始终写入外，锁定还可以按条件写入（FREEZE_MODES）：只在数值改变时写入、不低于/不高于锁定值、
+每个周期逐步增减到锁定值。条件写入的区间每个周期先读取一次（与合并写入共用同一次读取），
+数值已满足条件时不写入，减少系统调用，也避免与游戏反复争夺同一缓存行；
+读取到的内容同时供结果表格显示（observed），无需再逐行读取。
+"""
+import logging
+import threading
+import time
+
+from utils.value_types import get_type_info, pack_value, parse_value, unpack_value
+
+# 默认写入周期（秒）
+DEFAULT_PERIOD = 0.01
+
+# 最短写入周期（秒）
+MIN_PERIOD = 0.001
+
+# 同一地址连续写入失败达到该次数后只记录一次日志
+FAILURE_LOG_THRESHOLD = 100
+
+# 合并写入区间时允许的最大间隔（字节）
+MERGE_GAP = 64
+
+# 写入区间的最大长度（字节）
+MAX_SPAN_SIZE = 4096
+
+# 锁定方式 -> 结果表格锁定列中显示的文本
+FREEZE_MODES = {
+    'always': '是',         # 每个周期都写入锁定值
+    'changed': '改变时',     # 只在数值与锁定值不同时写入
+    'floor': '不低于',       # 数值低于锁定值时写入锁定值
+    'ceiling': '不高于',     # 数值高于锁定值时写入锁定值
+    'increase': '递增',      # 每个周期增加amount，直到锁定值
+    'decrease': '递减',      # 每个周期减少amount，直到锁定值
+}
+
+
+def get_freeze_mode(text):
+    """根据锁定列的文本获取锁定方式，未锁定（"否"或无法识别）时返回None"""
+    for mode, mode_text in FREEZE_MODES.items():
+        if mode_text == text:
+            return mode
+    return None
+
+
+class LockEntry:
+    """一个锁定的地址"""
+
+    __slots__ = ('address', 'value_type', 'value', 'data', 'mode', 'amount')
+
+    def __init__(self, address, value_type, value, data, mode='always', amount=1):
+        self.address = address
+        self.value_type = value_type
+        self.value = value    # 锁定值（对应类型的Python数值）
+        self.data = data      # 打包后的字节
+        self.mode = mode      # 锁定方式，见FREEZE_MODES
+        self.amount = amount  # 递增/递减方式每个周期的变化量
+
+    @property
+    def conditional(self):
+        """是否需要先读取当前值才能决定是否写入"""
+        return self.mode != 'always'
+
+    def target(self, current):
+        """根据当前内存中的字节决定要写入的字节，不需要写入时返回None"""
+        if self.mode == 'always':
+            return self.data
+        if current == self.data:
+            return None
+        if self.mode == 'changed':
+            return self.data
+        number = unpack_value(current, self.value_type)
+        if number != number:
+            return self.data  # 浮点数无效（NaN）时直接写入锁定值
+        if self.mode == 'floor':
+            return self.data if number < self.value else None
+        if self.mode == 'ceiling':
+            return self.data if number > self.value else None
+        if self.mode == 'increase' and number < self.value:
+            return pack_value(min(number + self.amount, self.value), self.value_type)
+        if self.mode == 'decrease' and number > self.value:
+            return pack_value(max(number - self.amount, self.value), self.value_type)
+        return None
+
+    def __repr__(self):
+        return f"LockEntry({hex(self.address)}, {self.value_type}, {self.value}, {self.mode})"
+
+
+class LockRegistry:
+    """按地址索引的锁定表"""
+
+    def __init__(self):
+        self._entries = {}    # 地址 -> LockEntry
+        self._lock = threading.Lock()
+        self.snapshot = ()    # 按地址升序的LockEntry元组，锁定表变化时整体替换
+        self.version = 0      # 锁定表的修改次数
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, address):
+        return address in self._entries
+
+    def __iter__(self):
+        return iter(self.snapshot)
+
+    def get(self, address):
+        """返回地址的LockEntry，未锁定时返回None"""
+        return self._entries.get(address)
+
+    def add(self, address, value_type, value, mode='always', amount=1):
+        """锁定地址，已锁定时替换为新的设置
+
+        参数:
+            mode: 锁定方式，见FREEZE_MODES
+            amount: 递增/递减方式每个周期的变化量，必须大于0
+
+        值无效、超出类型范围或锁定方式不支持时抛出ValueError
+        """
+        if mode not in FREEZE_MODES:
+            raise ValueError(f"不支持的锁定方式: {mode}")
+        value = parse_value(value, value_type)
+        amount = parse_value(amount, value_type)
+        if not amount > 0:
+            raise ValueError(f"每个周期的变化量必须大于0: {amount}")
+        entry = LockEntry(address, value_type, value, pack_value(value, value_type), mode, amount)
+        with self._lock:
+            self._entries[address] = entry
+            self._publish()
+        return entry
+
+    def update(self, address, value=None, value_type=None, mode=None):
+        """修改已锁定地址的锁定值、类型或锁定方式（未给出的保持不变），地址未锁定时返回None"""
+        entry = self._entries.get(address)
+        if entry is None:
+            return None
+        value_type = value_type or entry.value_type
+        amount = entry.amount
+        if value_type != entry.value_type and not get_type_info(value_type)['is_float']:
+            amount = max(int(amount), 1)  # 浮点类型改为整数类型时变化量至少为1
+        return self.add(address, value_type, entry.value if value is None else value,
+                        mode or entry.mode, amount)
+
+    def remove(self, address):
+        """解除地址的锁定"""
+        with self._lock:
+            if self._entries.pop(address, None) is not None:
+                self._publish()
+
+    def clear(self):
+        """解除所有锁定"""
+        with self._lock:
+            self._entries.clear()
+            self._publish()
+
+    def _publish(self):
+        """生成新的快照（调用方持有锁）"""
+        self.snapshot = tuple(sorted(self._entries.values(), key=lambda entry: entry.address))
+        self.version += 1
+
+
+class WriteSpan:
+    """一次写入的内存区间"""
+
+    __slots__ = ('start', 'length', 'entries', 'data', 'needs_read')
+
+    def __init__(self, start, entries, data, needs_read):
+        self.start = start
+        self.length = max(entry.address + len(entry.data) for entry in entries) - start  # 区间长度（字节）
+        self.entries = entries        # 区间内的LockEntry
+        self.data = data              # 不需要读取时为拼接好的字节，否则为None
+        self.needs_read = needs_read  # 区间中有间隔或条件写入的锁定项，需要先读取
+
+    def patch(self, buffer):
+        """在读取到的区间内容中填入各锁定值，返回bytes（WriteProcessMemory只接受bytes）"""
+        buffer = bytearray(buffer)
+        for entry in self.entries:
+            offset = entry.address - self.start
+            buffer[offset:offset + len(entry.data)] = entry.data
+        return bytes(buffer)
+
+    def resolve(self, current):
+        """根据读取到的区间内容决定要写入的字节
+
+        锁定项按地址顺序依次处理，每一项都根据前面各项写入后的内容判断，
+        重叠的锁定项不会用读取到的旧字节覆盖前一项已写入的字节。
+
+        返回:
+            (要写入的区间内容bytes或None, [(锁定项, 要写入的字节或None), ...])
+        """
+        buffer = None
+        decisions = []
+        for entry in self.entries:
+            offset = entry.address - self.start
+            source = current if buffer is None else buffer
+            data = entry.target(bytes(source[offset:offset + len(entry.data)]))
+            decisions.append((entry, data))
+            if data is not None:
+                if buffer is None:
+                    buffer = bytearray(current)
+                buffer[offset:offset + len(data)] = data
+        # 写入函数最终交给WriteProcessMemory，只接受bytes
+        return (bytes(buffer) if buffer is not None else None), decisions
+
+
+def plan_spans(entries, can_read=True, max_gap=MERGE_GAP, max_size=MAX_SPAN_SIZE):
+    """将按地址升序的锁定项合并为写入区间
+
+    首尾相接（或重叠）的锁定项总是合并，无需读取；有间隔的区间需要一次读取和一次写入，
+    只有其中至少有3个锁定项时才比逐个写入少，否则拆回单独的锁定项。
+    条件写入的锁定项本来就需要读取，所在的区间总是合并并读取。
+
+    参数:
+        entries: 按地址升序的LockEntry
+        can_read: 能否读取目标进程内存，为False时只合并首尾相接的锁定项，条件写入按始终写入处理
+
+    返回:
+        [WriteSpan, ...]
+    """
+    groups = []
+    for entry in entries:
+        if groups:
+            group = groups[-1]
+            end = max(item.address + len(item.data) for item in group)
+            gap = entry.address - end
+            if gap <= (max_gap if can_read else 0) and entry.address + len(entry.data) - group[0].address <= max_size:
+                group.append(entry)
+                continue
+        groups.append([entry])
+
+    spans = []
+    for group in groups:
+        end = group[0].address
+        contiguous = True
+        for entry in group:
+            contiguous = contiguous and entry.address <= end
+            end = max(end, entry.address + len(entry.data))
+        if can_read and any(entry.conditional for entry in group):
+            spans.append(WriteSpan(group[0].address, tuple(group), None, True))
+        elif contiguous:
+            span = WriteSpan(group[0].address, tuple(group), None, False)
+            span.data = span.patch(bytes(span.length)) if len(group) > 1 else group[0].data
+            spans.append(span)
+        elif len(group) >= 3:
+            spans.append(WriteSpan(group[0].address, tuple(group), None, True))
+        else:
+            spans.extend(WriteSpan(entry.address, (entry,), entry.data, False) for entry in group)
+    return spans
+
+
+class FreezeEngine:
+    """在后台线程中按周期写入锁定表"""
+
+    def __init__(self, write, period=DEFAULT_PERIOD, registry=None, read=None):
+        """
+        参数:
+            write: 写入函数 write(地址, 字节串)，成功返回True
+            period: 写入周期（秒），不小于MIN_PERIOD
+            registry: 锁定表（LockRegistry），为None时创建新的锁定表
+            read: 读取函数 read(地址, 大小)，失败返回None；为None时只合并首尾相接的锁定地址
+        """
+        self.logger = logging.getLogger('game_cheater')
+        self.write = write
+        self.read = read
+        self.period = period
+        self.registry = registry if registry is not None else LockRegistry()
+        self._failures = {}      # 地址 -> 连续写入失败次数
+        self._observed = {}      # 地址 -> 条件写入的锁定项在上一个周期结束时的字节
+        self._plan = []          # 当前锁定表的写入区间
+        self._plan_version = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.tick_count = 0      # 已执行的写入周期数
+        self.last_syscalls = 0   # 上一个周期的读写调用次数
+        self.last_saved = 0      # 上一个周期比逐个写入节省的调用次数
+        self.total_saved = 0     # 累计节省的调用次数
+
+    @property
+    def period(self):
+        """写入周期（秒）"""
+        return self._period
+
+    @period.setter
+    def period(self, value):
+        self._period = max(float(value), MIN_PERIOD)
+
+    @property
+    def is_running(self):
+        """写入线程是否在运行"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """启动写入线程，已在运行时不做任何事"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='FreezeEngine', daemon=True)
+        self._thread.start()
+        self.logger.info(f"锁定写入线程已启动，周期 {self.period * 1000:.1f} 毫秒")
+
+    def stop(self, timeout=1.0):
+        """停止写入线程并等待其退出"""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop_event.set()
+        thread.join(timeout)
+        self._thread = None
+        self.logger.info("锁定写入线程已停止")
+
+    def _run(self):
+        """写入线程：按周期写入锁定值，按截止时间休眠，避免周期随写入耗时漂移"""
+        deadline = time.perf_counter()
+        while not self._stop_event.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                self.logger.debug(f"写入锁定值失败: {str(e)}")
+            deadline += self.period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                deadline = time.perf_counter()  # 写入耗时超过周期，不追赶错过的周期
+
+    def _update_plan(self):
+        """锁定表变化后重新合并写入区间，并丢弃已解除锁定的地址的失败计数和读取记录"""
+        version = self.registry.version
+        if version == self._plan_version:
+            return
+        snapshot = self.registry.snapshot
+        self._plan = plan_spans(snapshot, self.read is not None)
+        self._plan_version = version
+        if self._failures:
+            self._failures = {address: count for address, count in self._failures.items() if address in self.registry}
+        if self._observed:
+            self._observed = {address: data for address, data in self._observed.items() if address in self.registry}
+        if len(self._plan) < len(snapshot):
+            self.logger.debug(f"锁定表: {len(snapshot)} 个地址合并为 {len(self._plan)} 个写入区间")
+
+    def observed(self, address):
+        """条件写入的锁定地址在上一个周期结束时的字节，没有记录时返回None"""
+        return self._observed.get(address)
+
+    def tick(self):
+        """写入一次所有锁定值
+
+        返回:
+            写入失败的地址数
+        """
+        self._update_plan()
+        failed = 0
+        syscalls = 0
+        baseline = 0  # 逐个处理各锁定项所需的调用次数
+        for span in self._plan:
+            baseline += len(span.entries)
+            decisions = None
+            if span.needs_read:
+                syscalls += 1
+                current = self.read(span.start, span.length)
+                if current is not None and len(current) == span.length:
+                    data, decisions = span.resolve(current)
+                    # 逐个处理时条件写入的锁定项先读取，需要写入时再多一次调用
+                    baseline += sum(1 for entry, entry_data in decisions
+                                    if entry.conditional and entry_data is not None)
+                    self._observe(decisions, span.start, current)
+                    if data is None:
+                        # 数值都已满足条件，本周期不需要写入
+                        for entry in span.entries:
+                            self._succeeded(entry.address)
+                        continue
+                    syscalls += 1
+                    if self.write(span.start, data):
+                        for entry in span.entries:
+                            self._succeeded(entry.address)
+                        continue
+            elif len(span.entries) > 1:
+                syscalls += 1
+                if self.write(span.start, span.data):
+                    for entry in span.entries:
+                        self._succeeded(entry.address)
+                    continue
+
+            # 单独的锁定项，或区间读写失败时逐个处理
+            span_failed, span_syscalls = self._write_entries(span.entries, decisions)
+            failed += span_failed
+            syscalls += span_syscalls
+        self.tick_count += 1
+        self.last_syscalls = syscalls
+        # 区间写入失败后逐个写入时，调用次数可能多于逐个处理
+        self.last_saved = max(baseline - syscalls, 0)
+        self.total_saved += self.last_saved
+        return failed
+
+    def _write_entries(self, entries, decisions=None):
+        """逐个写入锁定项
+
+        参数:
+            decisions: 区间读取后已决定的 [(锁定项, 要写入的字节或None), ...]，为None时逐个读取条件写入的锁定项
+
+        返回:
+            (写入失败的地址数, 读写调用次数)
+        """
+        failed = 0
+        syscalls = 0
+        if decisions is None:
+            decisions = []
+            for entry in entries:
+                data = entry.data
+                if entry.conditional and self.read is not None:
+                    syscalls += 1
+                    current = self.read(entry.address, len(entry.data))
+                    if current is None or len(current) != len(entry.data):
+                        failed += 1
+                        self._failed(entry.address)
+                        continue
+                    data = entry.target(bytes(current))
+                    self._observe([(entry, data)], entry.address, current)
+                decisions.append((entry, data))
+
+        for entry, data in decisions:
+            if data is None:
+                self._succeeded(entry.address)
+                continue
+            syscalls += 1
+            if self.write(entry.address, data):
+                self._succeeded(entry.address)
+            else:
+                failed += 1
+                self._failed(entry.address)
+        return failed, syscalls
+
+    def _observe(self, decisions, start, current):
+        """记录条件写入的锁定项在本周期结束时的字节（写入的字节或读取到的字节）"""
+        for entry, data in decisions:
+            if entry.conditional:
+                offset = entry.address - start
+                self._observed[entry.address] = data if data is not None else bytes(current[offset:offset + len(entry.data)])
+
+    def _succeeded(self, address):
+        if self._failures:
+            self._failures.pop(address, None)
+
+    def _failed(self, address):
+        count = self._failures.get(address, 0) + 1
+        self._failures[address] = count
+        if count == FAILURE_LOG_THRESHOLD:
+            self.logger.debug(f"锁定地址 {hex(address)} 已连续 {count} 次写入失败")
@@ -2,6 +2,7 @@ import struct
 from PyQt5.QtWidgets import QTableWidgetItem
 from PyQt5.QtCore import Qt
 import logging
+from utils import value_types
 
 def guess_value_type(value):
     """推测内存值类型"""
@@ -21,27 +22,29 @@ def guess_value_type(value):
         return "未知"
 
 def update_memory_table(table, addresses, memory_reader, status_callback=None,
-                    first_values=None, prev_values=None, current_values=None, task_value_type=None):
-    """更新内存表格"""
-    if not table or not memory_reader or not addresses:
-        logger = logging.getLogger('game_cheater')
-        logger.error("更新内存表格失败: 无效的参数")
-        return False
+                    history=None, task_value_type=None, pattern=None):
+    """更新内存表格
+
+    表格的模型（MemoryTableModel）直接引用搜索结果和数值历史，视图只为可见的行读取和格式化数值，
+    因此更新耗时与结果数量无关，所有结果都可以浏览和排序。
 
-    # 获取logger
+    参数:
+        history: 与addresses对齐的数值历史（ValueHistory），提供首次值、先前值和当前值
+        pattern: 字节模式搜索的模式（BytePattern），当前值按模式长度读取并显示为字节
+    """
     logger = logging.getLogger('game_cheater')
-    logger.debug(f"开始更新内存表格: 地址数量={len(addresses)}, 值类型={task_value_type}")
+    if table is None or not memory_reader:
+        logger.error("更新内存表格失败: 无效的参数")
+        return False
 
-    # 限制显示的最大地址数量，避免UI卡顿
-    max_display = 1000
-    if len(addresses) > max_display:
+    model = table.model()
+    if not addresses:
+        model.clear()
         if status_callback:
-            status_callback(f"找到 {len(addresses)} 个匹配地址，仅显示前 {max_display} 个")
-        addresses = addresses[:max_display]
+            status_callback("没有找到匹配的地址")
+        return True
 
-    # 清空表格并重新设置行数，确保只显示当前搜索结果
-    table.setRowCount(0)
-    table.setRowCount(len(addresses))
+    logger.debug(f"开始更新内存表格: 地址数量={len(addresses)}, 值类型={task_value_type}")
 
     # 使用任务的value_type，如果没有提供则使用memory_reader的
     value_type = task_value_type if task_value_type else memory_reader.current_value_type
@@ -53,123 +56,15 @@ def update_memory_table(table, addresses, memory_reader, status_callback=None,
             status_callback("警告：未指定值类型，使用默认值 int32", True)
         logger.warning(f"更新内存表格时未指定值类型，使用默认值 int32")
 
-    # 记录当前使用的值类型
-    logger.debug(f"更新内存表格使用值类型: {value_type}")
-
-    # 保存原始值类型，避免影响其他任务
-    original_value_type = memory_reader.current_value_type
-
-    # 临时设置memory_reader的值类型为当前任务的值类型
-    memory_reader.current_value_type = value_type
-
-    def format_value(value, value_type):
-        """格式化值的显示"""
-        if value is None:
-            return "-"
-        try:
-            if value_type == 'int32':
-                return str(int(value))  # 整数显示
-            elif value_type == 'float' or value_type == 'double':
-                # 统一浮点数和双精度的格式化
-                if isinstance(value, bytes):
-                    # 如果是字节数据，使用struct.unpack解析
-                    if value_type == 'float' and len(value) >= 4:
-                        return f"{struct.unpack('<f', value[:4])[0]:.6f}"
-                    elif value_type == 'double' and len(value) >= 8:
-                        return f"{struct.unpack('<d', value[:8])[0]:.6f}"
-                    else:
-                        return "-数据长度错误-"
-                else:
-                    # 如果已经是数值，直接格式化
-                    return f"{float(value):.6f}"
-        except (ValueError, TypeError, struct.error) as e:
-            logger.debug(f"格式化值失败: {str(e)}, 值类型: {value_type}, 值: {value}, 类型: {type(value)}")
-            return f"-错误-"
-
-    # 优化：批量处理，减少UI更新次数
-    table.setUpdatesEnabled(False)  # 暂时禁用表格更新
-
     try:
-        # 批量设置表格项
-        for row, addr in enumerate(addresses):
-            try:
-                # 设置地址
-                addr_item = QTableWidgetItem(hex(addr))
-                table.setItem(row, 0, addr_item)
-
-                # 如果没有提供当前值，则从内存中读取
-                current_value = None
-                if current_values and addr in current_values:
-                    current_value = current_values.get(addr)
-                else:
-                    # 从内存中读取当前值
-                    try:
-                        current_value = memory_reader.read_value(addr)
-                        # 如果读取成功，更新current_values字典
-                        if current_value is not None and current_values is not None:
-                            current_values[addr] = current_value
-                    except Exception as e:
-                        logger.debug(f"读取地址 {hex(addr)} 的当前值失败: {str(e)}")
-
-                # 设置当前值
-                current_item = QTableWidgetItem(format_value(current_value, value_type))
-                table.setItem(row, 1, current_item)
-
-                # 设置先前值
-                prev_value = prev_values.get(addr) if prev_values else None
-                prev_item = QTableWidgetItem(format_value(prev_value, value_type))
-                table.setItem(row, 2, prev_item)
-
-                # 设置首次值
-                first_value = first_values.get(addr) if first_values else None
-                if first_value is None and current_value is not None and first_values is not None:
-                    # 如果是首次搜索且没有首次值但有当前值，使用当前值作为首次值
-                    first_value = current_value
-                    first_values[addr] = current_value
-                first_item = QTableWidgetItem(format_value(first_value, value_type))
-                table.setItem(row, 3, first_item)
-
-                # 设置类型
-                type_text = ""
-                type_mapping = {
-                    'int32': '整数',
-                    'float': '浮点',
-                    'double': '双精度'
-                }
-
-                type_text = type_mapping.get(value_type, value_type)
-
-                # if logger:
-                    # logger.debug(f"设置类型文本: {type_text} (原始类型: {value_type})")
-
-                type_item = QTableWidgetItem(type_text)
-                table.setItem(row, 4, type_item)
-
-                # 设置颜色标记值的变化
-                if prev_value is not None and current_value is not None:
-                    try:
-                        if value_type == 'int32':
-                            has_changed = current_value != prev_value
-                        else:
-                            # 对于浮点数和双精度，使用更精确的比较
-                            has_changed = abs(float(current_value) - float(prev_value)) > 1e-6
-                        if has_changed:
-                            current_item.setBackground(Qt.yellow)
-                    except Exception as e:
-                        logger.debug(f"比较值变化失败: {str(e)}")
-
-            except Exception as e:
-                logger.error(f"处理地址 {hex(addr)} 时出错: {str(e)}")
-                if status_callback:
-                    status_callback(f"处理地址 {hex(addr)} 时出错: {str(e)}")
+        model.set_results(addresses, memory_reader, history=history, value_type=value_type, pattern=pattern)
+        # 新结果按结果顺序显示，清除上一次的排序标记
+        table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
     except Exception as e:
         logger.error(f"更新内存表格失败: {str(e)}")
         import traceback
         logger.debug(traceback.format_exc())
-    finally:
-        table.setUpdatesEnabled(True)  # 恢复表格更新
-        # 恢复原始值类型，避免影响其他任务
-        memory_reader.current_value_type = original_value_type
+        return False
 
     if status_callback:
         status_callback(f"找到 {len(addresses)} 个匹配地址")
@@ -218,7 +113,7 @@ def add_to_result_table(result_table, address=None, memory_reader=None, value_ty
                     logger.debug(f"使用当前值类型: {value_type}")
 
             # 验证值类型是否有效
-            if value_type not in ['int32', 'float', 'double']:
+            if value_type not in value_types.VALUE_TYPES:
                 if logger:
                     logger.error(f"添加地址到结果表格失败: 不支持的值类型 {value_type}")
                 return False, False, None
@@ -243,21 +138,13 @@ def add_to_result_table(result_table, address=None, memory_reader=None, value_ty
             if initial_value is not None:
                 try:
                     # 尝试转换initial_value为对应类型的值
-                    if value_type == 'int32':
-                        initial_value = int(initial_value)
-                    elif value_type == 'float' or value_type == 'double':
-                        initial_value = float(initial_value)
+                    initial_value = value_types.parse_value(initial_value, value_type)
                     if logger:
                         logger.debug(f"转换初始值: {initial_value}, 类型={value_type}")
 
                     # 如果用户提供了初始值，立即写入内存
                     try:
-                        if value_type == 'int32':
-                            buffer = initial_value.to_bytes(4, 'little', signed=True)
-                        elif value_type == 'float':
-                            buffer = struct.pack('<f', initial_value)
-                        else:  # double
-                            buffer = struct.pack('<d', initial_value)
+                        buffer = value_types.pack_value(initial_value, value_type)
 
                         # 写入内存
                         if memory_reader.write_memory(address, buffer):
@@ -332,17 +219,7 @@ def add_to_result_table(result_table, address=None, memory_reader=None, value_ty
 
                 # 设置类型
                 try:
-                    type_text = ""
-                    type_mapping = {
-                        'int32': '整数',
-                        'float': '浮点',
-                        'double': '双精度'
-                    }
-
-                    type_text = type_mapping.get(value_type, value_type)
-
-                    # if logger:
-                    #     logger.debug(f"设置类型文本: {type_text} (原始类型: {value_type})")
+                    type_text = value_types.get_type_info(value_type)['display']
 
                     type_item = QTableWidgetItem(type_text)
                     result_table.setItem(row_count, 3, type_item)
@@ -356,7 +233,7 @@ def add_to_result_table(result_table, address=None, memory_reader=None, value_ty
                 # 设置当前值
                 try:
                     if current_value is not None:
-                        if value_type == 'double' or value_type == 'float':
+                        if value_types.get_type_info(value_type)['is_float']:
                             # 格式化浮点数，避免科学计数法
                             value_item = QTableWidgetItem(f"{current_value:.10f}")
                         else:
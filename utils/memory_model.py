@@ -0,0 +1,242 @@
+"""内存表格的数据模型
+
+搜索结果可能有数百万个地址，不再为每个地址创建表格项：模型直接引用任务的候选集合
+和数值历史，表格视图只对可见的行请求数据，此时才读取内存并格式化。
+设置结果时只替换引用，耗时与结果数量无关；排序时按所选列计算一次行的排列，
+未知初始值搜索的快照结果不排序。
+"""
+import logging
+import struct
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QBrush
+
+from utils import value_types
+from utils.candidate_set import TaggedCandidateSet
+from utils.snapshot_store import SnapshotStore
+
+try:
+    import numpy as np
+except ImportError:  # NumPy为可选依赖
+    np = None
+
+HEADERS = ['地址', '当前值', '先前值', '首次值', '类型']
+ADDRESS_COLUMN, CURRENT_COLUMN, PREVIOUS_COLUMN, FIRST_COLUMN, TYPE_COLUMN = range(len(HEADERS))
+
+# 数值列 -> 数值历史中的列名
+HISTORY_COLUMNS = {
+    CURRENT_COLUMN: 'current',
+    PREVIOUS_COLUMN: 'previous',
+    FIRST_COLUMN: 'first',
+}
+
+_CHANGED_BRUSH = QBrush(Qt.yellow)
+
+
+class MemoryTableModel(QAbstractTableModel):
+    """搜索结果表格的模型，各行按需从候选地址和数值历史中取值
+
+    第row行对应搜索结果中的第index个地址，未排序时两者相同；
+    当前值在显示时从内存读取并缓存到下一次刷新，先前值和首次值取自数值历史。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger('game_cheater')
+        self.addresses = None      # 搜索结果（CandidateSet、TaggedCandidateSet或SnapshotStore）
+        self.memory_reader = None
+        self.history = None        # 与搜索结果对齐的ValueHistory，没有时为None
+        self.value_type = 'int32'  # 搜索结果的数值类型，按类型分组的结果各行使用所在分组的类型
+        self.pattern = None        # 字节模式搜索的模式
+        self._length = 0
+        self._order = None         # 行 -> 结果索引，None表示按结果顺序排列
+        self._current = {}         # 结果索引 -> 本次刷新读取到的当前值
+
+    def set_results(self, addresses, memory_reader, history=None, value_type=None, pattern=None):
+        """显示新的搜索结果，只保存引用，不逐行处理
+
+        参数:
+            addresses: 搜索结果
+            memory_reader: 用于读取当前值的内存读取器
+            history: 与addresses对齐的数值历史，长度不一致时不使用
+            value_type: 搜索结果的数值类型
+            pattern: 字节模式搜索的模式（BytePattern），当前值按模式长度读取并显示为字节
+        """
+        self.beginResetModel()
+        self.addresses = addresses
+        self.memory_reader = memory_reader
+        self._length = len(addresses) if addresses is not None else 0
+        self.history = history if history is not None and len(history) == self._length else None
+        self.value_type = value_type or 'int32'
+        self.pattern = pattern
+        self._order = None
+        self._current = {}
+        self.endResetModel()
+
+    def clear(self):
+        """清空表格"""
+        self.set_results(None, self.memory_reader)
+
+    def refresh(self, first=0, last=None):
+        """丢弃已读取的当前值，通知视图重新请求first到last行（通常只是可见的行）"""
+        self._current = {}
+        if not self._length:
+            return
+        last = self._length - 1 if last is None else min(last, self._length - 1)
+        if 0 <= first <= last:
+            self.dataChanged.emit(self.index(first, ADDRESS_COLUMN), self.index(last, TYPE_COLUMN))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._length
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(HEADERS):
+            return HEADERS[section]
+        return None
+
+    def _result_index(self, row):
+        """返回第row行对应的结果索引"""
+        return int(self._order[row]) if self._order is not None else row
+
+    def row_info(self, row):
+        """返回第row行的 (结果索引, 地址, 数值类型)"""
+        index = self._result_index(row)
+        if isinstance(self.addresses, TaggedCandidateSet):
+            address, value_type = self.addresses.tagged_at(index)
+        else:
+            address, value_type = self.addresses[index], self.value_type
+        return index, int(address), value_type
+
+    def _read_current(self, index, address, value_type):
+        """读取当前值，同一次刷新内只读取一次；字节模式返回格式化后的文本"""
+        if index in self._current:
+            return self._current[index]
+        if value_type in value_types.PATTERN_TYPES:
+            pattern = self.pattern
+            value = pattern.format(self.memory_reader.read_memory_view(address, pattern.length)) if pattern else "-"
+        else:
+            size = value_types.get_value_size(value_type)
+            data = self.memory_reader.read_memory_view(address, size) if self.memory_reader else None
+            value = value_types.unpack_value(data, value_type) if data is not None and len(data) >= size else None
+        self._current[index] = value
+        return value
+
+    def _row_values(self, index, address, value_type):
+        """返回 (首次值, 先前值, 当前值)，当前值读取失败时使用搜索时记录的值"""
+        first_value, prev_value, recorded = self.history.row(index) if self.history else (None, None, None)
+        current_value = self._read_current(index, address, value_type)
+        if current_value is None:
+            current_value = recorded
+        # 没有记录首次值时使用当前值
+        if first_value is None and self.history is not None:
+            first_value = current_value
+        return first_value, prev_value, current_value
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.BackgroundRole):
+            return None
+        column = index.column()
+        if role == Qt.BackgroundRole and column != CURRENT_COLUMN:
+            return None
+        try:
+            row_index, address, value_type = self.row_info(index.row())
+            if column == ADDRESS_COLUMN:
+                return hex(address) if role == Qt.DisplayRole else None
+            if column == TYPE_COLUMN:
+                if value_type in value_types.PATTERN_TYPES:
+                    return value_types.PATTERN_TYPES[value_type]
+                return value_types.VALUE_TYPES.get(value_type, {}).get('display', value_type)
+
+            if value_type in value_types.PATTERN_TYPES:
+                # 字节模式的结果没有数值历史，只显示当前内存中的字节
+                if role == Qt.BackgroundRole:
+                    return None
+                return self._read_current(row_index, address, value_type) if column == CURRENT_COLUMN else "-"
+
+            first_value, prev_value, current_value = self._row_values(row_index, address, value_type)
+            if role == Qt.BackgroundRole:
+                # 标记与先前值不同的当前值
+                if prev_value is None or current_value is None:
+                    return None
+                if value_types.get_type_info(value_type)['is_float']:
+                    has_changed = abs(float(current_value) - float(prev_value)) > 1e-6
+                else:
+                    has_changed = current_value != prev_value
+                return _CHANGED_BRUSH if has_changed else None
+
+            value = {CURRENT_COLUMN: current_value, PREVIOUS_COLUMN: prev_value, FIRST_COLUMN: first_value}[column]
+            return value_types.format_value(value, value_type)
+        except (ValueError, TypeError, IndexError, struct.error) as e:
+            self.logger.debug(f"格式化第 {index.row()} 行失败: {str(e)}")
+            return "-错误-" if role == Qt.DisplayRole else None
+
+    def _parts(self):
+        """按结果顺序返回各分组的 (数值类型, 候选地址, 数值历史)"""
+        if isinstance(self.addresses, TaggedCandidateSet):
+            histories = self.history.parts if self.history is not None and self.history.parts else {}
+            return [(value_type, part, histories.get(value_type))
+                    for value_type, part in self.addresses.parts.items()]
+        return [(self.value_type, self.addresses, self.history)]
+
+    def _sort_keys(self, column):
+        """返回各分组按结果顺序排列的排序键，没有该列数据时返回None
+
+        数值列按搜索时记录的值排序（当前值列为最近一次搜索读到的值），不为排序读取整个结果的内存。
+        """
+        keys = []
+        for group, (value_type, addresses, history) in enumerate(self._parts()):
+            if column == ADDRESS_COLUMN:
+                keys.append(addresses)
+            elif column == TYPE_COLUMN:
+                keys.append([group] * len(addresses))
+            else:
+                values = getattr(history, HISTORY_COLUMNS[column], None) if history is not None else None
+                if values is None or len(values) != len(addresses):
+                    return None
+                keys.append(values)
+        return keys
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """按列排序，只计算行的排列，不复制结果"""
+        if not self._length or column not in range(len(HEADERS)):
+            return
+        if isinstance(self.addresses, SnapshotStore):
+            # 快照结果只在内存中保存页面，排序需要展开所有地址，不支持排序
+            self.logger.debug("未知初始值的搜索结果不能排序")
+            return
+        keys = self._sort_keys(column)
+        if keys is None:
+            self.logger.debug(f"第 {column} 列没有记录数值，不能排序")
+            return
+        descending = order == Qt.DescendingOrder
+
+        if np is not None:
+            merged = np.concatenate([key.as_numpy() if hasattr(key, 'as_numpy') else np.asarray(key)
+                                     for key in keys])
+            permutation = np.argsort(merged, kind='stable')
+            self._set_order(permutation[::-1] if descending else permutation)
+        else:
+            merged = [key for part in keys for key in part]
+            self._set_order(sorted(range(len(merged)), key=merged.__getitem__, reverse=descending))
+
+    def _set_order(self, order):
+        """替换行的排列，视图持有的持久索引（选中行、当前行）随所在的结果移到新行"""
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        results = [self._result_index(index.row()) for index in old_indexes]
+        self._order = order
+        if old_indexes:
+            # 结果索引 -> 新的行
+            if np is not None:
+                rows = np.empty(self._length, dtype=np.int64)
+                rows[order] = np.arange(self._length)
+            else:
+                rows = [0] * self._length
+                for row, index in enumerate(order):
+                    rows[index] = row
+            self.changePersistentIndexList(
+                old_indexes, [self.index(int(rows[result]), index.column()) for result, index in zip(results, old_indexes)])
+        self.layoutChanged.emit()
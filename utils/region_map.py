@@ -0,0 +1,299 @@
+"""目标进程的内存区域表
+
+缓存VirtualQueryEx枚举到的内存区域（基址、大小、状态、保护属性、类型及所属模块），
+首次扫描、快照等功能共用同一份区域表，无需各自重新枚举整个地址空间。
+RegionFilter按可写、私有、映像/映射文件、模块和地址范围筛选要扫描的区域。
+
+系统不提供区域变化的通知，刷新时仍需按区域逐个查询（每个区域一次VirtualQueryEx），
+未变化的区域直接复用已有条目，所属模块只在出现新的映像区域时才重新枚举；
+在max_age秒内刷新过的区域表直接使用，省去整个地址空间的查询。
+"""
+import bisect
+import ntpath
+import time
+
+# Windows内存常量（与win32con中的值相同，此处直接定义以便在其他平台上测试）
+MEM_COMMIT = 0x1000
+MEM_FREE = 0x10000
+MEM_PRIVATE = 0x20000
+MEM_MAPPED = 0x40000
+MEM_IMAGE = 0x1000000
+PAGE_GUARD = 0x100
+
+# 可读的保护属性
+PAGE_READABLE = (
+    0x20 |  # PAGE_EXECUTE_READ
+    0x40 |  # PAGE_EXECUTE_READWRITE
+    0x02 |  # PAGE_READONLY
+    0x04    # PAGE_READWRITE
+)
+
+# 可写的保护属性（只保留可读的部分）
+PAGE_WRITABLE = (
+    0x40 |  # PAGE_EXECUTE_READWRITE
+    0x04    # PAGE_READWRITE
+)
+
+
+class Region:
+    """一个内存区域（对应一条MEMORY_BASIC_INFORMATION）"""
+
+    __slots__ = ('base', 'size', 'state', 'protect', 'type', 'allocation_base', 'module')
+
+    def __init__(self, base, size, state, protect, type, allocation_base=0, module=None):
+        self.base = base
+        self.size = size
+        self.state = state
+        self.protect = protect
+        self.type = type
+        self.allocation_base = allocation_base
+        self.module = module  # 所属模块的路径，非映像区域为None
+
+    @property
+    def end(self):
+        """区域结束地址（不含）"""
+        return self.base + self.size
+
+    @property
+    def is_readable(self):
+        """是否为已提交、可读且不是保护页的区域"""
+        return (self.state == MEM_COMMIT and bool(self.protect & PAGE_READABLE)
+                and not self.protect & PAGE_GUARD)
+
+    @property
+    def is_writable(self):
+        """是否可写"""
+        return bool(self.protect & PAGE_WRITABLE)
+
+    @property
+    def module_name(self):
+        """所属模块的文件名（小写），非映像区域为None"""
+        return ntpath.basename(self.module).lower() if self.module else None
+
+    def same_as(self, other):
+        """除所属模块外的属性是否都相同"""
+        return (self.base == other.base and self.size == other.size and self.state == other.state
+                and self.protect == other.protect and self.type == other.type
+                and self.allocation_base == other.allocation_base)
+
+    def __repr__(self):
+        module = f", {self.module}" if self.module else ""
+        return (f"Region({hex(self.base)}, {hex(self.size)}, state={hex(self.state)}, "
+                f"protect={hex(self.protect)}, type={hex(self.type)}{module})")
+
+
+class RegionFilter:
+    """扫描区域筛选条件，只作用于可读区域"""
+
+    def __init__(self, writable_only=False, private_only=False, exclude_image=False, exclude_mapped=False,
+                 include_modules=None, exclude_modules=None, address_ranges=None):
+        """
+        参数:
+            writable_only: 只扫描可写区域
+            private_only: 只扫描私有内存（MEM_PRIVATE，堆、栈等）
+            exclude_image: 排除模块映像（MEM_IMAGE）
+            exclude_mapped: 排除映射文件（MEM_MAPPED）
+            include_modules: 只扫描这些模块的映像区域（模块文件名，不区分大小写）
+            exclude_modules: 排除这些模块的映像区域
+            address_ranges: 只扫描这些地址范围 [(起始地址, 结束地址), ...]，结束地址不含
+        """
+        self.writable_only = writable_only
+        self.private_only = private_only
+        self.exclude_image = exclude_image
+        self.exclude_mapped = exclude_mapped
+        self.include_modules = {name.lower() for name in include_modules or ()}
+        self.exclude_modules = {name.lower() for name in exclude_modules or ()}
+        self.address_ranges = sorted((int(start), int(end)) for start, end in address_ranges or ())
+        for start, end in self.address_ranges:
+            if start >= end:
+                raise ValueError(f"无效的地址范围: {hex(start)} - {hex(end)}")
+
+    @classmethod
+    def from_dict(cls, data):
+        """从配置字典创建，未知的键会被忽略"""
+        keys = ('writable_only', 'private_only', 'exclude_image', 'exclude_mapped',
+                'include_modules', 'exclude_modules', 'address_ranges')
+        return cls(**{key: data[key] for key in keys if key in (data or {})})
+
+    def to_dict(self):
+        """转换为可保存到配置文件的字典"""
+        return {
+            'writable_only': self.writable_only,
+            'private_only': self.private_only,
+            'exclude_image': self.exclude_image,
+            'exclude_mapped': self.exclude_mapped,
+            'include_modules': sorted(self.include_modules),
+            'exclude_modules': sorted(self.exclude_modules),
+            'address_ranges': [list(item) for item in self.address_ranges],
+        }
+
+    def __repr__(self):
+        options = ', '.join(f"{key}={value}" for key, value in self.to_dict().items() if value)
+        return f"RegionFilter({options})"
+
+    def accepts(self, region):
+        """区域是否满足除地址范围以外的条件"""
+        if not region.is_readable:
+            return False
+        if self.writable_only and not region.is_writable:
+            return False
+        if self.private_only and region.type != MEM_PRIVATE:
+            return False
+        if self.exclude_image and region.type == MEM_IMAGE:
+            return False
+        if self.exclude_mapped and region.type == MEM_MAPPED:
+            return False
+        if self.include_modules and region.module_name not in self.include_modules:
+            return False
+        if self.exclude_modules and region.module_name in self.exclude_modules:
+            return False
+        return True
+
+    def apply(self, regions, alignment=1):
+        """筛选区域，返回 [(基址, 大小), ...]；给定地址范围时区域会被裁剪到范围内
+
+        参数:
+            alignment: 扫描的对齐步长，裁剪后的起始地址向上取整到该步长，
+                对齐扫描从区域基址开始按步长前进，起始地址未对齐时会错过所有数值
+        """
+        result = []
+        for region in regions:
+            if not self.accepts(region):
+                continue
+            if not self.address_ranges:
+                result.append((region.base, region.size))
+                continue
+            for start, end in self.address_ranges:
+                start, end = max(start, region.base), min(end, region.end)
+                start += -start % alignment
+                if start < end:
+                    result.append((start, end - start))
+        return result
+
+
+# 预设的区域筛选方案
+REGION_FILTER_PROFILES = {
+    'all': {},
+    'private_writable': {'writable_only': True, 'private_only': True},
+    'writable': {'writable_only': True},
+    'no_image_mapped': {'exclude_image': True, 'exclude_mapped': True},
+}
+
+
+def get_region_filter(profile='all', **overrides):
+    """按预设方案创建区域筛选条件，overrides中的条件覆盖预设值"""
+    options = REGION_FILTER_PROFILES.get(profile)
+    if options is None:
+        raise ValueError(f"不支持的区域筛选方案: {profile}")
+    return RegionFilter(**dict(options, **overrides))
+
+
+class RegionMap:
+    """按基址升序保存的内存区域表"""
+
+    def __init__(self, query, min_address, max_address, list_modules=None):
+        """
+        参数:
+            query: 查询函数 query(地址)，返回包含该地址的Region，查询失败返回None
+            min_address: 最小应用程序地址
+            max_address: 最大应用程序地址
+            list_modules: 枚举模块的函数，返回 {模块基址: 模块路径}；为None时不解析所属模块
+        """
+        self.query = query
+        self.min_address = min_address
+        self.max_address = max_address
+        self.list_modules = list_modules
+        self._regions = []        # 按基址升序的区域
+        self._bases = []          # 区域基址，用于二分查找
+        self._modules = {}        # 模块基址 -> 模块路径
+        self.last_refresh = None  # 上次刷新的时间（time.monotonic）
+        self.changed = 0          # 上次刷新新增或变化的区域数量
+        self.queries = 0          # 累计的查询次数
+        self.saved = 0            # 因刷新间隔不超过max_age而省去的查询次数
+
+    def __len__(self):
+        return len(self._regions)
+
+    def __iter__(self):
+        return iter(self._regions)
+
+    def __repr__(self):
+        return f"RegionMap({len(self._regions)} 个区域, {len(self._modules)} 个模块)"
+
+    def refresh(self, max_age=None):
+        """重新枚举内存区域，复用未变化的条目
+
+        参数:
+            max_age: 距上次刷新不超过该秒数时直接返回，不重新查询
+
+        返回:
+            新增或变化的区域数量
+        """
+        if (max_age is not None and self.last_refresh is not None
+                and time.monotonic() - self.last_refresh <= max_age):
+            # 重新枚举需要为每个区域查询一次
+            self.saved += len(self._regions)
+            return 0
+
+        cached = {region.base: region for region in self._regions}
+        regions = []
+        changed = 0
+        new_image = False
+        address = self.min_address
+        while address < self.max_address:
+            region = self.query(address)
+            self.queries += 1
+            if region is None or region.size <= 0:
+                break
+            old = cached.get(region.base)
+            if old is not None and old.same_as(region):
+                region = old
+            else:
+                changed += 1
+                new_image = new_image or region.type == MEM_IMAGE
+            regions.append(region)
+            address = region.end
+
+        if new_image:
+            self._resolve_modules(regions)
+
+        self._regions = regions
+        self._bases = [region.base for region in regions]
+        self.changed = changed
+        self.last_refresh = time.monotonic()
+        return changed
+
+    def _resolve_modules(self, regions):
+        """重新枚举模块，为映像区域设置所属模块"""
+        if self.list_modules is None:
+            return
+        try:
+            self._modules = dict(self.list_modules())
+        except Exception:
+            self._modules = {}
+        for region in regions:
+            if region.type == MEM_IMAGE:
+                region.module = self._modules.get(region.allocation_base)
+
+    def readable_regions(self, region_filter=None, alignment=1):
+        """返回可扫描的区域 [(基址, 大小), ...]
+
+        参数:
+            region_filter: 区域筛选条件（RegionFilter），为None时返回全部可读区域
+            alignment: 扫描的对齐步长，见RegionFilter.apply
+        """
+        if region_filter is not None:
+            return region_filter.apply(self._regions, alignment)
+        return [(region.base, region.size) for region in self._regions if region.is_readable]
+
+    def find(self, address):
+        """返回包含地址的区域，不在任何区域中时返回None"""
+        index = bisect.bisect_right(self._bases, address) - 1
+        if index >= 0 and address < self._regions[index].end:
+            return self._regions[index]
+        return None
+
+    def module_of(self, address):
+        """返回地址所属模块的路径，不属于任何模块时返回None"""
+        region = self.find(address)
+        return region.module if region is not None else None
@@ -0,0 +1,704 @@
+"""内存扫描比较引擎
+
+将一块内存缓冲区视为指定类型的数组，整体计算匹配条件，返回匹配的偏移量。
+优先使用NumPy向量化实现；NumPy不可用时退回纯Python实现，两者结果一致。
+"""
+import bisect
+import math
+import re
+import struct
+from array import array
+import logging
+
+from utils.value_types import get_type_info
+
+try:
+    import numpy as np
+except ImportError:  # NumPy为可选依赖
+    np = None
+
+HAS_NUMPY = np is not None
+
+# 浮点数比较参数，与原先的compare_float规则保持一致
+FLOAT_ZERO_THRESHOLD = 1e-6
+FLOAT_EPSILON = {
+    'float': 1e-4,   # 单精度浮点数使用更宽松的比较
+    'double': 1e-8,  # 双精度浮点数使用更精确的比较
+}
+
+
+def float_epsilon(value_type, target):
+    """根据值的大小动态计算浮点数比较精度"""
+    base = FLOAT_EPSILON.get(value_type, FLOAT_EPSILON['double'])
+    return max(base, abs(target) * base)
+
+# 与搜索值比较的方式
+SEARCH_COMPARES = ('exact', 'bigger', 'smaller')
+
+# 与先前值比较的方式，increased_by/decreased_by需要提供变化量
+RELATION_COMPARES = ('changed', 'unchanged', 'increased', 'decreased', 'increased_by', 'decreased_by')
+
+# 后续扫描合并读取时的区间对齐大小，同一区间内的候选地址只读取一次
+SPAN_SIZE = 64 * 1024
+
+# 内存页大小，合并读取的区间失败时按页重新读取
+PAGE_SIZE = 4096
+
+# 多值扫描中同一整数类型的搜索值不超过该数量时逐个比较，否则使用np.isin
+MATCH_ANY_LOOP_LIMIT = 16
+
+
+def _slot_count(length, size, alignment):
+    """计算缓冲区中按对齐方式可容纳的完整数值个数"""
+    if length < size:
+        return 0
+    return (length - size) // alignment + 1
+
+
+def _shift_count(size, alignment):
+    """非对齐扫描时需要的错位视图数量，对齐步长不能整除数值大小时返回0
+
+    对齐步长小于数值大小时，从偏移k*alignment开始按数值大小连续解析（k = 0..size/alignment-1），
+    各错位视图合起来覆盖所有按对齐步长排列的位置，每个视图都是连续的类型化数组。
+    """
+    if alignment >= size or size % alignment:
+        return 0
+    return size // alignment
+
+
+def iter_scan_windows(region_size, window_size, overlap=0):
+    """将区域划分为固定大小的扫描窗口
+
+    相邻窗口重叠overlap字节（通常为数值大小减1），跨越窗口边界的数值也能被完整读取；
+    由于重叠部分不足以容纳一个从下一窗口起点开始的数值，同一位置不会被重复匹配。
+
+    返回:
+        (窗口在区域内的偏移, 读取长度) 的迭代器
+    """
+    if window_size <= 0:
+        raise ValueError(f"无效的窗口大小: {window_size}")
+    for offset in range(0, region_size, window_size):
+        length = min(window_size + overlap, region_size - offset)
+        if offset and length <= overlap:
+            break  # 剩余部分已被上一个窗口的重叠区覆盖
+        yield offset, length
+
+
+def window_keep(offset, region_size, window_size, overlap):
+    """返回窗口中属于本窗口的数值起始偏移上限，None表示全部属于本窗口
+
+    按最大数值大小重叠读取、再按较小的类型扫描时，重叠部分中的数值也会出现在下一个窗口的开头，
+    只有区域中的最后一个窗口需要扫描重叠部分。窗口划分与iter_scan_windows相同。
+    """
+    next_offset = offset + window_size
+    if next_offset < region_size and region_size - next_offset > overlap:
+        return window_size
+    return None
+
+
+def scan_tagged(engine, buffer, targets, compare_type, keep=None, alignment=None, base=0):
+    """在同一块缓冲区上依次按多种数值类型扫描，内存只需读取一次
+
+    参数:
+        engine: 比较引擎
+        buffer: 内存缓冲区
+        targets: [(数值类型, 搜索值), ...]，见value_types.types_for_value
+        compare_type: 比较方式（exact/bigger/smaller）
+        keep: 只保留起始偏移小于keep的数值，见window_keep
+        alignment: 对齐步长，为None时各类型按自身大小对齐；1表示非对齐扫描
+        base: 缓冲区起始地址，各类型从缓冲区中第一个按自身步长对齐的地址开始扫描
+
+    返回:
+        [(数值类型, 匹配偏移量数组, 匹配位置的数值数组), ...]，偏移量相对缓冲区起始位置
+    """
+    return scan_labeled(engine, buffer, [(value_type, value_type, value) for value_type, value in targets],
+                        compare_type, keep, alignment, base)
+
+
+def scan_labeled(engine, buffer, targets, compare_type, keep=None, alignment=None, base=0):
+    """在同一块缓冲区上查找多个带标签的搜索值（多值扫描），每种数值类型只扫描一遍
+
+    精确匹配时同一类型的所有搜索值一起比较（engine.scan_any），
+    再按匹配位置的数值把结果分给各个标签；其他比较方式按标签逐个扫描。
+
+    参数:
+        targets: [(标签, 数值类型, 搜索值), ...]，标签不能重复
+        其余参数同scan_tagged
+
+    返回:
+        [(标签, 匹配偏移量数组, 匹配位置的数值数组), ...]，顺序与targets相同
+    """
+    groups = {}
+    for label, value_type, value in targets:
+        groups.setdefault(value_type, []).append((label, value))
+
+    matches = {}
+    skips = {}
+    for value_type, group in groups.items():
+        size = get_type_info(value_type)['size']
+        step = min(alignment or size, size)
+        # 区域起始地址被裁剪时不一定对齐，跳过缓冲区开头不对齐的字节
+        skip = skips[value_type] = -base % step
+        view = buffer[skip:] if keep is None else buffer[skip:keep + size - 1]
+        if compare_type != 'exact' or len(group) == 1:
+            for label, value in group:
+                offsets = engine.scan(view, value_type, compare_type, value, step)
+                matches[label] = (offsets, engine.read_values(view, value_type, offsets))
+            continue
+        offsets = engine.scan_any(view, value_type, [value for _, value in group], step)
+        values = engine.read_values(view, value_type, offsets)
+        for label, value in group:
+            mask = engine.compare_values(values, None, value_type, 'exact', value)
+            if isinstance(offsets, array):
+                matches[label] = (array('Q', _select(offsets, mask)),
+                                  array(get_type_info(value_type)['typecode'], _select(values, mask)))
+            else:
+                matches[label] = (offsets[mask], values[mask])
+    return [(label, _shift_offsets(matches[label][0], skips[value_type]), matches[label][1])
+            for label, value_type, _ in targets]
+
+
+def _shift_offsets(offsets, skip):
+    """偏移量加上skip，转换为相对整个缓冲区的偏移量"""
+    if not skip:
+        return offsets
+    if isinstance(offsets, array):
+        return array('Q', [offset + skip for offset in offsets])
+    return offsets + np.uint64(skip)
+
+
+def coalesce_spans(addresses, value_size, span_size=SPAN_SIZE):
+    """将升序排列的候选地址按span_size对齐的区间分组，每组只需一次读取
+
+    参数:
+        addresses: 升序地址，array('Q')或NumPy uint64数组
+        value_size: 数值大小，区间长度会延伸到最后一个数值的末尾
+        span_size: 区间对齐大小
+
+    返回:
+        [(区间起始地址, 区间长度, 各地址相对起始地址的偏移量), ...]
+        偏移量在NumPy可用时为uint64数组，否则为array('Q')
+    """
+    spans = []
+    if not len(addresses):
+        return spans
+
+    if np is not None:
+        addresses = np.frombuffer(addresses, dtype=np.uint64) if isinstance(addresses, array) else addresses
+        keys = addresses // np.uint64(span_size)
+        bounds = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+        starts = [0] + bounds.tolist()
+        stops = bounds.tolist() + [len(addresses)]
+        for first, stop in zip(starts, stops):
+            group = addresses[first:stop]
+            span_start = int(group[0])
+            spans.append((span_start, int(group[-1]) - span_start + value_size, group - np.uint64(span_start)))
+        return spans
+
+    span_start = None
+    offsets = None
+    for address in addresses:
+        if span_start is None or address // span_size != span_start // span_size:
+            if offsets is not None:
+                spans.append((span_start, offsets[-1] + value_size, offsets))
+            span_start = address
+            offsets = array('Q')
+        offsets.append(address - span_start)
+    spans.append((span_start, offsets[-1] + value_size, offsets))
+    return spans
+
+
+def join_groups(terms, window):
+    """分组扫描的连接：找出所有搜索项都出现在 [基址, 基址+window) 范围内的基址
+
+    各搜索项的命中地址已按升序排列，候选基址为所有命中地址（去重后升序），
+    对每个候选基址在各命中数组上二分查找窗口的两端（归并连接），不逐对比较。
+    基址取一组数值中地址最小的命中，每个数值必须完整落在窗口内。
+
+    参数:
+        terms: [(升序命中地址, 数值大小, 需要的命中数), ...]，相同的搜索项合并为一项并给出出现次数；
+               命中地址为array('Q')或NumPy uint64数组
+        window: 窗口大小（字节）
+
+    返回:
+        升序的基址，NumPy可用时为uint64数组，否则为array('Q')
+    """
+    if not terms or any(window < size or len(hits) < count for hits, size, count in terms):
+        return np.empty(0, dtype=np.uint64) if np is not None else array('Q')
+
+    if np is not None:
+        starts = np.unique(np.concatenate([np.asarray(hits, dtype=np.uint64) for hits, _, _ in terms]))
+        keep = np.ones(len(starts), dtype=bool)
+        for hits, size, count in terms:
+            hits = np.asarray(hits, dtype=np.uint64)
+            low = np.searchsorted(hits, starts, 'left')
+            high = np.searchsorted(hits, starts + np.uint64(window - size), 'right')
+            keep &= high - low >= count
+        return starts[keep]
+
+    starts = sorted(set().union(*(hits for hits, _, _ in terms)))
+    bases = array('Q')
+    for start in starts:
+        if all(bisect.bisect_right(hits, start + window - size) - bisect.bisect_left(hits, start) >= count
+               for hits, size, count in terms):
+            bases.append(start)
+    return bases
+
+
+def _select(items, mask):
+    """按布尔掩码选取元素，掩码为NumPy数组时返回NumPy数组"""
+    if np is not None and isinstance(mask, np.ndarray):
+        return np.asarray(items)[mask]
+    return [item for item, keep in zip(items, mask) if keep]
+
+
+def filter_candidates(engine, read, addresses, value_type, compare_type, value, previous=None):
+    """按区间合并读取候选地址并筛选匹配的地址
+
+    参数:
+        engine: 比较引擎
+        read: 读取函数 read(地址, 大小)，返回缓冲区，读取失败返回None
+        addresses: 升序地址，array('Q')或NumPy uint64数组
+        value_type, compare_type, value: 与MemoryReader.search_value相同
+        previous: 与addresses一一对应的先前值，与先前值比较时需要
+
+    返回:
+        (匹配的地址数组, 匹配地址的当前值数组, 读取次数)
+    """
+    info = get_type_info(value_type)
+    value_size = info['size']
+    single = array('Q', [0])
+    parts = []
+    read_count = 0
+
+    def keep(base, data, offsets, old):
+        current = engine.read_values(data, value_type, offsets)
+        mask = engine.compare_values(current, old, value_type, compare_type, value)
+        parts.append((base, _select(offsets, mask), _select(current, mask)))
+
+    def filter_spans(span_addresses, span_previous, span_size):
+        nonlocal read_count
+        position = 0
+        for span_start, span_length, offsets in coalesce_spans(span_addresses, value_size, span_size):
+            old = None if span_previous is None else span_previous[position:position + len(offsets)]
+            position += len(offsets)
+            read_count += 1
+            data = read(span_start, span_length)
+            if data is not None and len(data) == span_length:
+                keep(span_start, data, offsets, old)
+            elif span_size > PAGE_SIZE:
+                # 区间中包含不可读的页面，按页重新读取
+                if np is not None:
+                    filter_spans(np.asarray(offsets, dtype=np.uint64) + np.uint64(span_start), old, PAGE_SIZE)
+                else:
+                    filter_spans(array('Q', (span_start + offset for offset in offsets)), old, PAGE_SIZE)
+            else:
+                # 页面不可读或末尾数值跨入不可读的页面，逐个读取候选地址
+                for index, offset in enumerate(offsets.tolist()):
+                    read_count += 1
+                    data = read(span_start + offset, value_size)
+                    if data is not None and len(data) == value_size:
+                        keep(span_start + offset, data, single, None if old is None else old[index:index + 1])
+
+    filter_spans(addresses, previous, SPAN_SIZE)
+    if np is not None:
+        matched = [np.asarray(found, dtype=np.uint64) + np.uint64(base) for base, found, _ in parts]
+        values = [np.asarray(found_values, dtype=info['dtype']) for _, _, found_values in parts]
+        if not matched:
+            return np.empty(0, dtype=np.uint64), np.empty(0, dtype=info['dtype']), read_count
+        return np.concatenate(matched), np.concatenate(values), read_count
+    matched = array('Q')
+    values = array(info['typecode'])
+    for base, found, found_values in parts:
+        matched.extend(base + offset for offset in found)
+        values.extend(found_values)
+    return matched, values, read_count
+
+
+def find_pattern_offsets(buffer, pattern, alignment=1):
+    """在缓冲区中查找字节模式，只保留按指定对齐方式的命中位置
+
+    使用C实现的字节搜索跳过不匹配的数据，只在命中时回到Python层。
+    未对齐的命中直接跳到下一个对齐位置继续搜索。
+    """
+    offsets = array('Q')
+    if not pattern:
+        return offsets
+    search = re.compile(re.escape(pattern), re.DOTALL).search
+    position = 0
+    while True:
+        found = search(buffer, position)
+        if found is None:
+            break
+        offset = found.start()
+        remainder = offset % alignment
+        if remainder:
+            position = offset + alignment - remainder
+            continue
+        offsets.append(offset)
+        position = offset + alignment
+    return offsets
+
+
+class PythonScanEngine:
+    """纯Python比较引擎
+
+    整数精确匹配使用字节模式搜索，其余比较逐个解析数值。
+    """
+    name = 'python'
+
+    def __init__(self):
+        self.logger = logging.getLogger('game_cheater')
+
+    def make_predicate(self, value_type, compare_type, value):
+        """构造单个数值的比较函数，不支持的比较方式返回None"""
+        info = get_type_info(value_type)
+        if not info['is_float']:
+            if compare_type == 'exact':
+                return lambda v: v == value
+            if compare_type == 'bigger':
+                return lambda v: v > value
+            if compare_type == 'smaller':
+                return lambda v: v < value
+            return None
+
+        isfinite = math.isfinite
+        if compare_type == 'exact':
+            # 搜索值本身无效时不会有任何匹配
+            if not isfinite(value):
+                return lambda v: False
+            # 对于接近0的值使用绝对比较
+            if abs(value) < FLOAT_ZERO_THRESHOLD:
+                return lambda v: isfinite(v) and abs(v) < FLOAT_ZERO_THRESHOLD
+            # 对于其他值使用相对比较
+            epsilon = float_epsilon(value_type, value)
+            return lambda v: isfinite(v) and abs(v - value) < epsilon
+        if compare_type == 'bigger':
+            return lambda v: isfinite(v) and v > value
+        if compare_type == 'smaller':
+            return lambda v: isfinite(v) and v < value
+        return None
+
+    def scan(self, buffer, value_type, compare_type, value, alignment=None):
+        """扫描缓冲区，返回匹配数值的偏移量数组"""
+        info = get_type_info(value_type)
+        size = info['size']
+        alignment = alignment or size
+        offsets = array('Q')
+
+        if compare_type == 'exact' and not info['is_float']:
+            # 整数精确匹配直接按字节模式搜索，无需逐个解析数值
+            try:
+                pattern = struct.pack('<' + info['format'], value)
+            except struct.error:
+                return offsets  # 搜索值超出类型范围
+            return find_pattern_offsets(buffer, pattern, alignment)
+
+        predicate = self.make_predicate(value_type, compare_type, value)
+        if predicate is None:
+            return offsets
+
+        view = memoryview(buffer)
+        count = _slot_count(len(view), size, alignment)
+        fmt = '<' + info['format']
+        shifts = _shift_count(size, alignment)
+
+        if alignment == size:
+            # 对齐步长等于数值大小时，整块按类型解析，避免逐个切片
+            values = struct.iter_unpack(fmt, view[:count * size])
+            for index, (current_value,) in enumerate(values):
+                if predicate(current_value):
+                    offsets.append(index * size)
+        elif shifts:
+            # 非对齐扫描：每个错位视图整块解析，再按偏移量合并
+            matched = []
+            for shift in range(0, shifts * alignment, alignment):
+                length = (len(view) - shift) // size * size
+                values = struct.iter_unpack(fmt, view[shift:shift + length])
+                matched.extend(shift + index * size
+                               for index, (current_value,) in enumerate(values) if predicate(current_value))
+            offsets.extend(sorted(matched))
+        else:
+            unpack_from = struct.Struct(fmt).unpack_from
+            for offset in range(0, count * alignment, alignment):
+                if predicate(unpack_from(view, offset)[0]):
+                    offsets.append(offset)
+        return offsets
+
+    def scan_any(self, buffer, value_type, values, alignment=None):
+        """扫描缓冲区，返回等于任一搜索值（精确匹配）的数值偏移量，升序且不重复"""
+        matched = set()
+        for value in values:
+            matched.update(self.scan(buffer, value_type, 'exact', value, alignment))
+        return array('Q', sorted(matched))
+
+    def read_values(self, buffer, value_type, offsets):
+        """解析缓冲区中指定偏移量处的数值，返回对应类型的array"""
+        info = get_type_info(value_type)
+        unpack_from = struct.Struct('<' + info['format']).unpack_from
+        return array(info['typecode'], (unpack_from(buffer, offset)[0] for offset in offsets))
+
+    def make_relation(self, value_type, compare_type, value=None):
+        """构造当前值与先前值的比较函数 relation(当前值, 先前值)，不支持的比较方式返回None
+
+        changed/unchanged: 数值是否改变（两个NaN视为未改变）
+        increased/decreased: 数值增大/减小（浮点数要求两个值均为有效数值）
+        increased_by/decreased_by: 数值增大/减小了value
+        """
+        is_float = get_type_info(value_type)['is_float']
+        isfinite = math.isfinite if is_float else (lambda v: True)
+
+        def same(a, b):
+            return a == b or (is_float and a != a and b != b)
+
+        if compare_type == 'changed':
+            return lambda a, b: not same(a, b)
+        if compare_type == 'unchanged':
+            return same
+        if compare_type == 'increased':
+            return lambda a, b: isfinite(a) and isfinite(b) and a > b
+        if compare_type == 'decreased':
+            return lambda a, b: isfinite(a) and isfinite(b) and a < b
+        if compare_type in ('increased_by', 'decreased_by') and value is not None:
+            sign = 1 if compare_type == 'increased_by' else -1
+            if not is_float:
+                return lambda a, b: (a - b) * sign == value
+            epsilon = float_epsilon(value_type, value)
+            return lambda a, b: isfinite(a) and isfinite(b) and abs((a - b) * sign - value) < epsilon
+        return None
+
+    def compare_values(self, current, previous, value_type, compare_type, value=None):
+        """比较一组当前值，返回布尔列表
+
+        exact/bigger/smaller与搜索值比较，忽略先前值；其余比较方式与先前值逐个比较，
+        没有先前值时全部不匹配。
+        """
+        if compare_type in SEARCH_COMPARES:
+            predicate = self.make_predicate(value_type, compare_type, value) if value is not None else None
+            if predicate is None:
+                return [False] * len(current)
+            return [predicate(v) for v in current]
+
+        relation = self.make_relation(value_type, compare_type, value)
+        if relation is None or previous is None:
+            return [False] * len(current)
+        return [relation(a, b) for a, b in zip(current, previous)]
+
+    def compare_previous(self, buffer, previous, value_type, compare_type, value=None):
+        """逐个比较缓冲区与先前快照中同一位置的数值（对齐访问），返回布尔列表"""
+        info = get_type_info(value_type)
+        count = len(buffer) // info['size']
+        fmt = f"<{count}{info['format']}"
+        current = struct.unpack_from(fmt, buffer)
+        old = struct.unpack_from(fmt, previous) if compare_type not in SEARCH_COMPARES else None
+        return self.compare_values(current, old, value_type, compare_type, value)
+
+
+class NumpyScanEngine(PythonScanEngine):
+    """NumPy向量化比较引擎，将缓冲区视为类型化数组整体比较"""
+    name = 'numpy'
+
+    def typed_view(self, buffer, value_type, alignment=None, offset=0):
+        """将缓冲区按类型和对齐方式视为NumPy数组（不复制数据）
+
+        参数:
+            offset: 视图起始的字节偏移（非对齐扫描的错位视图）
+        """
+        info = get_type_info(value_type)
+        size = info['size']
+        alignment = alignment or size
+        count = _slot_count(max(len(buffer) - offset, 0), size, alignment)
+        if alignment == size:
+            return np.frombuffer(buffer, dtype=info['dtype'], count=count, offset=offset if count else 0)
+        return np.ndarray(shape=(count,), dtype=info['dtype'], buffer=buffer,
+                          offset=offset if count else 0, strides=(alignment,))
+
+    def match(self, values, value_type, compare_type, value):
+        """计算类型化数组的匹配掩码，不支持的比较方式返回None"""
+        info = get_type_info(value_type)
+        if not info['is_float']:
+            return self._match_int(values, compare_type, value)
+
+        values = values.astype(np.float64, copy=False)
+        with np.errstate(invalid='ignore', over='ignore'):
+            finite = np.isfinite(values)
+            if compare_type == 'exact':
+                if not math.isfinite(value):
+                    return np.zeros(len(values), dtype=bool)
+                if abs(value) < FLOAT_ZERO_THRESHOLD:
+                    return finite & (np.abs(values) < FLOAT_ZERO_THRESHOLD)
+                epsilon = float_epsilon(value_type, value)
+                return finite & (np.abs(values - value) < epsilon)
+            if compare_type == 'bigger':
+                return finite & (values > value)
+            if compare_type == 'smaller':
+                return finite & (values < value)
+        return None
+
+    def _match_int(self, values, compare_type, value):
+        """整数比较，搜索值超出类型范围时直接给出结果，避免溢出"""
+        limits = np.iinfo(values.dtype)
+        count = len(values)
+        if compare_type == 'exact':
+            if value < limits.min or value > limits.max:
+                return np.zeros(count, dtype=bool)
+            return values == value
+        if compare_type == 'bigger':
+            if value >= limits.max:
+                return np.zeros(count, dtype=bool)
+            if value < limits.min:
+                return np.ones(count, dtype=bool)
+            return values > value
+        if compare_type == 'smaller':
+            if value <= limits.min:
+                return np.zeros(count, dtype=bool)
+            if value > limits.max:
+                return np.ones(count, dtype=bool)
+            return values < value
+        return None
+
+    def scan(self, buffer, value_type, compare_type, value, alignment=None):
+        """扫描缓冲区，返回匹配数值的偏移量数组
+
+        对齐步长小于数值大小时（非对齐扫描），在size/alignment个错位的连续视图上分别比较，
+        第k个视图的第j个数值位于偏移 k*alignment + j*size，即合并掩码中的第 k + j*shifts 项，
+        按该规律交错写回即可得到按偏移升序排列的结果，耗时约为对齐扫描的shifts倍。
+        """
+        size = get_type_info(value_type)['size']
+        alignment = alignment or size
+        shifts = _shift_count(size, alignment)
+        if not shifts:
+            values = self.typed_view(buffer, value_type, alignment)
+            mask = self.match(values, value_type, compare_type, value)
+            if mask is None:
+                return np.empty(0, dtype=np.uint64)
+            return np.flatnonzero(mask).astype(np.uint64) * np.uint64(alignment)
+
+        mask = np.zeros(_slot_count(len(buffer), size, alignment), dtype=bool)
+        for shift in range(shifts):
+            values = self.typed_view(buffer, value_type, size, shift * alignment)
+            shifted = self.match(values, value_type, compare_type, value)
+            if shifted is None:
+                return np.empty(0, dtype=np.uint64)
+            mask[shift::shifts] = shifted
+        return np.flatnonzero(mask).astype(np.uint64) * np.uint64(alignment)
+
+    def match_any(self, values, value_type, targets):
+        """计算类型化数组等于任一搜索值的掩码
+
+        浮点数需按各搜索值的精度比较；整数搜索值较少时逐个比较后合并掩码，
+        比np.isin快（np.isin对取值范围小的整数使用查找表，反而更慢），搜索值较多时才用np.isin。
+        """
+        info = get_type_info(value_type)
+        if not info['is_float']:
+            limits = np.iinfo(values.dtype)
+            targets = [target for target in targets if limits.min <= target <= limits.max]
+            if len(targets) > MATCH_ANY_LOOP_LIMIT:
+                return np.isin(values, np.array(targets, dtype=values.dtype))
+        else:
+            values = values.astype(np.float64, copy=False)  # 只转换一次
+        mask = np.zeros(len(values), dtype=bool)
+        for target in targets:
+            mask |= self.match(values, value_type, 'exact', target)
+        return mask
+
+    def scan_any(self, buffer, value_type, values, alignment=None):
+        """扫描缓冲区，返回等于任一搜索值（精确匹配）的数值偏移量，升序且不重复"""
+        size = get_type_info(value_type)['size']
+        alignment = alignment or size
+        shifts = _shift_count(size, alignment)
+        if not shifts:
+            mask = self.match_any(self.typed_view(buffer, value_type, alignment), value_type, values)
+        else:
+            mask = np.zeros(_slot_count(len(buffer), size, alignment), dtype=bool)
+            for shift in range(shifts):
+                mask[shift::shifts] = self.match_any(self.typed_view(buffer, value_type, size, shift * alignment),
+                                                     value_type, values)
+        return np.flatnonzero(mask).astype(np.uint64) * np.uint64(alignment)
+
+    def read_values(self, buffer, value_type, offsets):
+        """解析缓冲区中指定偏移量处的数值，返回对应类型的NumPy数组"""
+        info = get_type_info(value_type)
+        offsets = np.asarray(offsets, dtype=np.uint64)
+        raw = np.frombuffer(buffer, dtype=np.uint8)
+        # 按偏移量收集每个数值的字节，再整体视为类型化数组
+        index = offsets.astype(np.intp)[:, None] + np.arange(info['size'])
+        return raw[index].view(info['dtype']).ravel()
+
+    def compare_values(self, current, previous, value_type, compare_type, value=None):
+        """整体比较一组当前值，返回布尔掩码（规则与PythonScanEngine.compare_values相同）"""
+        info = get_type_info(value_type)
+        current = np.asarray(current, dtype=info['dtype'])
+        count = len(current)
+        if compare_type in SEARCH_COMPARES:
+            mask = self.match(current, value_type, compare_type, value) if value is not None else None
+            return mask if mask is not None else np.zeros(count, dtype=bool)
+        if previous is None or compare_type not in RELATION_COMPARES:
+            return np.zeros(count, dtype=bool)
+        if compare_type in ('increased_by', 'decreased_by') and value is None:
+            return np.zeros(count, dtype=bool)
+
+        previous = np.asarray(previous, dtype=info['dtype'])
+        if info['is_float']:
+            current = current.astype(np.float64)
+            previous = previous.astype(np.float64)
+        elif info['size'] < 8:
+            # 整数先扩展为64位，计算差值时不会溢出
+            current = current.astype(np.int64)
+            previous = previous.astype(np.int64)
+        elif compare_type in ('increased_by', 'decreased_by'):
+            # 64位整数的差值可能溢出，使用Python整数计算
+            current = current.astype(object)
+            previous = previous.astype(object)
+
+        with np.errstate(invalid='ignore', over='ignore'):
+            if compare_type in ('changed', 'unchanged'):
+                same = current == previous
+                if info['is_float']:
+                    same |= np.isnan(current) & np.isnan(previous)
+                return ~same if compare_type == 'changed' else same
+
+            if compare_type == 'increased':
+                mask = current > previous
+            elif compare_type == 'decreased':
+                mask = current < previous
+            else:
+                difference = current - previous if compare_type == 'increased_by' else previous - current
+                if info['is_float']:
+                    mask = np.abs(difference - value) < float_epsilon(value_type, value)
+                else:
+                    mask = np.asarray(difference == value, dtype=bool)
+            if info['is_float']:
+                mask &= np.isfinite(current) & np.isfinite(previous)
+            return mask
+
+    def compare_previous(self, buffer, previous, value_type, compare_type, value=None):
+        """整体比较缓冲区与先前快照中同一位置的数值，返回布尔掩码"""
+        current = self.typed_view(buffer, value_type)
+        old = None
+        if compare_type not in SEARCH_COMPARES:
+            old = self.typed_view(previous, value_type)[:len(current)]
+        return self.compare_values(current, old, value_type, compare_type, value)
+
+
+_ENGINES = {
+    'python': PythonScanEngine,
+    'numpy': NumpyScanEngine,
+}
+
+
+def get_scan_engine(name=None):
+    """获取比较引擎
+
+    参数:
+        name: 引擎名称，可选值：'numpy', 'python'；为None时优先使用NumPy
+    """
+    if name is None:
+        name = 'numpy' if HAS_NUMPY else 'python'
+    if name == 'numpy' and not HAS_NUMPY:
+        logging.getLogger('game_cheater').warning("NumPy不可用，使用纯Python比较引擎")
+        name = 'python'
+    engine_class = _ENGINES.get(name)
+    if engine_class is None:
+        raise ValueError(f"不支持的比较引擎: {name}")
+    return engine_class()
@@ -0,0 +1,258 @@
+"""多进程扫描工作函数
+
+在独立的工作进程中读取并比较内存区域，绕过GIL让比较阶段真正并行。
+工作函数只依赖ctypes和比较引擎，进程句柄在每个工作进程中单独打开并缓存，
+目标进程改变或工作进程退出时关闭。
+"""
+import ctypes
+from array import array
+
+from utils.scan_engine import filter_candidates, get_scan_engine, iter_scan_windows, scan_labeled, window_keep
+from utils.value_types import get_type_info, get_value_size
+
+PROCESS_QUERY_INFORMATION = 0x0400
+PROCESS_VM_READ = 0x0010
+
+# 每个工作进程缓存当前目标进程的句柄 (pid, handle)，目标进程改变时关闭旧句柄
+_process_handle = None
+
+# 记录调用错误码的kernel32（use_last_error=True），按需加载
+_kernel32 = None
+
+
+def _get_kernel32():
+    """获取记录错误码的kernel32，错误码通过ctypes.get_last_error()读取"""
+    global _kernel32
+    if _kernel32 is None:
+        _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        _kernel32.OpenProcess.restype = ctypes.c_void_p
+        _kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
+    return _kernel32
+
+
+def close_process_handle():
+    """关闭缓存的进程句柄"""
+    global _process_handle
+    if _process_handle is not None:
+        _get_kernel32().CloseHandle(_process_handle[1])
+        _process_handle = None
+
+
+def _get_process_handle(pid):
+    """获取（并缓存）目标进程的只读句柄，目标进程改变时关闭之前的句柄"""
+    global _process_handle
+    if _process_handle is not None and _process_handle[0] == pid:
+        return _process_handle[1]
+    close_process_handle()
+    kernel32 = _get_kernel32()
+    handle = kernel32.OpenProcess(PROCESS_QUERY_INFORMATION | PROCESS_VM_READ, False, pid)
+    if not handle:
+        raise OSError(f"工作进程无法打开目标进程: PID={pid}, 错误码={ctypes.get_last_error()}")
+    _process_handle = (pid, handle)
+    return handle
+
+
+def scan_regions(pid, regions, value_type, compare_type, value, alignment, window_size):
+    """读取并扫描一组互不重叠的内存区域
+
+    参数:
+        pid: 目标进程ID
+        regions: [(基址, 大小), ...]
+        value_type, compare_type, value, alignment: 与MemoryReader.search_value相同
+        window_size: 流式读取的窗口大小
+
+    返回:
+        (匹配地址的uint64字节串, 匹配地址的数值字节串, 检查的地址数, 读取的字节数)
+    """
+    handle = _get_process_handle(pid)
+    engine = get_scan_engine()
+    read_process_memory = ctypes.windll.kernel32.ReadProcessMemory
+    value_size = get_value_size(value_type)
+    overlap = value_size - 1
+
+    addresses = array('Q')
+    values = array(get_type_info(value_type)['typecode'])
+    total_checked = 0
+    total_bytes = 0
+    buffer = bytearray(window_size + overlap)
+    view = memoryview(buffer)
+    bytes_read = ctypes.c_size_t()
+
+    for base_address, region_size in regions:
+        for offset, length in iter_scan_windows(region_size, window_size, overlap):
+            target = (ctypes.c_char * length).from_buffer(buffer)
+            if not read_process_memory(handle, ctypes.c_void_p(base_address + offset), target,
+                                       length, ctypes.byref(bytes_read)) or not bytes_read.value:
+                continue
+            window = view[:bytes_read.value]
+            window_base = base_address + offset
+            offsets = engine.scan(window, value_type, compare_type, value, alignment)
+            addresses.extend(window_base + int(o) for o in offsets)
+            values.frombytes(engine.read_values(window, value_type, offsets).tobytes())
+            total_checked += max(0, (len(window) - value_size) // alignment + 1)
+            total_bytes += len(window)
+
+    return addresses.tobytes(), values.tobytes(), total_checked, total_bytes
+
+
+def scan_regions_tagged(pid, pieces, targets, compare_type, overlap, window_size, alignment=None):
+    """读取一组内存区域，同时查找多个带标签的搜索值（所有数值类型扫描、多值扫描）
+
+    参数:
+        pid: 目标进程ID
+        pieces: [(基址, 大小, 归属上限), ...]，见split_regions(with_limits=True)
+        targets: [(标签, 数值类型, 搜索值), ...]，所有数值类型扫描以数值类型作为标签
+        compare_type: 比较方式
+        overlap: 窗口和分段之间的重叠字节数（最大数值大小减1）
+        window_size: 流式读取的窗口大小
+        alignment: 对齐步长，为None时各类型按自身大小对齐；1表示非对齐扫描
+
+    返回:
+        ({标签: (匹配地址的uint64字节串, 匹配地址的数值字节串)}, 检查的地址数, 读取的字节数)
+    """
+    handle = _get_process_handle(pid)
+    engine = get_scan_engine()
+    read_process_memory = ctypes.windll.kernel32.ReadProcessMemory
+
+    found = {label: (array('Q'), array(get_type_info(value_type)['typecode'])) for label, value_type, _ in targets}
+    sizes = {label: get_value_size(value_type) for label, value_type, _ in targets}
+    total_checked = 0
+    total_bytes = 0
+    buffer = bytearray(window_size + overlap)
+    view = memoryview(buffer)
+    bytes_read = ctypes.c_size_t()
+
+    for base_address, piece_size, limit in pieces:
+        for offset, length in iter_scan_windows(piece_size, window_size, overlap):
+            target = (ctypes.c_char * length).from_buffer(buffer)
+            if not read_process_memory(handle, ctypes.c_void_p(base_address + offset), target,
+                                       length, ctypes.byref(bytes_read)) or not bytes_read.value:
+                continue
+            window = view[:bytes_read.value]
+            window_base = base_address + offset
+
+            # 重叠部分中的数值归属下一个窗口或下一段
+            keep = window_keep(offset, piece_size, window_size, overlap)
+            if limit < piece_size:
+                keep = min(keep if keep is not None else length, max(limit - offset, 0))
+            span = len(window) if keep is None else min(keep, len(window))
+            for label, offsets, values in scan_labeled(engine, window, targets, compare_type, keep, alignment,
+                                                        window_base):
+                addresses, matched_values = found[label]
+                addresses.extend(window_base + int(o) for o in offsets)
+                matched_values.frombytes(values.tobytes())
+                total_checked += span // (alignment or sizes[label])
+            total_bytes += len(window)
+
+    return ({label: (addresses.tobytes(), values.tobytes()) for label, (addresses, values) in found.items()},
+            total_checked, total_bytes)
+
+
+def find_pattern_regions(pid, pieces, pattern, window_size):
+    """读取一组内存区域，查找字节模式的所有出现位置
+
+    参数:
+        pid: 目标进程ID
+        pieces: [(基址, 大小, 归属上限), ...]，见split_regions(with_limits=True)
+        pattern: BytePattern
+        window_size: 流式读取的窗口大小
+
+    返回:
+        (匹配地址的uint64字节串, 读取的字节数)
+    """
+    handle = _get_process_handle(pid)
+    read_process_memory = ctypes.windll.kernel32.ReadProcessMemory
+    overlap = pattern.length - 1
+
+    addresses = array('Q')
+    total_bytes = 0
+    buffer = bytearray(window_size + overlap)
+    view = memoryview(buffer)
+    bytes_read = ctypes.c_size_t()
+
+    for base_address, piece_size, limit in pieces:
+        for offset, length in iter_scan_windows(piece_size, window_size, overlap):
+            target = (ctypes.c_char * length).from_buffer(buffer)
+            if not read_process_memory(handle, ctypes.c_void_p(base_address + offset), target,
+                                       length, ctypes.byref(bytes_read)) or not bytes_read.value:
+                continue
+            window = view[:bytes_read.value]
+            window_base = base_address + offset
+
+            # 从重叠部分开始的匹配归属下一个窗口或下一段
+            keep = window_keep(offset, piece_size, window_size, overlap)
+            if limit < piece_size:
+                keep = min(keep if keep is not None else length, max(limit - offset, 0))
+            addresses.extend(window_base + o for o in pattern.find_all(window, keep))
+            total_bytes += len(window)
+
+    return addresses.tobytes(), total_bytes
+
+
+def filter_addresses(pid, address_bytes, value_type, compare_type, value, previous_bytes=None):
+    """读取并筛选一组升序排列的候选地址（后续扫描）
+
+    参数:
+        pid: 目标进程ID
+        address_bytes: 候选地址的uint64字节串
+        value_type, compare_type, value: 与MemoryReader.search_value相同
+        previous_bytes: 与候选地址一一对应的先前值字节串，与先前值比较时需要
+
+    返回:
+        (匹配地址的uint64字节串, 匹配地址的当前值字节串, 读取次数)
+    """
+    handle = _get_process_handle(pid)
+    read_process_memory = ctypes.windll.kernel32.ReadProcessMemory
+    addresses = array('Q')
+    addresses.frombytes(address_bytes)
+    previous = None
+    if previous_bytes is not None:
+        previous = array(get_type_info(value_type)['typecode'])
+        previous.frombytes(previous_bytes)
+    buffer = bytearray(4096)
+    bytes_read = ctypes.c_size_t()
+
+    def read(address, size):
+        nonlocal buffer
+        if len(buffer) < size:
+            buffer = bytearray(size)
+        target = (ctypes.c_char * size).from_buffer(buffer)
+        if not read_process_memory(handle, ctypes.c_void_p(address), target, size, ctypes.byref(bytes_read)):
+            return None
+        return memoryview(buffer)[:bytes_read.value]
+
+    matched, matched_values, read_count = filter_candidates(get_scan_engine(), read, addresses, value_type,
+                                                            compare_type, value, previous)
+    return matched.tobytes(), matched_values.tobytes(), read_count
+
+
+def split_regions(regions, shard_bytes, overlap=0, with_limits=False):
+    """将区域列表按累计字节数切分为若干分片，便于在工作进程间均衡负载
+
+    超过分片大小的区域会被拆成多段，每段多读取overlap字节（通常为数值大小减1），
+    跨越拆分边界的数值仍能被完整比较。shard_bytes需为对齐大小的整数倍。
+
+    with_limits为True时每段为 (基址, 大小, 归属上限)：起始偏移小于归属上限的数值属于本段，
+    其余的由下一段负责（按较小的类型扫描重叠部分时避免重复匹配）。
+    """
+    shards = []
+    current = []
+    current_bytes = 0
+    for base_address, region_size in regions:
+        for offset in range(0, region_size, shard_bytes):
+            piece_size = min(shard_bytes + overlap, region_size - offset)
+            if offset and piece_size <= overlap:
+                break  # 剩余部分已被上一段的重叠区覆盖
+            if with_limits:
+                limit = window_keep(offset, region_size, shard_bytes, overlap)
+                current.append((base_address + offset, piece_size, piece_size if limit is None else limit))
+            else:
+                current.append((base_address + offset, piece_size))
+            current_bytes += piece_size
+            if current_bytes >= shard_bytes:
+                shards.append(current)
+                current = []
+                current_bytes = 0
+    if current:
+        shards.append(current)
+    return shards
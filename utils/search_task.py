@@ -1,6 +1,10 @@
 from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem
 from utils.memory_helper import update_memory_table
 from utils.search_thread import SearchThread
+from utils.candidate_set import CandidateSet, TaggedCandidateSet
+from utils.snapshot_store import SnapshotStore
+from utils.value_history import ValueHistory
+from utils.byte_pattern import BytePattern
 import struct
 import logging
 
@@ -10,20 +14,24 @@ class SearchTask:
         self.name = name
         self.display_name = name  # 添加显示名称属性，初始与name相同
         self.memory_table = None
-        self.search_results = []
+        self.search_results = CandidateSet()  # 当前搜索结果
         self.value = None
         self.value_type = None
         self.compare_type = None
+        self.unaligned = False  # 首次扫描是否检查每个字节偏移（非对齐扫描）
         self.is_first_search = True
         self.last_results = None  # 上次搜索结果
-        self.first_values = {}    # 首次搜索的值 {地址: 值}
-        self.prev_values = {}     # 上次搜索的值 {地址: 值}
-        self.current_values = {}  # 当前搜索的值 {地址: 值}
+        self.history = ValueHistory()  # 与搜索结果对齐的首次值、先前值、当前值
         self.logger = logging.getLogger('game_cheater')
         self.search_thread = None  # 每个任务拥有自己的搜索线程
         self.is_searching = False  # 标记任务是否正在搜索
         self.memory_reader = None  # 保存memory_reader引用
 
+    @property
+    def pattern(self):
+        """字节模式搜索（特征码、文本）的模式，数值搜索时为None"""
+        return self.value if isinstance(self.value, BytePattern) else None
+
     def create_memory_table(self):
         """创建内存表格"""
         from utils.ui_helper import create_memory_table
@@ -88,10 +96,12 @@ class SearchTask:
 
             if not addresses:
                 self.logger.debug("没有找到匹配的地址")
-                self.memory_table.setRowCount(0)
+                self.memory_table.model().clear()
                 return True
 
-            # 保存搜索结果
+            # 保存搜索结果，模糊值扫描的快照和所有类型扫描的分组结果直接保存
+            if not isinstance(addresses, (SnapshotStore, TaggedCandidateSet)):
+                addresses = CandidateSet.from_iterable(addresses)
             self.search_results = addresses
             self.last_results = addresses
 
@@ -113,10 +123,9 @@ class SearchTask:
                     addresses,
                     self.memory_reader,
                     None,  # 不使用状态回调
-                    self.first_values,
-                    self.prev_values,
-                    self.current_values,
-                    self.value_type
+                    history=self.history,
+                    task_value_type=self.value_type,
+                    pattern=self.pattern
                 )
 
                 self.logger.debug(f"成功更新搜索结果: {len(addresses)} 个地址")
@@ -141,19 +150,18 @@ class SearchTask:
         if self.is_searching:
             self.stop_search()
 
-        # 清空所有搜索相关数据
-        self.search_results = []
+        # 清空所有搜索相关数据，并删除结果的转存文件
+        self.search_results.close()
+        self.search_results = CandidateSet()
         self.last_results = None
-        self.first_values.clear()
-        self.prev_values.clear()
-        self.current_values.clear()
+        self.history.clear()
         self.value = None
         self.compare_type = None
         # 不要清除 value_type，因为它是任务的基本属性
 
         # 确保完全清空表格
         if self.memory_table:
-            self.memory_table.setRowCount(0)
+            self.memory_table.model().clear()
 
             # 如果有内存读取器，确保更新内存表格
             if hasattr(self, 'memory_reader') and self.memory_reader:
@@ -185,5 +193,6 @@ class SearchTask:
             'value_type': self.value_type,
             'compare_type': self.compare_type,
             'last_results': self.last_results,
-            'is_first_search': self.is_first_search
+            'is_first_search': self.is_first_search,
+            'unaligned': self.unaligned
         }
\ No newline at end of file
@@ -4,6 +4,8 @@ import time
 import struct
 import traceback
 import logging
+from utils.candidate_set import CandidateSet, TaggedCandidateSet
+from utils.snapshot_store import SnapshotStore
 
 class SearchThread(QThread):
     """搜索线程"""
@@ -111,11 +113,16 @@ class SearchThread(QThread):
                     '大于': 'bigger',
                     '小于': 'smaller',
                     '已改变': 'changed',
-                    '未改变': 'unchanged'
+                    '未改变': 'unchanged',
+                    '已增加': 'increased',
+                    '已减少': 'decreased',
+                    '增加了': 'increased_by',
+                    '减少了': 'decreased_by',
+                    '模糊值': 'unknown'
                 }
 
                 # 对于浮点数和双精度，增加搜索前的日志
-                if value_type in ['float', 'double']:
+                if value_type in ['float', 'double'] and value is not None:
                     self.logger.info(f"开始{value_type}类型搜索: 值={value}, 比较方式={compare_type}")
                     # 记录浮点数的二进制表示，帮助调试
                     if value_type == 'float':
@@ -135,7 +142,9 @@ class SearchThread(QThread):
                         value_type,
                         compare_map.get(compare_type, 'exact'),
                         None,
-                        self.progress_callback
+                        self.progress_callback,
+                        region_filter=self.search_params.get('region_filter'),
+                        unaligned=self.search_params.get('unaligned', False)
                     )
                 else:
                     self.logger.debug("执行后续搜索")
@@ -147,8 +156,16 @@ class SearchThread(QThread):
                         self.progress_callback
                     )
 
+                # 统一转换为候选集合，便于任务、表格和后续扫描共用；模糊值扫描保留快照，所有类型扫描保留分组
+                if not isinstance(results, (SnapshotStore, TaggedCandidateSet)):
+                    results = CandidateSet.from_iterable(results)
+
+                # 上一次的快照已被新快照取代，删除其临时文件
+                if isinstance(last_results, SnapshotStore) and last_results is not results:
+                    last_results.close()
+
                 # 对于浮点数和双精度，增加搜索结果的详细日志
-                if value_type in ['float', 'double'] and results:
+                if value_type in ['float', 'double'] and isinstance(results, CandidateSet) and results:
                     self.logger.info(f"{value_type}类型搜索结果: 找到{len(results)}个匹配地址")
                     # 记录前5个结果的值，帮助调试
                     if len(results) > 0:
@@ -174,10 +191,11 @@ class SearchThread(QThread):
                         self.logger.debug(f"为任务 '{task.name}' 设置memory_reader引用")
 
                     # 在调用任务的_on_search_completed方法前，确保先前值已更新
-                    if not task.is_first_search and task.current_values:
+                    if is_first_search:
+                        task.history.start(results)
+                    else:
                         self.logger.debug(f"更新任务 '{task.name}' 的先前值")
-                        task.prev_values = task.current_values.copy()
-                        task.current_values = {}
+                        task.history.advance(last_results, results)
 
                     # 调用任务的_on_search_completed方法，确保传递memory_reader
                     task._on_search_completed(results, self.memory_reader, self.progress_callback)
@@ -196,13 +214,13 @@ class SearchThread(QThread):
                 import traceback
                 self.logger.error(f"错误详情: {traceback.format_exc()}")
                 self.progress.emit(f"搜索失败: {str(e)}", True)
-                self.finished.emit([])
+                self.finished.emit(CandidateSet())
         except Exception as e:
             self.progress.emit(f"搜索失败: {str(e)}", True)
             self.logger.error(f"搜索线程 {self.thread_id} 失败: {str(e)}")
             import traceback
             self.logger.error(f"错误详情: {traceback.format_exc()}")
-            self.finished.emit([])
+            self.finished.emit(CandidateSet())
         finally:
             # 恢复原始值类型，避免影响其他任务
             self.memory_reader.current_value_type = original_value_type
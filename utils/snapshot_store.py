@@ -0,0 +1,377 @@
+"""未知初始值（模糊值）扫描的内存快照
+
+首次模糊扫描把所有可读页面保存为快照，之后每次扫描将当前内存与上一次快照逐页比较，
+只保留仍满足条件的数值位置（存活位置）。
+
+为了容纳数GB的快照：
+- 全零页面不保存内容，只记录为零页；
+- 每个页面计算哈希，内容相同的页面只保存一份；
+- 页面内容写入临时文件，通过内存映射读取；
+- 后续扫描时页面哈希未变化，直接得出结果，无需逐个比较数值，也不重新写入页面内容；
+- 页面的哈希、存活位图等元数据保存在紧凑数组中，每个页面只有几十字节的开销。
+"""
+import hashlib
+import mmap
+import tempfile
+from array import array
+from bisect import bisect_right
+from itertools import accumulate, islice
+
+from utils.candidate_set import CandidateSet
+from utils.value_types import get_type_info
+
+try:
+    import numpy as np
+except ImportError:  # NumPy为可选依赖
+    np = None
+
+PAGE_SIZE = 4096
+
+# 后续扫描时一次读取的最大连续页数
+RUN_PAGES = 256
+
+# 零页标记，零页不保存内容
+ZERO_PAGE = -1
+
+# 存活位图标记，表示页面内所有数值位置都存活
+FULL_MASK = -1
+
+_ZERO_BYTES = bytes(PAGE_SIZE)
+
+
+# 页面哈希的字节数
+DIGEST_SIZE = 16
+
+
+def page_digest(data):
+    """计算页面内容的哈希"""
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest()
+
+
+_ZERO_DIGEST = page_digest(_ZERO_BYTES)
+
+
+def _pack_mask(mask):
+    """将布尔序列压缩为位图（小端位序）"""
+    if np is not None and isinstance(mask, np.ndarray):
+        return np.packbits(mask, bitorder='little').tobytes()
+    bits = 0
+    for index, alive in enumerate(mask):
+        if alive:
+            bits |= 1 << index
+    return bits.to_bytes((len(mask) + 7) // 8, 'little')
+
+
+def _unpack_mask(packed, count):
+    """将位图展开为布尔序列，packed为None表示全部存活"""
+    if np is not None:
+        if packed is None:
+            return np.ones(count, dtype=bool)
+        return np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=count, bitorder='little').astype(bool)
+    if packed is None:
+        return [True] * count
+    bits = int.from_bytes(packed, 'little')
+    return [bool(bits >> index & 1) for index in range(count)]
+
+
+class _BlobFile:
+    """保存页面内容的临时文件，由一次模糊扫描过程中的各个快照共用
+
+    后续扫描得到的新快照直接引用未变化页面已保存的内容，只追加变化的页面；
+    所有引用它的快照关闭后才删除文件。
+    """
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile(prefix='up2me_snapshot_')
+        self.digests = bytearray()  # 内容编号 -> 哈希，每个哈希DIGEST_SIZE字节
+        self.index = {}             # 哈希 -> 内容编号，只在首次捕获时用于去重，捕获完成后释放
+        self.view = None            # 文件的只读内存映射，按需创建
+        self.users = 0              # 引用该文件的快照数量
+
+    def __len__(self):
+        return len(self.digests) // DIGEST_SIZE
+
+    def digest(self, blob):
+        """内容编号对应的哈希"""
+        return bytes(self.digests[blob * DIGEST_SIZE:(blob + 1) * DIGEST_SIZE])
+
+    def store(self, data, digest):
+        """保存页面内容，返回内容编号；捕获期间内容相同的页面只保存一份"""
+        blob = self.index.get(digest) if self.index is not None else None
+        if blob is None:
+            blob = len(self)
+            self.file.write(data)
+            self.digests += digest
+            if self.index is not None:
+                self.index[digest] = blob
+            self.view = None
+        return blob
+
+    def read(self, blob):
+        """读取内容编号对应的页面"""
+        if self.view is None:
+            self.file.flush()
+            self.view = memoryview(mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ))
+        return self.view[blob * PAGE_SIZE:(blob + 1) * PAGE_SIZE]
+
+    def release(self):
+        """快照不再引用该文件，没有引用时关闭并删除文件"""
+        self.users -= 1
+        if self.users <= 0 and self.file is not None:
+            self.view = None
+            self.index = None
+            try:
+                self.file.close()
+            except Exception:
+                pass
+            self.file = None
+
+
+class SnapshotStore:
+    """按页面保存的内存快照及各页面的存活位置
+
+    页面按地址升序保存；每个页面记录内容编号（ZERO_PAGE表示零页）和存活位图，
+    位图为None表示页面内所有数值位置都存活。
+    """
+
+    def __init__(self, value_type, blobs=None):
+        """
+        参数:
+            value_type: 数值类型，按该类型的大小对齐划分数值位置
+            blobs: 共用的页面内容文件（后续扫描的新快照），为None时创建新文件
+        """
+        self.value_type = value_type
+        self.value_size = get_type_info(value_type)['size']
+        self.slots_per_page = PAGE_SIZE // self.value_size
+        self.mask_size = (self.slots_per_page + 7) // 8
+        self._page_addresses = array('Q')  # 页面地址
+        self._page_blobs = array('q')      # 页面内容编号，ZERO_PAGE为零页
+        self._page_masks = array('q')      # 页面存活位图在_mask_data中的编号，FULL_MASK表示全部存活
+        self._mask_data = bytearray()      # 各页面的存活位图，每个mask_size字节
+        self._page_counts = array('I')     # 页面存活位置数量
+        self._blobs = blobs if blobs is not None else _BlobFile()
+        self._blobs.users += 1
+        self._page_ends = None             # 各页面存活数量的前缀和，按索引访问时按需创建
+        self._count = 0
+
+    def __len__(self):
+        """存活的数值位置数量"""
+        return self._count
+
+    def __iter__(self):
+        return self.iter_addresses()
+
+    def __getitem__(self, index):
+        """按切片取出存活地址，或按索引取出第index个存活地址（用于表格按需显示）"""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            return CandidateSet(islice(self.iter_addresses(), start, stop, step))
+
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("索引超出范围")
+        # 按页面存活数量的前缀和二分定位页面，页面只会追加，前缀和在页面数变化时重建
+        if self._page_ends is None or len(self._page_ends) != len(self._page_counts):
+            self._page_ends = array('Q', accumulate(self._page_counts))
+        page = bisect_right(self._page_ends, index)
+        slot = index - (self._page_ends[page - 1] if page else 0)
+        mask = self.page_mask(page)
+        if mask is not None:
+            # 取位图中第slot个置位的位置
+            bits = int.from_bytes(mask, 'little')
+            for _ in range(slot):
+                bits &= bits - 1
+            slot = (bits & -bits).bit_length() - 1
+        return self._page_addresses[page] + slot * self.value_size
+
+    def __repr__(self):
+        return (f"SnapshotStore({self._count} 个位置, {self.page_count} 个页面, "
+                f"{self.stored_pages} 个已保存页面)")
+
+    def __del__(self):
+        self.close()
+
+    @property
+    def page_count(self):
+        """仍有存活位置的页面数量"""
+        return len(self._page_addresses)
+
+    @property
+    def stored_pages(self):
+        """实际保存内容的页面数量（去除零页和重复页面后）"""
+        return len(set(self._page_blobs) - {ZERO_PAGE})
+
+    @property
+    def zero_pages(self):
+        """零页数量"""
+        return self._page_blobs.count(ZERO_PAGE)
+
+    def close(self):
+        """释放快照文件，没有其他快照共用时删除文件"""
+        blobs, self._blobs = getattr(self, '_blobs', None), None
+        if blobs is not None:
+            blobs.release()
+
+    def finish_capture(self):
+        """首次捕获完成，释放去重用的哈希索引（之后的快照直接引用已保存的内容）"""
+        self._blobs.index = None
+
+    def page_mask(self, index):
+        """第index个页面的存活位图，全部存活时返回None"""
+        mask = self._page_masks[index]
+        if mask == FULL_MASK:
+            return None
+        return bytes(self._mask_data[mask * self.mask_size:(mask + 1) * self.mask_size])
+
+    def _digest(self, index):
+        """第index个页面保存内容的哈希"""
+        blob = self._page_blobs[index]
+        return _ZERO_DIGEST if blob == ZERO_PAGE else self._blobs.digest(blob)
+
+    def add_page(self, address, data, mask=None, count=None, digest=None, blob=None):
+        """追加一个页面，地址需大于已有页面
+
+        参数:
+            address: 页面地址
+            data: 页面内容（PAGE_SIZE字节），给定blob时不使用
+            mask: 存活位图，None表示全部存活
+            count: 存活位置数量，mask不为None时必须提供
+            digest: 页面哈希，未提供时自动计算
+            blob: 共用文件中已保存的相同内容的编号，给定时不再写入
+        """
+        if blob is None:
+            if digest is None:
+                digest = page_digest(data)
+            blob = ZERO_PAGE if digest == _ZERO_DIGEST else self._blobs.store(data, digest)
+        self._page_addresses.append(address)
+        self._page_blobs.append(blob)
+        if mask is None:
+            self._page_masks.append(FULL_MASK)
+        else:
+            self._page_masks.append(len(self._mask_data) // self.mask_size)
+            self._mask_data += mask
+        count = self.slots_per_page if mask is None else count
+        self._page_counts.append(count)
+        self._count += count
+
+    def add_pages(self, base_address, data):
+        """按页面追加一段连续内存，末尾不足一页的部分被忽略"""
+        view = memoryview(data)
+        for offset in range(0, len(view) - PAGE_SIZE + 1, PAGE_SIZE):
+            self.add_page(base_address + offset, view[offset:offset + PAGE_SIZE])
+
+    def page_data(self, index):
+        """返回第index个页面保存的内容"""
+        blob = self._page_blobs[index]
+        if blob == ZERO_PAGE:
+            return _ZERO_BYTES
+        return self._blobs.read(blob)
+
+    def iter_addresses(self):
+        """按地址升序迭代存活的数值地址"""
+        size = self.value_size
+        for index, address in enumerate(self._page_addresses):
+            mask = self.page_mask(index)
+            if mask is None:
+                yield from range(address, address + PAGE_SIZE, size)
+                continue
+            bits = int.from_bytes(mask, 'little')
+            while bits:
+                low = bits & -bits
+                yield address + (low.bit_length() - 1) * size
+                bits ^= low
+
+    def to_candidates(self, memory_budget=None):
+        """将存活地址转换为候选地址集合"""
+        candidates = CandidateSet(memory_budget=memory_budget)
+        addresses = self.iter_addresses()
+        while True:
+            chunk = array('Q', islice(addresses, 1024 * 1024))
+            if not chunk:
+                return candidates
+            candidates.extend(chunk)
+
+    def iter_runs(self, max_pages=RUN_PAGES):
+        """按地址连续的页面分组，返回 (起始页面索引, 页面数) 的迭代器"""
+        addresses = self._page_addresses
+        start = 0
+        for index in range(1, len(addresses) + 1):
+            if (index == len(addresses) or index - start >= max_pages
+                    or addresses[index] != addresses[index - 1] + PAGE_SIZE):
+                yield start, index - start
+                start = index
+
+    def narrow(self, read, engine, compare_type, value=None, is_running=None, progress_callback=None):
+        """将当前内存与快照比较，返回只包含存活位置的新快照
+
+        参数:
+            read: 读取函数 read(地址, 大小)，返回缓冲区，读取失败返回None
+            engine: 比较引擎，提供compare_previous
+            compare_type: 比较方式，value为None时为与先前值比较（changed/unchanged/bigger/smaller）
+            value: 给定时与该值比较
+            is_running: 返回False时中止比较，已比较的部分仍保留在新快照中
+            progress_callback: progress_callback(已比较页面数, 总页面数)
+
+        返回:
+            新的SnapshotStore，页面内容为本次读取的内存；与本快照共用内容文件，
+            内容未变化的页面直接引用已保存的内容
+        """
+        result = SnapshotStore(self.value_type, self._blobs)
+        slots = self.slots_per_page
+        total_pages = self.page_count
+        processed = 0
+        for first, page_count in self.iter_runs():
+            if is_running is not None and not is_running():
+                break
+
+            run_address = self._page_addresses[first]
+            data = read(run_address, page_count * PAGE_SIZE)
+            if data is not None and len(data) == page_count * PAGE_SIZE:
+                pages = [(first + k, memoryview(data)[k * PAGE_SIZE:(k + 1) * PAGE_SIZE]) for k in range(page_count)]
+            else:
+                # 连续页面中有不可读的页面，逐页读取；不可读的页面中的位置全部淘汰
+                pages = []
+                for k in range(page_count):
+                    page = read(run_address + k * PAGE_SIZE, PAGE_SIZE)
+                    if page is not None and len(page) == PAGE_SIZE:
+                        pages.append((first + k, bytes(page)))
+
+            # 内容未变化的页面直接得出结果，变化的页面合并后整体比较
+            changed = []
+            for index, page in pages:
+                digest = page_digest(page)
+                unchanged = digest == self._digest(index)
+                if unchanged and value is None:
+                    if compare_type == 'unchanged':
+                        result.add_page(self._page_addresses[index], None, self.page_mask(index),
+                                        self._page_counts[index], blob=self._page_blobs[index])
+                    continue
+                changed.append((index, page, digest, unchanged))
+
+            if changed:
+                current = b''.join(page for _, page, _, _ in changed)
+                previous = b''.join(self.page_data(index) for index, _, _, _ in changed)
+                matched = engine.compare_previous(current, previous, self.value_type, compare_type, value)
+                for row, (index, page, digest, unchanged) in enumerate(changed):
+                    alive = matched[row * slots:(row + 1) * slots]
+                    mask = self.page_mask(index)
+                    if np is not None:
+                        alive = np.asarray(alive, dtype=bool)
+                        if mask is not None:
+                            alive &= _unpack_mask(mask, slots)
+                        count = int(np.count_nonzero(alive))
+                    else:
+                        if mask is not None:
+                            alive = [a and b for a, b in zip(alive, _unpack_mask(mask, slots))]
+                        count = sum(alive)
+                    if count:
+                        packed = None if count == slots else _pack_mask(alive)
+                        # 与给定值比较时内容未变化的页面同样直接引用已保存的内容
+                        result.add_page(self._page_addresses[index], page, packed, count, digest,
+                                        self._page_blobs[index] if unchanged else None)
+
+            processed += page_count
+            if progress_callback:
+                progress_callback(processed, total_pages)
+        return result
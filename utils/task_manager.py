@@ -197,9 +197,8 @@ class SearchTaskManager(QTabWidget):
                                 current_task.search_results,
                                 current_task.memory_reader,
                                 task_value_type=current_task.value_type,
-                                first_values=current_task.first_values,
-                                prev_values=current_task.prev_values,
-                                current_values=current_task.current_values
+                                history=current_task.history,
+                                pattern=current_task.pattern
                             )
                         finally:
                             # 恢复原始值类型，避免影响其他任务
@@ -1,7 +1,8 @@
 from PyQt5.QtWidgets import (QVBoxLayout, QHBoxLayout, QLabel,
                             QComboBox, QLineEdit, QPushButton, QTableWidget,
-                            QTableWidgetItem, QHeaderView)
+                            QTableView, QTableWidgetItem, QHeaderView, QCheckBox)
 from PyQt5.QtCore import Qt, QSize
+from utils.memory_model import MemoryTableModel
 
 def create_process_section(process_combo, refresh_callback, attach_callback):
     """创建进程选择区域"""
@@ -41,24 +42,39 @@ def create_process_section(process_combo, refresh_callback, attach_callback):
     return process_layout
 
 def create_search_section(search_input, type_combo, compare_combo, search_callback,
-                      new_task_callback):
-    """创建搜索区域"""
+                      new_task_callback, unaligned_check=None, encoding_combo=None, ignore_case_check=None):
+    """创建搜索区域
+
+    unaligned_check为非对齐扫描的复选框，encoding_combo和ignore_case_check为文本搜索的编码和大小写选项（均可选）
+    """
     search_layout = QHBoxLayout()  # 使用水平布局
 
     # 搜索条
     search_input.setPlaceholderText('输入搜索值')
 
     # 添加数值类型选择
-    type_combo.addItems(['整数', '浮点数', '双精度'])
+    type_combo.addItems(['整数', '浮点数', '双精度', '字节', '2字节', '8字节',
+                         '无符号字节', '无符号2字节', '无符号整数', '无符号8字节', '所有类型', '字节数组', '文本'])
 
     # 添加比较方式
-    compare_combo.addItems(['精确匹配', '大于', '小于', '已改变', '未改变'])
+    compare_combo.addItems(['精确匹配', '大于', '小于', '已改变', '未改变', '已增加', '已减少', '增加了', '减少了', '模糊值'])
 
     # 添加控件到布局
     search_layout.addWidget(QLabel('数值:'))
     search_layout.addWidget(search_input)
     search_layout.addWidget(QLabel('类型:'))
     search_layout.addWidget(type_combo)
+    if unaligned_check is not None:
+        unaligned_check.setText('非对齐')
+        unaligned_check.setToolTip('首次扫描检查每个字节偏移，可找到结构体中紧凑排列的数值，速度约为对齐扫描的1/数值大小')
+        search_layout.addWidget(unaligned_check)
+    if encoding_combo is not None:
+        encoding_combo.setToolTip('文本搜索使用的编码')
+        search_layout.addWidget(encoding_combo)
+    if ignore_case_check is not None:
+        ignore_case_check.setText('忽略大小写')
+        ignore_case_check.setToolTip('文本搜索时不区分ASCII字母的大小写')
+        search_layout.addWidget(ignore_case_check)
     search_layout.addWidget(QLabel('比较:'))
     search_layout.addWidget(compare_combo)
 
@@ -75,6 +91,30 @@ def create_search_section(search_input, type_combo, compare_combo, search_callba
     # 返回布局和搜索按钮，以便在主类中保存引用
     return search_layout, search_btn
 
+def create_region_filter_section(region_combo, region_profiles, start_input, end_input, module_input):
+    """创建首次扫描的区域筛选区域"""
+    region_layout = QHBoxLayout()
+
+    # 预设的区域筛选方案
+    region_combo.addItems(list(region_profiles))
+
+    # 地址范围和模块，留空表示不限制
+    start_input.setPlaceholderText('起始地址（十六进制）')
+    end_input.setPlaceholderText('结束地址（十六进制）')
+    module_input.setPlaceholderText('模块，如 game.exe, -d3d11.dll')
+    module_input.setToolTip('只扫描列出的模块，名称前加 - 表示排除该模块，多个模块用逗号分隔')
+
+    region_layout.addWidget(QLabel('区域:'))
+    region_layout.addWidget(region_combo)
+    region_layout.addWidget(QLabel('范围:'))
+    region_layout.addWidget(start_input)
+    region_layout.addWidget(QLabel('-'))
+    region_layout.addWidget(end_input)
+    region_layout.addWidget(QLabel('模块:'))
+    region_layout.addWidget(module_input)
+
+    return region_layout
+
 def create_button(text, callback):
     """创建按钮的辅助方法"""
     btn = QPushButton(text)
@@ -82,20 +122,19 @@ def create_button(text, callback):
     return btn
 
 def create_memory_table():
-    """创建内存表格"""
-    memory_table = QTableWidget()
-    memory_table.setColumnCount(5)
-    memory_table.setHorizontalHeaderLabels(['地址', '当前值', '先前值', '首次值', '类型'])
+    """创建内存表格（按需显示搜索结果的表格视图，数据由MemoryTableModel提供）"""
+    memory_table = QTableView()
+    memory_table.setModel(MemoryTableModel(memory_table))
 
     # 设置表格样式
     memory_table.setStyleSheet("""
-        QTableWidget {
+        QTableView {
             background-color: white;
             gridline-color: #d8d8d8;
             selection-background-color: #0078d7;
             selection-color: white;
         }
-        QTableWidget::item {
+        QTableView::item {
             padding: 5px;
         }
         QHeaderView::section {
@@ -111,8 +150,11 @@ def create_memory_table():
     memory_table.horizontalHeader().setStretchLastSection(True)
     memory_table.verticalHeader().setVisible(False)
     memory_table.setAlternatingRowColors(True)
-    memory_table.setSelectionBehavior(QTableWidget.SelectRows)
-    memory_table.setEditTriggers(QTableWidget.NoEditTriggers)
+    memory_table.setSelectionBehavior(QTableView.SelectRows)
+    memory_table.setEditTriggers(QTableView.NoEditTriggers)
+    memory_table.setSortingEnabled(True)
+    # 按结果顺序显示，点击表头时才排序
+    memory_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
 
     return memory_table
 
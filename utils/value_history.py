@@ -0,0 +1,113 @@
+"""搜索任务的数值历史
+
+首次值、先前值和当前值各保存为一列与候选地址一一对应的数值（ValueColumn），
+第i个数值对应候选集合中的第i个地址，每个数值只占该类型的字节数（1到8字节），
+替代按地址索引的字典（每项约200字节）。
+
+后续扫描时当前值列直接轮换为先前值列（交换引用，不复制），
+再按存活地址的索引整体压缩各列。
+所有数值类型扫描的结果按类型分组，每个分组各有一份历史。
+"""
+from utils.candidate_set import CandidateSet, TaggedCandidateSet
+
+
+class ValueHistory:
+    """与候选地址对齐的首次值、先前值、当前值三列
+
+    各列为ValueColumn或None（没有对应数值时），列之间及与候选集合之间按索引对齐。
+    """
+
+    def __init__(self):
+        self.first = None     # 首次搜索时的值
+        self.previous = None  # 上一次搜索时的值
+        self.current = None   # 本次搜索时的值
+        self.parts = None     # 按类型分组的结果对应的各分组历史 {数值类型: ValueHistory}
+
+    def __len__(self):
+        """已记录的地址数量"""
+        if self.parts is not None:
+            return sum(len(part) for part in self.parts.values())
+        for column in (self.current, self.first, self.previous):
+            if column is not None:
+                return len(column)
+        return 0
+
+    def clear(self):
+        """清空历史
+
+        数值列可能仍被候选集合引用，这里只释放引用，转存文件在不再使用后自动删除。
+        """
+        self.first = None
+        self.previous = None
+        self.current = None
+        self.parts = None
+
+    def start(self, candidates):
+        """首次搜索：记录扫描时读到的值，首次值与当前值共用同一列"""
+        if isinstance(candidates, TaggedCandidateSet):
+            self.clear()
+            self.parts = {}
+            for value_type, part in candidates.parts.items():
+                self.parts[value_type] = ValueHistory()
+                self.parts[value_type].start(part)
+            return
+        self.parts = None
+        values = getattr(candidates, 'values', None)
+        if values is not None and len(values) != len(candidates):
+            values = None
+        self.first = values
+        self.previous = None
+        self.current = values
+
+    def advance(self, old_candidates, new_candidates):
+        """后续搜索：当前值轮换为先前值，并将首次值、先前值压缩到存活的地址
+
+        参数:
+            old_candidates: 本次搜索前的候选集合（各列与之对齐）
+            new_candidates: 本次搜索的结果，必须是old_candidates的子集
+        """
+        if isinstance(old_candidates, TaggedCandidateSet) and isinstance(new_candidates, TaggedCandidateSet):
+            parts = {}
+            for value_type, part in new_candidates.parts.items():
+                history = (self.parts or {}).get(value_type, ValueHistory())
+                history.advance(old_candidates.parts.get(value_type), part)
+                parts[value_type] = history
+            self.parts = parts
+            return
+
+        if not isinstance(old_candidates, CandidateSet) or not isinstance(new_candidates, CandidateSet):
+            # 模糊值扫描的快照自行保存先前内容，不记录数值列
+            self.clear()
+            return
+
+        # 轮换：上一次的当前值成为先前值，只交换引用
+        previous, first = self.current, self.first
+        self.start(new_candidates)
+
+        aligned = len(old_candidates)
+        previous = previous if previous is not None and len(previous) == aligned else None
+        first = first if first is not None and len(first) == aligned else None
+        if previous is None and first is None:
+            return
+
+        indices = old_candidates.index_of(new_candidates)
+        self.previous = previous.take(indices) if previous is not None else None
+        if first is None:
+            self.first = None
+        elif first is previous:
+            self.first = self.previous  # 首次值与先前值为同一列时只选取一次
+        else:
+            self.first = first.take(indices)
+
+    def row(self, index):
+        """返回第index个地址的 (首次值, 先前值, 当前值)，没有记录的值为None"""
+        if self.parts is not None:
+            for part in self.parts.values():
+                if index < len(part):
+                    return part.row(index)
+                index -= len(part)
+            return None, None, None
+        return tuple(
+            column[index] if column is not None and index < len(column) else None
+            for column in (self.first, self.previous, self.current)
+        )
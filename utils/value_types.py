@@ -0,0 +1,150 @@
+"""数值类型定义
+
+集中描述搜索支持的数值类型，避免在各模块中硬编码大小、格式和显示名称。
+"""
+import math
+import struct
+
+# 数值类型信息
+#   size: 字节数
+#   format: struct格式字符（小端）
+#   typecode: array模块的类型码
+#   dtype: NumPy dtype字符串
+#   display: 表格中显示的类型名称
+#   is_float: 是否为浮点类型
+VALUE_TYPES = {
+    'int8': {'size': 1, 'format': 'b', 'typecode': 'b', 'dtype': '<i1', 'display': '字节', 'is_float': False},
+    'uint8': {'size': 1, 'format': 'B', 'typecode': 'B', 'dtype': '<u1', 'display': '无符号字节', 'is_float': False},
+    'int16': {'size': 2, 'format': 'h', 'typecode': 'h', 'dtype': '<i2', 'display': '2字节', 'is_float': False},
+    'uint16': {'size': 2, 'format': 'H', 'typecode': 'H', 'dtype': '<u2', 'display': '无符号2字节', 'is_float': False},
+    'int32': {'size': 4, 'format': 'i', 'typecode': 'i', 'dtype': '<i4', 'display': '整数', 'is_float': False},
+    'uint32': {'size': 4, 'format': 'I', 'typecode': 'I', 'dtype': '<u4', 'display': '无符号整数', 'is_float': False},
+    'int64': {'size': 8, 'format': 'q', 'typecode': 'q', 'dtype': '<i8', 'display': '8字节', 'is_float': False},
+    'uint64': {'size': 8, 'format': 'Q', 'typecode': 'Q', 'dtype': '<u8', 'display': '无符号8字节', 'is_float': False},
+    'float': {'size': 4, 'format': 'f', 'typecode': 'f', 'dtype': '<f4', 'display': '浮点', 'is_float': True},
+    'double': {'size': 8, 'format': 'd', 'typecode': 'd', 'dtype': '<f8', 'display': '双精度', 'is_float': True},
+}
+
+# 所有数值类型扫描：一次读取内存，同时按各类型比较，结果按类型分组
+ALL_TYPES = 'all'
+
+# 所有数值类型扫描中整数按宽度尝试的类型，搜索值超出有符号范围时改用无符号类型
+ALL_TYPE_WIDTHS = (('int8', 'uint8'), ('int16', 'uint16'), ('int32', 'uint32'), ('int64', 'uint64'))
+
+# 按字节模式搜索的类型 -> 表格中显示的类型名称（长度不固定，不能按数值比较大小）
+AOB_TYPE = 'aob'
+TEXT_TYPE = 'string'
+PATTERN_TYPES = {
+    AOB_TYPE: '字节数组',
+    TEXT_TYPE: '文本',
+}
+
+# 类型下拉框的文本 -> 数值类型
+TYPE_TEXTS = {
+    '字节': 'int8',
+    '2字节': 'int16',
+    '整数': 'int32',
+    '8字节': 'int64',
+    '无符号字节': 'uint8',
+    '无符号2字节': 'uint16',
+    '无符号整数': 'uint32',
+    '无符号8字节': 'uint64',
+    '浮点数': 'float',
+    '单精度': 'float',
+    '双精度': 'double',
+    '所有类型': ALL_TYPES,
+    '字节数组': AOB_TYPE,
+    '文本': TEXT_TYPE,
+}
+
+
+def get_type_info(value_type):
+    """获取数值类型信息，不支持的类型抛出ValueError"""
+    info = VALUE_TYPES.get(value_type)
+    if info is None:
+        raise ValueError(f"不支持的值类型: {value_type}")
+    return info
+
+
+def get_value_size(value_type):
+    """获取数值类型的字节数"""
+    return get_type_info(value_type)['size']
+
+
+def get_type_by_text(text, default=None):
+    """根据下拉框文本或表格中显示的类型名称获取数值类型"""
+    if text in TYPE_TEXTS:
+        return TYPE_TEXTS[text]
+    for value_type, info in VALUE_TYPES.items():
+        if info['display'] == text:
+            return value_type
+    for value_type, display in PATTERN_TYPES.items():
+        if display == text:
+            return value_type
+    return default
+
+
+def get_type_text(value_type):
+    """获取数值类型在类型下拉框中的文本"""
+    for text, text_type in TYPE_TEXTS.items():
+        if text_type == value_type:
+            return text
+    return '整数'
+
+
+def get_int_range(value_type):
+    """返回整数类型的 (最小值, 最大值)"""
+    bits = get_type_info(value_type)['size'] * 8
+    if value_type.startswith('u'):
+        return 0, (1 << bits) - 1
+    return -(1 << bits - 1), (1 << bits - 1) - 1
+
+
+def parse_value(value, value_type):
+    """将输入值转换为对应类型的Python数值"""
+    if get_type_info(value_type)['is_float']:
+        return float(value)
+    return int(value)
+
+
+def pack_value(value, value_type):
+    """将数值打包为对应类型的字节串，超出类型范围时抛出ValueError"""
+    try:
+        return struct.pack('<' + get_type_info(value_type)['format'], parse_value(value, value_type))
+    except struct.error as e:
+        raise ValueError(f"{value} 超出 {value_type} 的范围") from e
+
+
+def unpack_value(data, value_type):
+    """从字节串开头解析对应类型的数值"""
+    return struct.unpack_from('<' + get_type_info(value_type)['format'], data)[0]
+
+
+def format_value(value, value_type):
+    """格式化数值的显示，整数原样显示，浮点数保留6位小数"""
+    if value is None:
+        return "-"
+    if get_type_info(value_type)['is_float']:
+        return f"{float(value):.6f}"
+    return str(int(value))
+
+
+def types_for_value(value):
+    """所有数值类型扫描中，搜索值可以表示的类型及对应的搜索值
+
+    返回:
+        [(数值类型, 搜索值), ...]，整数类型在前，搜索值不是整数时只包含浮点类型
+    """
+    targets = []
+    number = float(value)
+    if math.isfinite(number) and number == int(number):
+        integer = int(number) if not isinstance(value, int) else value
+        for signed, unsigned in ALL_TYPE_WIDTHS:
+            for value_type in (signed, unsigned):
+                low, high = get_int_range(value_type)
+                if low <= integer <= high:
+                    targets.append((value_type, integer))
+                    break
+    targets.append(('float', number))
+    targets.append(('double', number))
+    return targets